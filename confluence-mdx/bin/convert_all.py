@@ -9,6 +9,10 @@ Usage:
   python convert_all.py                       # 전체 변환
   python convert_all.py --verify-translations  # 번역 검증만 수행
   python convert_all.py --generate-list        # list.txt / list.en.txt 생성
+  python convert_all.py --subprocess           # 페이지마다 converter/cli.py 프로세스로 변환
+  python convert_all.py --jobs 8               # 8개 프로세스로 병렬 변환
+  python convert_all.py --force                # 바뀌지 않은 페이지도 모두 다시 변환
+  python convert_all.py --changed-only         # 바뀐 페이지와 그 페이지로 링크하는 페이지만 변환
 """
 
 import argparse
@@ -17,21 +21,24 @@ import os
 import re
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-
-import yaml
+from typing import Dict, List, Optional, Tuple
 
 # Ensure bin/ is on sys.path
 _bin_dir = str(Path(__file__).resolve().parent)
 if _bin_dir not in sys.path:
     sys.path.insert(0, _bin_dir)
 
+from converter.batch import ConvertJob, ConvertResult, iter_convert_pages
+from converter.manifest import ConversionManifest
+from raw_store import load_document
+
 
 def load_pages_yaml(pages_yaml_path: str) -> List[Dict]:
     """Load pages.yaml and return list of page entries."""
-    with open(pages_yaml_path, 'r', encoding='utf-8') as f:
-        pages = yaml.safe_load(f)
+    pages = load_document(pages_yaml_path)
     if not isinstance(pages, list):
         raise ValueError(f"pages.yaml should contain a list, got {type(pages)}")
     return pages
@@ -94,56 +101,131 @@ def generate_list_files(pages: List[Dict], output_dir: str) -> None:
     print(f"Generated {list_en_path} ({len(list_en_lines)} entries)", file=sys.stderr)
 
 
+def build_job(page: Dict, var_dir: str, output_base_dir: str) -> Tuple[Optional[ConvertJob], str]:
+    """Compute the input, output and attachment paths of a page; returns (None, reason) when it cannot be converted."""
+    page_id = page['page_id']
+    path_parts = page.get('path', [])
+    if not path_parts:
+        return None, 'no path'
+
+    # Compute paths (same logic as generate_commands_for_xhtml2markdown.py)
+    if len(path_parts) == 1:
+        rel_dir = '.'
+        filename = f"{path_parts[0]}.mdx"
+    else:
+        rel_dir = os.path.join(*path_parts[:-1])
+        filename = f"{path_parts[-1]}.mdx"
+
+    input_file = os.path.join(var_dir, page_id, 'page.xhtml')
+    output_dir = os.path.join(output_base_dir, rel_dir)
+    output_file = os.path.normpath(os.path.join(output_dir, filename))
+    attachment_dir = os.path.normpath(os.path.join('/', rel_dir, Path(filename).stem))
+
+    if not os.path.exists(input_file):
+        return None, 'no page.xhtml'
+    return ConvertJob(page_id, input_file, output_file, attachment_dir), ''
+
+
+def convert_in_subprocess(job: ConvertJob, public_dir: str, log_level: str) -> ConvertResult:
+    """Run converter/cli.py for one page in a fresh interpreter."""
+    cmd = [
+        sys.executable, os.path.join(_bin_dir, 'converter', 'cli.py'),
+        job.input_file, job.output_file,
+        f'--public-dir={public_dir}',
+        f'--attachment-dir={job.attachment_dir}',
+        f'--log-level={log_level}',
+    ]
+    started = time.monotonic()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return ConvertResult(job, result.returncode == 0, result.stderr, time.monotonic() - started)
+
+
+def format_progress(done: int, remaining: int, elapsed: float) -> str:
+    """Throughput so far and the estimated time left, e.g. '12.5 pages/s, ETA 0:42'"""
+    rate = done / elapsed if elapsed > 0 else 0.0
+    if not rate:
+        return "-- pages/s, ETA --:--"
+    minutes, seconds = divmod(int(round(remaining / rate)), 60)
+    return f"{rate:.1f} pages/s, ETA {minutes}:{seconds:02d}"
+
+
 def convert_all(pages: List[Dict], var_dir: str, output_base_dir: str, public_dir: str,
-                log_level: str) -> int:
-    """Run converter/cli.py for each page. Returns number of failures."""
+                log_level: str, use_subprocess: bool = False, jobs: int = 1,
+                manifest: Optional[ConversionManifest] = None, force: bool = False,
+                changed_only: bool = False) -> int:
+    """Convert each page with `jobs` processes, or with converter/cli.py per page. Returns number of failures.
+
+    Progress and errors are reported in pages.yaml order whatever the number of jobs.
+    With a manifest, pages whose inputs and dependencies are unchanged since they
+    were last converted are skipped (unless force), and each conversion is recorded.
+    With changed_only, only the pages found through the manifest's reverse index of
+    changed pages.yaml entries, or whose own files changed size or mtime, are converted.
+    """
     # Skip the root page
     root_page_id = pages[0]['page_id'] if pages else None
     targets = [p for p in pages if p['page_id'] != root_page_id]
 
     total = len(targets)
-    failures = 0
+    planned = [build_job(page, var_dir, output_base_dir) for page in targets]
+    convert_jobs = [job for job, _ in planned if job]
+    inputs: Dict[str, Dict] = {}
+    unchanged = set()
+    if manifest and changed_only and not force:
+        affected = manifest.affected_pages()
+        print(f"{len(affected)} page(s) depend on pages changed in pages.yaml", file=sys.stderr)
+        unchanged = {job.page_id for job in convert_jobs if manifest.is_unchanged(job, affected)}
+        convert_jobs = [job for job in convert_jobs if job.page_id not in unchanged]
+        inputs = {job.page_id: manifest.inputs(job) for job in convert_jobs}
+    elif manifest:
+        for job in convert_jobs:
+            inputs[job.page_id] = manifest.inputs(job)
+            if not force and manifest.is_current(job, inputs[job.page_id]):
+                unchanged.add(job.page_id)
+        convert_jobs = [job for job in convert_jobs if job.page_id not in unchanged]
+    if manifest:
+        # Pages not reached by an interrupted run are converted by the next one
+        for job in convert_jobs:
+            manifest.forget(job.page_id)
+    for job in convert_jobs:
+        os.makedirs(os.path.dirname(job.output_file), exist_ok=True)
+
+    if use_subprocess:
+        executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+        results = executor.map(lambda job: convert_in_subprocess(job, public_dir, log_level), convert_jobs)
+    else:
+        executor = None
+        results = iter_convert_pages(convert_jobs, pages, public_dir, log_level, processes=jobs)
 
-    for i, page in enumerate(targets, 1):
-        page_id = page['page_id']
-        path_parts = page.get('path', [])
-        if not path_parts:
-            print(f"[{i}/{total}] SKIP {page_id} (no path)", file=sys.stderr)
-            continue
+    failures = 0
+    done = 0
+    started = time.monotonic()
+    try:
+        for i, (page, (job, reason)) in enumerate(zip(targets, planned), 1):
+            if not job:
+                print(f"[{i}/{total}] SKIP {page['page_id']} ({reason})", file=sys.stderr)
+                continue
+            if job.page_id in unchanged:
+                continue
 
-        # Compute paths (same logic as generate_commands_for_xhtml2markdown.py)
-        if len(path_parts) == 1:
-            rel_dir = '.'
-            filename = f"{path_parts[0]}.mdx"
+            result = next(results)
+            done += 1
+            progress = format_progress(done, len(convert_jobs) - done, time.monotonic() - started)
+            print(f"[{i}/{total}] {job.page_id} → {job.output_file} ({progress})", file=sys.stderr)
+            if not result.ok:
+                failures += 1
+                print(f"  ERROR: {result.log.strip()}", file=sys.stderr)
+            if manifest:
+                manifest.record(result, inputs[job.page_id])
+    finally:
+        if executor:
+            executor.shutdown()
         else:
-            rel_dir = os.path.join(*path_parts[:-1])
-            filename = f"{path_parts[-1]}.mdx"
-
-        input_file = os.path.join(var_dir, page_id, 'page.xhtml')
-        output_dir = os.path.join(output_base_dir, rel_dir)
-        output_file = os.path.normpath(os.path.join(output_dir, filename))
-        attachment_dir = os.path.normpath(os.path.join('/', rel_dir, Path(filename).stem))
-
-        if not os.path.exists(input_file):
-            print(f"[{i}/{total}] SKIP {page_id} (no page.xhtml)", file=sys.stderr)
-            continue
-
-        os.makedirs(output_dir, exist_ok=True)
-
-        cmd = [
-            sys.executable, os.path.join(_bin_dir, 'converter', 'cli.py'),
-            input_file, output_file,
-            f'--public-dir={public_dir}',
-            f'--attachment-dir={attachment_dir}',
-            f'--log-level={log_level}',
-        ]
-
-        print(f"[{i}/{total}] {page_id} → {output_file}", file=sys.stderr)
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            failures += 1
-            print(f"  ERROR: {result.stderr.strip()}", file=sys.stderr)
+            results.close()  # Shuts the process pool down if the loop stopped early
+        if manifest:
+            manifest.save()
 
+    if manifest:
+        print(f"Skipped {len(unchanged)} unchanged page(s), converted {len(convert_jobs)}", file=sys.stderr)
     return failures
 
 
@@ -167,8 +249,21 @@ def main():
                         help='Generate list.txt / list.en.txt for debugging')
     parser.add_argument('--log-level', default='warning',
                         choices=['debug', 'info', 'warning', 'error', 'critical'],
-                        help='Log level for converter/cli.py (default: warning)')
+                        help='Log level for the converter (default: warning)')
+    parser.add_argument('--subprocess', action='store_true',
+                        help='Run converter/cli.py in a new process per page instead of converting in this process')
+    parser.add_argument('--force', action='store_true',
+                        help='Convert every page, even those unchanged since the last run')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Convert only pages whose files changed size or mtime, and pages linking to '
+                             'pages whose title or path changed in pages.yaml')
+    parser.add_argument('--manifest',
+                        help=f'Conversion manifest used to skip unchanged pages (default: <var-dir>/{ConversionManifest.FILENAME})')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of pages converted in parallel, 0 for one per CPU (default: 1)')
     args = parser.parse_args()
+    if args.changed_only and (args.subprocess or args.force):
+        parser.error('--changed-only cannot be combined with --subprocess or --force')
 
     # Load data
     pages = load_pages_yaml(args.pages_yaml)
@@ -195,7 +290,15 @@ def main():
         generate_list_files(pages, args.var_dir)
 
     # Run conversions
-    failures = convert_all(pages, args.var_dir, args.output_dir, args.public_dir, args.log_level)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    # The subprocess path cannot report which pages a conversion looked up, so it converts everything
+    manifest = None
+    if not args.subprocess:
+        manifest_path = args.manifest or os.path.join(args.var_dir, ConversionManifest.FILENAME)
+        manifest = ConversionManifest(manifest_path, pages, args.public_dir)
+    failures = convert_all(pages, args.var_dir, args.output_dir, args.public_dir, args.log_level,
+                           use_subprocess=args.subprocess, jobs=jobs, manifest=manifest, force=args.force,
+                           changed_only=args.changed_only)
 
     if failures:
         print(f"\nCompleted with {failures} failure(s) out of {len(pages)} pages", file=sys.stderr)
@@ -0,0 +1,129 @@
+"""
+In-process batch conversion of many pages.
+
+pages.yaml is indexed once into PAGES_BY_TITLE / PAGES_BY_ID, then each page
+is converted with converter.cli.convert_file, which resets the per-page state
+in converter.context (input/output paths, language, page.v1, attachments,
+link mapping). Log records of each page are captured so that, like the
+subprocess path of convert_all.py, they are only shown when the page fails,
+and so are the pages.yaml lookups it made (see converter.manifest).
+
+With processes > 1, pages are converted by a process pool whose workers
+index pages.yaml once when they start and then take batches of pages from
+the pool's queue. Results are still yielded in job order.
+"""
+
+import io
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from converter.cli import convert_file, describe_error
+from converter.context import PAGES_BY_ID, PAGES_BY_TITLE, get_attachments, index_pages
+
+LOG_FORMAT = '%(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+
+
+@dataclass
+class ConvertJob:
+    """One page to convert: page.xhtml to an MDX file, with its attachment directory"""
+    page_id: str
+    input_file: str
+    output_file: str
+    attachment_dir: Optional[str] = None
+
+
+@dataclass
+class ConvertResult:
+    job: ConvertJob
+    ok: bool
+    log: str = ""
+    seconds: float = 0.0
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)  # Titles and page ids looked up in pages.yaml
+    attachments: List[str] = field(default_factory=list)  # Files copied into the public directory
+
+
+def load_pages(pages: List[Dict]) -> None:
+    """Index the entries of pages.yaml for the pages converted by this process"""
+    PAGES_BY_TITLE.clear()
+    PAGES_BY_ID.clear()
+    index_pages(pages, PAGES_BY_TITLE, PAGES_BY_ID)
+    logging.info(f"Indexed {len(PAGES_BY_ID)} pages for batch conversion")
+
+
+def convert_page(job: ConvertJob, public_dir: str, log_level: str = 'warning',
+                 skip_image_copy: bool = False) -> ConvertResult:
+    """Convert one page with the pages loaded by load_pages; errors are reported in the result"""
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    saved_level, saved_handlers = root.level, root.handlers[:]
+    root.handlers = [handler]
+    root.setLevel(getattr(logging, log_level.upper()))
+    PAGES_BY_TITLE.lookups.clear()
+    PAGES_BY_ID.lookups.clear()
+    started = time.monotonic()
+    try:
+        convert_file(job.input_file, job.output_file, public_dir, job.attachment_dir,
+                     skip_image_copy=skip_image_copy, load_pages=False)
+        ok = True
+    except Exception as e:
+        logging.error(f"Error during conversion: {describe_error(e)}")
+        ok = False
+    finally:
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+    dependencies = {
+        'title': sorted(key for key in PAGES_BY_TITLE.lookups if isinstance(key, str)),
+        'id': sorted(key for key in PAGES_BY_ID.lookups if isinstance(key, str)),
+    }
+    attachments = []
+    if ok and not skip_image_copy:
+        attachments = sorted({os.path.join(attachment.destination_dir, attachment.filename)
+                              for attachment in get_attachments()
+                              if hasattr(attachment, 'filename') and os.path.exists(attachment.source_file)})
+    return ConvertResult(job, ok, buffer.getvalue(), time.monotonic() - started, dependencies, attachments)
+
+
+def _convert_batch(jobs: Sequence[ConvertJob], public_dir: str, log_level: str,
+                   skip_image_copy: bool) -> List[ConvertResult]:
+    return [convert_page(job, public_dir, log_level, skip_image_copy) for job in jobs]
+
+
+def batch_size(total: int, processes: int) -> int:
+    """Pages per batch: about four batches per process, so a slow batch does not hold up the end of the run"""
+    return max(1, min(32, total // (processes * 4)))
+
+
+def iter_convert_pages(jobs: Sequence[ConvertJob], pages: List[Dict], public_dir: str, log_level: str = 'warning',
+                       skip_image_copy: bool = False, processes: int = 1) -> Iterator[ConvertResult]:
+    """Convert every job and yield the results in job order, as each one is available"""
+    if processes <= 1:
+        load_pages(pages)
+        for job in jobs:
+            yield convert_page(job, public_dir, log_level, skip_image_copy)
+        return
+
+    size = batch_size(len(jobs), processes)
+    batches = [jobs[start:start + size] for start in range(0, len(jobs), size)]
+    with ProcessPoolExecutor(max_workers=processes, initializer=load_pages, initargs=(pages,)) as executor:
+        futures = [executor.submit(_convert_batch, batch, public_dir, log_level, skip_image_copy)
+                   for batch in batches]
+        for future in futures:
+            yield from future.result()
+
+
+def convert_pages(jobs: Iterable[ConvertJob], pages: List[Dict], public_dir: str, log_level: str = 'warning',
+                  skip_image_copy: bool = False, on_result: Optional[Callable[[ConvertResult], None]] = None,
+                  processes: int = 1) -> List[ConvertResult]:
+    """Convert every job, indexing pages.yaml once per process; results are in job order"""
+    results = []
+    for result in iter_convert_pages(list(jobs), pages, public_dir, log_level, skip_image_copy, processes):
+        if on_result:
+            on_result(result)
+        results.append(result)
+    return results
@@ -14,8 +14,6 @@ import sys
 from pathlib import Path
 from typing import Optional, List
 
-import yaml
-
 # Ensure bin/ is on sys.path when run as a script (e.g. python bin/converter/cli.py)
 _bin_dir = str(Path(__file__).resolve().parent.parent)
 if _bin_dir not in sys.path:
@@ -26,10 +24,11 @@ from converter.context import (
     PAGES_BY_TITLE, PAGES_BY_ID,
     PagesDict, PageV1,
     load_pages_yaml, load_page_v1_yaml, build_link_mapping,
-    set_page_v1, get_page_v1, get_attachments,
+    set_page_v1, get_page_v1, get_attachments, set_attachments,
     clean_text,
 )
 from converter.core import ConfluenceToMarkdown
+from raw_store import load_raw_file, resolve
 
 
 def generate_meta_from_children(input_dir: str, output_file_path: str, pages_by_id: PagesDict) -> None:
@@ -43,10 +42,9 @@ def generate_meta_from_children(input_dir: str, output_file_path: str, pages_by_
     Swallows exceptions with logging to keep conversion resilient.
     """
     try:
-        children_yaml_path = os.path.join(input_dir, 'children.v2.yaml')
-        if os.path.exists(children_yaml_path):
-            with open(children_yaml_path, 'r', encoding='utf-8') as yf:
-                children_data = yaml.safe_load(yf)
+        children_yaml_path = resolve(os.path.join(input_dir, 'children.v2.yaml'))
+        if children_yaml_path:
+            children_data = load_raw_file(children_yaml_path)
             results = children_data.get('results') if isinstance(children_data, dict) else None
             if isinstance(results, list) and len(results) > 0:
                 def _pos(item: dict) -> int:
@@ -106,108 +104,123 @@ def generate_meta_from_children(input_dir: str, output_file_path: str, pages_by_
         logging.error(f"Failed to generate _meta.ts: {meta_err}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Convert Confluence XHTML to Markdown')
-    parser.add_argument('input_file', help='Input XHTML file path')
-    parser.add_argument('output_file', help='Output Markdown file path')
-    parser.add_argument('--public-dir',
-                        default='./public',
-                        help='/public directory path')
-    parser.add_argument('--attachment-dir',
-                        help='Directory to save attachments (default: output file directory)')
-    parser.add_argument('--skip-image-copy', action='store_true',
-                        help='이미지 파일 복사를 생략 (경로만 지정대로 생성)')
-    parser.add_argument('--log-level',
-                        choices=['debug', 'info', 'warning', 'error', 'critical'],
-                        default='info',
-                        help='Set the logging level (default: info)')
-    args = parser.parse_args()
+def detect_language(output_file: str) -> str:
+    """Return the 2-letter language code (ko, ja, en) found in the output file path; en by default"""
+    for part in os.path.normpath(output_file).split(os.sep):
+        if len(part) == 2 and part.isalpha():
+            # Check if it's a known language code
+            if part in ['ko', 'ja', 'en']:
+                return part
+    return 'en'
 
-    # Configure logging with the specified level
-    log_level = getattr(logging, args.log_level.upper())
-    logging.basicConfig(level=log_level, format='%(levelname)s - %(funcName)s:%(lineno)d - %(message)s')
 
+def convert_file(input_file: str, output_file: str, public_dir: str, attachment_dir: Optional[str] = None,
+                 skip_image_copy: bool = False, load_pages: bool = True) -> None:
+    """Convert one page.xhtml to MDX, resetting the per-page state in converter.context.
+
+    With load_pages=False, PAGES_BY_TITLE and PAGES_BY_ID must already be loaded
+    (see converter.batch); otherwise pages.yaml next to the page directory is read.
+    Raises on conversion errors.
+    """
     # Store the input file path in shared context
-    ctx.INPUT_FILE_PATH = os.path.normpath(args.input_file)  # Normalize path for cross-platform compatibility
-    ctx.OUTPUT_FILE_PATH = os.path.normpath(args.output_file)
+    ctx.INPUT_FILE_PATH = os.path.normpath(input_file)  # Normalize path for cross-platform compatibility
+    ctx.OUTPUT_FILE_PATH = os.path.normpath(output_file)
 
     input_dir = os.path.dirname(ctx.INPUT_FILE_PATH)
     # Set an attachment directory if provided
-    if args.attachment_dir:
-        output_dir = args.attachment_dir
+    if attachment_dir:
+        output_dir = attachment_dir
         logging.info(f"Using attachment directory: {output_dir}")
     else:
-        output_file_stem = Path(args.output_file).stem
-        output_dir = os.path.join(os.path.dirname(args.output_file), output_file_stem)
+        output_file_stem = Path(output_file).stem
+        output_dir = os.path.join(os.path.dirname(output_file), output_file_stem)
         logging.info(f"Using default attachment directory: {output_dir}")
 
-    # Extract language code from the output file path
-    path_parts = ctx.OUTPUT_FILE_PATH.split(os.sep)
-
-    # Look for 2-letter language code in the path
-    detected_language = 'en'  # Default to English
-    for part in path_parts:
-        if len(part) == 2 and part.isalpha():
-            # Check if it's a known language code
-            if part in ['ko', 'ja', 'en']:
-                detected_language = part
-                break
-
     # Update shared LANGUAGE variable
-    ctx.LANGUAGE = detected_language
+    ctx.LANGUAGE = detect_language(ctx.OUTPUT_FILE_PATH)
     logging.info(f"Detected language from output path: {ctx.LANGUAGE}")
 
-    try:
-        with open(args.input_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        html_content = f.read()
 
-        # Replace XML namespace prefixes
-        html_content = re.sub(r'\sac:', ' ', html_content)
-        html_content = re.sub(r'\sri:', ' ', html_content)
+    # Replace XML namespace prefixes
+    html_content = re.sub(r'\sac:', ' ', html_content)
+    html_content = re.sub(r'\sri:', ' ', html_content)
 
+    if load_pages:
         # Load pages.yaml to get the current page's path
         pages_yaml_path = os.path.join(input_dir, '..', 'pages.yaml')
         load_pages_yaml(pages_yaml_path, PAGES_BY_TITLE, PAGES_BY_ID)
 
-        # Load page.v1.yaml from the same directory as the input file
-        page_v1: Optional[PageV1] = load_page_v1_yaml(os.path.join(input_dir, 'page.v1.yaml'))
-        set_page_v1(page_v1)
+    # Load page.v1.yaml from the same directory as the input file
+    page_v1: Optional[PageV1] = load_page_v1_yaml(os.path.join(input_dir, 'page.v1.yaml'))
+    set_page_v1(page_v1)
+    set_attachments([])
 
-        # Build link mapping from page.v1.yaml for external link pageId resolution
-        ctx.GLOBAL_LINK_MAPPING = build_link_mapping(page_v1)
+    # Build link mapping from page.v1.yaml for external link pageId resolution
+    ctx.GLOBAL_LINK_MAPPING = build_link_mapping(page_v1)
 
-        converter = ConfluenceToMarkdown(html_content)
-        converter.load_attachments(input_dir, output_dir, args.public_dir,
-                                   skip_image_copy=args.skip_image_copy)
-        markdown_content = converter.as_markdown()
+    converter = ConfluenceToMarkdown(html_content)
+    converter.load_attachments(input_dir, output_dir, public_dir,
+                               skip_image_copy=skip_image_copy)
+    markdown_content = converter.as_markdown()
 
-        with open(args.output_file, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(markdown_content)
 
-        attachments = get_attachments()
-        for it in attachments:
-            if it.used:
-                logging.debug(f'Attachment {it} is used.')
-            else:
-                logging.warning(f'Attachment {it} is NOT used.')
+    attachments = get_attachments()
+    for it in attachments:
+        if it.used:
+            logging.debug(f'Attachment {it} is used.')
+        else:
+            logging.warning(f'Attachment {it} is NOT used.')
+
+    # Generate _meta.ts from children.v2.yaml to preserve child order for Netra sidebar
+    generate_meta_from_children(input_dir, ctx.OUTPUT_FILE_PATH, PAGES_BY_ID)
 
-        # Generate _meta.ts from children.v2.yaml to preserve child order for Netra sidebar
-        generate_meta_from_children(input_dir, ctx.OUTPUT_FILE_PATH, PAGES_BY_ID)
+    logging.info(f"Successfully converted {input_file} to {output_file}")
 
-        logging.info(f"Successfully converted {args.input_file} to {args.output_file}")
 
+def describe_error(e: Exception) -> str:
+    """Format a conversion error with the location it was raised from"""
+    import traceback
+    tb = traceback.extract_tb(e.__traceback__)
+    if tb:
+        last_frame = tb[-1]
+        file_name = last_frame.filename.split('/')[-1]
+        line_no = last_frame.lineno
+        func_name = last_frame.name
+        code = last_frame.line
+        return f"{e} (in {file_name}, function '{func_name}', line {line_no}, code: '{code}')"
+    return f"{e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert Confluence XHTML to Markdown')
+    parser.add_argument('input_file', help='Input XHTML file path')
+    parser.add_argument('output_file', help='Output Markdown file path')
+    parser.add_argument('--public-dir',
+                        default='./public',
+                        help='/public directory path')
+    parser.add_argument('--attachment-dir',
+                        help='Directory to save attachments (default: output file directory)')
+    parser.add_argument('--skip-image-copy', action='store_true',
+                        help='이미지 파일 복사를 생략 (경로만 지정대로 생성)')
+    parser.add_argument('--log-level',
+                        choices=['debug', 'info', 'warning', 'error', 'critical'],
+                        default='info',
+                        help='Set the logging level (default: info)')
+    args = parser.parse_args()
+
+    # Configure logging with the specified level
+    log_level = getattr(logging, args.log_level.upper())
+    logging.basicConfig(level=log_level, format='%(levelname)s - %(funcName)s:%(lineno)d - %(message)s')
+
+    try:
+        convert_file(args.input_file, args.output_file, args.public_dir, args.attachment_dir,
+                     skip_image_copy=args.skip_image_copy)
     except Exception as e:
-        import traceback
-        tb = traceback.extract_tb(e.__traceback__)
-        if tb:
-            last_frame = tb[-1]
-            file_name = last_frame.filename.split('/')[-1]
-            line_no = last_frame.lineno
-            func_name = last_frame.name
-            code = last_frame.line
-            logging.error(f"Error during conversion: {e} (in {file_name}, function '{func_name}', line {line_no}, code: '{code}')")
-        else:
-            logging.error(f"Error during conversion: {e}")
+        logging.error(f"Error during conversion: {describe_error(e)}")
         sys.exit(1)
 
 
@@ -11,12 +11,13 @@ import os
 import re
 import unicodedata
 from datetime import datetime
-from typing import Optional, Dict, List, Any, TypedDict
+from typing import Optional, Dict, List, Any, Set, TypedDict
 from urllib.parse import unquote, urlparse
 
 import yaml
 from bs4 import BeautifulSoup, NavigableString
 
+from raw_store import load_document
 from text_utils import clean_text
 
 try:
@@ -58,14 +59,39 @@ class PageInfo(TypedDict, total=False):
 # Type alias for pages dictionary
 PagesDict = Dict[str, PageInfo]
 
+
+class RecordingPagesDict(dict):
+    """Pages dictionary that remembers which keys were looked up.
+
+    Link resolution and _meta.ts generation read other pages' titles and
+    paths through PAGES_BY_TITLE / PAGES_BY_ID; the recorded keys are the
+    pages a converted page depends on (see converter.manifest).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups: Set[str] = set()
+
+    def get(self, key, default=None):
+        self.lookups.add(key)
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.lookups.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.lookups.add(key)
+        return super().__contains__(key)
+
 # Global variable to store an input file path
 INPUT_FILE_PATH = ""
 OUTPUT_FILE_PATH = ""
 LANGUAGE = 'en'
 
 # Global variables to store data
-PAGES_BY_TITLE: PagesDict = {}
-PAGES_BY_ID: PagesDict = {}
+PAGES_BY_TITLE: PagesDict = RecordingPagesDict()
+PAGES_BY_ID: PagesDict = RecordingPagesDict()
 GLOBAL_PAGE_V1: Optional[PageV1] = None
 GLOBAL_ATTACHMENTS: List = []
 GLOBAL_LINK_MAPPING: Dict[str, str] = {}  # Mapping of link text -> pageId from page.v1.yaml
@@ -176,6 +202,34 @@ def convert_confluence_url(href: str) -> tuple[str, Optional[str]]:
     return href, 'Unknown Title'
 
 
+def index_pages(pages: List, pages_by_title: PagesDict, pages_by_id: PagesDict) -> None:
+    """
+    Populate the provided dictionaries from the page entries of pages.yaml
+
+    Args:
+        pages: List of page entries as loaded from pages.yaml
+        pages_by_title: Dictionary to be populated with title_orig as key and page info as value
+        pages_by_id: Dictionary to be populated with page_id as key and page info as value
+    """
+    for page in pages:
+        if not isinstance(page, dict):
+            logging.warning(f"Page info must be of type dict: {repr(page)}")
+            continue
+
+        title_orig = page.get('title_orig')
+        if not title_orig:
+            logging.warning(f"Page info must have a title_orig: {repr(page)}")
+            continue
+
+        if title_orig in pages_by_title:
+            logging.warning(f"title_orig ${repr(title_orig)} already exists in pages_by_title: {repr(pages_by_title[title_orig])}")
+            logging.warning(f"title_orig ${repr(title_orig)} is from {repr(page)}")
+            continue
+
+        pages_by_title[title_orig] = page
+        pages_by_id[page['page_id']] = page
+
+
 def load_pages_yaml(yaml_path: str, pages_by_title: PagesDict, pages_by_id: PagesDict):
     """
     Load the pages.yaml file and populate the provided dictionaries with page information
@@ -189,37 +243,19 @@ def load_pages_yaml(yaml_path: str, pages_by_title: PagesDict, pages_by_id: Page
         PagesDict: Dictionary with title as key and page info as value, or empty dict if file doesn't exist
     """
     try:
-        with open(yaml_path, 'r', encoding='utf-8') as f:
-            yaml_string = f.read()
-            yaml_data = yaml.safe_load(yaml_string)
-
-            # Convert a list to dictionary with title as a key
-            pages_dict: PagesDict = {}
-            if isinstance(yaml_data, list):
-                for page in yaml_data:
-                    if not isinstance(page, dict):
-                        logging.warning(f"Page info must be of type dict: {repr(page)}")
-                        continue
-
-                    title_orig = page.get('title_orig')
-                    if not title_orig:
-                        logging.warning(f"Page info must have a title_orig: {repr(page)}")
-                        continue
-
-                    if title_orig in pages_by_title:
-                        logging.warning(f"title_orig ${repr(title_orig)} already exists in pages_by_title: {repr(pages_by_title[title_orig])}")
-                        logging.warning(f"title_orig ${repr(title_orig)} is from {repr(page)}")
-                        continue
-
-                    pages_by_title[title_orig] = page
-                    pages_by_id[page['page_id']] = page
-
-            logging.info(f"Successfully loaded pages.yaml from {yaml_path} with {len(pages_by_id)} pages")
-            return pages_dict
+        yaml_data = load_document(yaml_path)
+
+        # Convert a list to dictionary with title as a key
+        pages_dict: PagesDict = {}
+        if isinstance(yaml_data, list):
+            index_pages(yaml_data, pages_by_title, pages_by_id)
+
+        logging.info(f"Successfully loaded pages.yaml from {yaml_path} with {len(pages_by_id)} pages")
+        return pages_dict
     except FileNotFoundError:
         logging.warning(f"Pages YAML file not found: {yaml_path}")
         return {}
-    except yaml.YAMLError as e:
+    except (yaml.YAMLError, ValueError) as e:
         logging.error(f"Error parsing YAML file {yaml_path}: {e}")
         return {}
     except Exception as e:
@@ -307,21 +343,20 @@ def load_page_v1_yaml(yaml_path: str) -> Optional[PageV1]:
     Load page.v1.yaml file and return as a dictionary object
 
     Args:
-        yaml_path (str): Path to the page.v1.yaml file
+        yaml_path (str): Path to the page.v1.yaml file; page.v1.json(.zst) next to it is used
+            instead when the page was stored in another format (see raw_store)
 
     Returns:
         PageV1: YAML content as PageV1 dictionary, or None if the file doesn't exist or has errors
     """
     try:
-        with open(yaml_path, 'r', encoding='utf-8') as f:
-            yaml_string = f.read()
-            yaml_data = yaml.safe_load(yaml_string)
-            logging.info(f"Successfully loaded page.v1.yaml from {yaml_path}")
-            return yaml_data
+        yaml_data = load_document(yaml_path)
+        logging.info(f"Successfully loaded page.v1.yaml from {yaml_path}")
+        return yaml_data
     except FileNotFoundError:
         logging.warning(f"Page v1 YAML file not found: {yaml_path}")
         return None
-    except yaml.YAMLError as e:
+    except (yaml.YAMLError, ValueError) as e:
         logging.error(f"Error parsing YAML file {yaml_path}: {e}")
         return None
     except Exception as e:
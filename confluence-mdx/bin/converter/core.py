@@ -69,8 +69,16 @@ class Attachment:
     def __str__(self) -> str:
         return f'{"{"}filename="{self.filename}",original="{self.original}"{"}"}'
 
+    @property
+    def source_file(self) -> str:
+        return clean_text(os.path.join(self.input_dir, self.original))
+
+    @property
+    def destination_dir(self) -> str:
+        return os.path.normpath(os.path.join(self.public_dir, './' + self.output_dir))
+
     def copy_to_destination(self) -> None:
-        source_file = clean_text(os.path.join(self.input_dir, self.original))
+        source_file = self.source_file
         if os.path.exists(source_file):
             logging.debug(f"Source file found: {repr(source_file)}")
         else:
@@ -78,7 +86,7 @@ class Attachment:
             return
 
         logging.debug(f"public_dir={self.public_dir} output_dir={self.output_dir}")
-        destination_dir = os.path.normpath(os.path.join(self.public_dir, './' + self.output_dir))
+        destination_dir = self.destination_dir
         logging.debug(f"Destination directory: {destination_dir}")
         if not os.path.exists(destination_dir):
             logging.debug(f"Destination directory not found: {repr(destination_dir)}")
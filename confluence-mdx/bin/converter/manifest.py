@@ -0,0 +1,227 @@
+"""
+Conversion manifest for incremental runs of convert_all.py.
+
+For every converted page, var/convert-manifest.json records:
+- the SHA-256 of its inputs: page.xhtml, page.v1, children.v2 and
+  attachments.v1 (in whatever raw_store format they are stored) and its
+  own pages.yaml entry,
+- the pages.yaml entries it looked up while converting (link targets by
+  title, children and linked pages by id), with the hash of each entry or
+  None when the lookup found nothing,
+- the output file, the attachments copied into the public directory and
+  the version of the converter code.
+
+A page is converted again only when one of these has changed, so a page
+whose link target was renamed or moved, or whose missing link target now
+exists, is converted again even if its own files are unchanged.
+
+The manifest also keeps the pages.yaml entry hashes of the last run. For
+--changed-only, the titles and ids whose entries changed since then are
+looked up in a reverse index (title or id -> pages that looked it up), and
+the page's own files are compared by size and mtime, and hashed only when
+those differ.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from glob import glob
+from typing import Dict, List, Optional, Set
+
+from converter.batch import ConvertJob, ConvertResult
+from raw_store import resolve
+
+BIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files whose changes can change the converter output
+CODE_PATTERNS = ("converter/*.py", "text_utils.py", "raw_store.py")
+
+# Inputs of a page, relative to var/<page_id>/; raw documents are resolved in any stored format
+INPUT_FILES = ("page.xhtml", "page.v1.yaml", "children.v2.yaml", "attachments.v1.yaml")
+
+
+def code_version() -> str:
+    """SHA-256 over the converter source files"""
+    digest = hashlib.sha256()
+    for pattern in CODE_PATTERNS:
+        for path in sorted(glob(os.path.join(BIN_DIR, pattern))):
+            digest.update(os.path.relpath(path, BIN_DIR).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> Optional[str]:
+    resolved = resolve(path)
+    if resolved is None:
+        return None
+    digest = hashlib.sha256()
+    with open(resolved, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_sha256(entry: Optional[Dict]) -> Optional[str]:
+    if entry is None:
+        return None
+    return hashlib.sha256(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class ConversionManifest:
+    """Inputs and dependencies of each converted page, keyed by page id"""
+
+    FILENAME = "convert-manifest.json"
+    VERSION = 2
+
+    def __init__(self, path: str, pages: List[Dict], public_dir: str, code: Optional[str] = None):
+        self.path = path
+        self.public_dir = public_dir
+        self.code = code or code_version()
+        self.entries: Dict[str, Dict] = {}
+        # pages.yaml entry hashes of the last run, by title and by id
+        self.previous: Dict[str, Dict[str, str]] = {'title': {}, 'id': {}}
+        self.load()
+
+        # Hash of each pages.yaml entry as the converter sees it: first title_orig wins, as in index_pages
+        self.by_title: Dict[str, str] = {}
+        self.by_id: Dict[str, str] = {}
+        for page in pages:
+            if not isinstance(page, dict) or not page.get('title_orig') or page['title_orig'] in self.by_title:
+                continue
+            self.by_title[page['title_orig']] = self.by_id[page['page_id']] = entry_sha256(page)
+
+    @classmethod
+    def for_var_dir(cls, var_dir: str, pages: List[Dict], public_dir: str) -> "ConversionManifest":
+        return cls(os.path.join(var_dir, cls.FILENAME), pages, public_dir)
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring conversion manifest {self.path}: {e}")
+            return
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('pages', {})
+            self.previous = {'title': data.get('titles', {}), 'id': data.get('ids', {})}
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'pages': self.entries, 'titles': self.by_title, 'ids': self.by_id},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(temp_path, self.path)
+        self.previous = {'title': dict(self.by_title), 'id': dict(self.by_id)}
+
+    def inputs(self, job: ConvertJob) -> Dict[str, Optional[str]]:
+        """Current hashes of the files and pages.yaml entry a page is converted from"""
+        input_dir = os.path.dirname(job.input_file)
+        hashes = {name.split('.yaml')[0]: file_sha256(os.path.join(input_dir, name)) for name in INPUT_FILES}
+        hashes['pages.yaml'] = self.by_id.get(job.page_id)
+        return hashes
+
+    @staticmethod
+    def stats(job: ConvertJob) -> Dict[str, Optional[List[int]]]:
+        """Size and mtime of the files a page is converted from, for comparisons without reading them"""
+        input_dir = os.path.dirname(job.input_file)
+        stats: Dict[str, Optional[List[int]]] = {}
+        for name in INPUT_FILES:
+            resolved = resolve(os.path.join(input_dir, name))
+            if resolved is None:
+                stats[name.split('.yaml')[0]] = None
+            else:
+                stat = os.stat(resolved)
+                stats[name.split('.yaml')[0]] = [stat.st_size, stat.st_mtime_ns]
+        return stats
+
+    def dependencies(self, result: ConvertResult) -> Dict[str, Dict[str, Optional[str]]]:
+        """Hash of each pages.yaml entry a conversion looked up, None for lookups that found nothing"""
+        return {
+            'title': {title: self.by_title.get(title) for title in result.dependencies.get('title', [])},
+            'id': {page_id: self.by_id.get(page_id) for page_id in result.dependencies.get('id', [])},
+        }
+
+    def _same_target(self, job: ConvertJob, entry: Optional[Dict]) -> bool:
+        return bool(entry) and (entry.get('code') == self.code and entry.get('public_dir') == self.public_dir
+                                and entry.get('output_file') == job.output_file
+                                and entry.get('attachment_dir') == job.attachment_dir
+                                and os.path.exists(job.output_file)
+                                and all(os.path.exists(path) for path in entry.get('attachments', [])))
+
+    def is_current(self, job: ConvertJob, inputs: Dict[str, Optional[str]]) -> bool:
+        """True when the page was converted from the same inputs, dependencies and code, and its output exists"""
+        entry = self.entries.get(job.page_id)
+        if not self._same_target(job, entry) or entry.get('inputs') != inputs:
+            return False
+        depends = entry.get('depends', {})
+        return (all(self.by_title.get(title) == sha256 for title, sha256 in depends.get('title', {}).items())
+                and all(self.by_id.get(page_id) == sha256 for page_id, sha256 in depends.get('id', {}).items()))
+
+    def record(self, result: ConvertResult, inputs: Dict[str, Optional[str]]) -> None:
+        """Record a conversion; failed pages are forgotten so that the next run retries them"""
+        job = result.job
+        if not result.ok:
+            self.forget(job.page_id)
+            return
+        self.entries[job.page_id] = {
+            'code': self.code,
+            'public_dir': self.public_dir,
+            'output_file': job.output_file,
+            'attachment_dir': job.attachment_dir,
+            'attachments': result.attachments,
+            'inputs': inputs,
+            'stats': self.stats(job),
+            'depends': self.dependencies(result),
+        }
+
+    def forget(self, page_id: str) -> None:
+        """Drop a page so that the next run converts it, e.g. before converting it again"""
+        self.entries.pop(page_id, None)
+
+    def dependents(self) -> Dict[str, Dict[str, List[str]]]:
+        """Reverse index of the recorded lookups: title or page id -> ids of the pages that looked it up"""
+        index: Dict[str, Dict[str, List[str]]] = {'title': {}, 'id': {}}
+        for page_id, entry in sorted(self.entries.items()):
+            for kind in ('title', 'id'):
+                for key in entry.get('depends', {}).get(kind, {}):
+                    index[kind].setdefault(key, []).append(page_id)
+        return index
+
+    def affected_pages(self) -> Set[str]:
+        """Pages that looked up a title or page id whose pages.yaml entry changed since the last run"""
+        index = self.dependents()
+        affected: Set[str] = set()
+        for kind, current in (('title', self.by_title), ('id', self.by_id)):
+            previous = self.previous[kind]
+            for key in set(previous) | set(current):
+                if previous.get(key) != current.get(key):
+                    affected.update(index[kind].get(key, []))
+        return affected
+
+    def is_unchanged(self, job: ConvertJob, affected: Set[str]) -> bool:
+        """Check for --changed-only: not affected, own pages.yaml entry and files unchanged.
+
+        Files are compared by size and mtime first. A fetch rewrites files whose
+        content has not changed, so when those differ the content hashes decide,
+        and the new sizes and mtimes are kept for the next run.
+        """
+        entry = self.entries.get(job.page_id)
+        if (job.page_id in affected or not self._same_target(job, entry)
+                or entry['inputs'].get('pages.yaml') != self.by_id.get(job.page_id)):
+            return False
+        stats = self.stats(job)
+        if entry.get('stats') == stats:
+            return True
+        if entry['inputs'] != self.inputs(job):
+            return False
+        entry['stats'] = stats
+        return True
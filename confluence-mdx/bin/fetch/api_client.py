@@ -1,15 +1,22 @@
 """Confluence REST API client."""
 
 import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Protocol
-from urllib.parse import quote
+from typing import Dict, Iterator, List, Optional, Protocol
+from urllib.parse import quote, urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 from fetch.config import Config
 from fetch.exceptions import ApiError
+from fetch.report import Counters
+from rate_limiter import RequestRateLimiter, endpoint_key, parse_retry_after
 
 
 class ApiClientProtocol(Protocol):
@@ -28,21 +35,180 @@ class ApiClientProtocol(Protocol):
         ...
 
 
-class ApiClient:
-    """Handles all API-related operations"""
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class ApiClientBase:
+    """Endpoints and retry policy shared by the sync and async API clients"""
 
-    def __init__(self, config: Config, logger: logging.Logger):
+    CHILD_PAGES_LIMIT = 250  # Largest page size accepted by /api/v2/pages/{id}/children
+    SEARCH_LIMIT = 100  # CQL search result page size
+    PAGE_V1_EXPAND = "title,ancestors,body.storage,body.view"  # Fields of page.v1
+
+    def __init__(self, config: Config, logger: logging.Logger, rate_limiter: Optional[RequestRateLimiter] = None,
+                 counters: Optional[Counters] = None):
         self.config = config
         self.logger = logger
-        self.auth = HTTPBasicAuth(config.email, config.api_token)
         self.headers = {"Accept": "application/json"}
+        # Pass the same limiter and counters to every client of a run so that they are shared
+        self.rate_limiter = rate_limiter or RequestRateLimiter(config.rate_limit, config.rate_burst,
+                                                               max_pause=config.retry_after_max)
+        self.counters = counters or Counters()
+
+    def _record_response(self, url: str, seconds: float, status_code: int, headers) -> None:
+        """Feed a response to the rate limiter and the request counters"""
+        self.rate_limiter.observe(endpoint_key("GET", url), seconds, status_code, headers)
+        self.counters.add("api.requests")
+        self.counters.add("api.seconds", seconds)
+
+    def page_v1_url(self, page_id: str) -> str:
+        return f"{self.config.base_url}/rest/api/content/{page_id}?expand={self.PAGE_V1_EXPAND}"
+
+    def page_v2_url(self, page_id: str) -> str:
+        return f"{self.config.base_url}/api/v2/pages/{page_id}?body-format=atlas_doc_format"
+
+    def page_summaries_url(self, page_ids: List[str]) -> str:
+        return f"{self.config.base_url}/api/v2/pages?id={','.join(page_ids)}&limit={len(page_ids)}"
+
+    def child_pages_url(self, page_id: str) -> str:
+        return f"{self.config.base_url}/api/v2/pages/{page_id}/children?type=page&limit={self.CHILD_PAGES_LIMIT}"
+
+    def search_url(self, cql_query: str, start: int, limit: int, expand: Optional[str] = None) -> str:
+        url = f"{self.config.base_url}/rest/api/content/search?cql={quote(cql_query)}&start={start}&limit={limit}"
+        return f"{url}&expand={expand}" if expand else url
+
+    @staticmethod
+    def is_complete_page_v1(result: Dict) -> bool:
+        """Whether a search result expanded with PAGE_V1_EXPAND can stand in for page.v1.
+
+        Confluence leaves expansions out of large search responses (they remain
+        listed in _expandable), so results without both bodies are incomplete.
+        """
+        body = result.get("body") or {}
+        return (
+            bool(result.get("id")) and "title" in result and isinstance(result.get("ancestors"), list)
+            and all(isinstance((body.get(representation) or {}).get("value"), str)
+                    for representation in ("storage", "view"))
+        )
+
+    def next_page_url(self, data: Optional[Dict]) -> Optional[str]:
+        """Return the absolute URL of the next result page given by the _links.next cursor, if any"""
+        next_link = (data or {}).get("_links", {}).get("next")
+        if not next_link:
+            return None
+        return urljoin(self.config.base_url, next_link)
+
+    @staticmethod
+    def merge_result_pages(pages: List[Dict]) -> Optional[Dict]:
+        """Merge paginated responses into one, keeping the first response without its next cursor"""
+        if not pages:
+            return None
+        merged = dict(pages[0])
+        merged["results"] = [result for page in pages for result in page.get("results", [])]
+        links = {key: value for key, value in merged.get("_links", {}).items() if key != "next"}
+        merged["_links"] = links
+        return merged
+
+    def attachments_url(self, page_id: str) -> str:
+        return f"{self.config.base_url}/rest/api/content/{page_id}/child/attachment"
+
+    def attachment_download_url(self, page_id: str, attachment_id: str) -> str:
+        return f"{self.config.base_url}/rest/api/content/{page_id}/child/attachment/{attachment_id}/download"
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt"""
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _retry_delay(self, attempt: int, status_code: int, retry_after: Optional[str]) -> Optional[float]:
+        """Return seconds to wait before retrying a response, or None if it must not be retried.
+
+        Retry-After is honored when the server sends it, up to
+        Config.retry_after_max; otherwise the delay follows exponential backoff
+        with jitter.
+        """
+        if status_code not in RETRY_STATUS_CODES or attempt >= self.config.max_retries:
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            return self._backoff_delay(attempt)
+        if delay > self.config.retry_after_max:
+            self.logger.warning(f"Retry-After of {delay:.0f}s is longer than {self.config.retry_after_max:.0f}s, "
+                                f"retrying after {self.config.retry_after_max:.0f}s")
+            return self.config.retry_after_max
+        return delay
+
+    def _log_retry(self, url: str, delay: float, reason: str, attempt: int) -> None:
+        self.counters.add("api.retries")
+        self.logger.warning(f"Retrying {url} in {delay:.1f}s ({reason}, attempt {attempt}/{self.config.max_retries})")
+
+
+class ApiClient(ApiClientBase):
+    """Handles all API-related operations"""
+
+    # Next result page of a child listing or CQL search, requested while the caller handles the current one
+    PREFETCH_WORKERS = 4
+
+    def __init__(self, config: Config, logger: logging.Logger, rate_limiter: Optional[RequestRateLimiter] = None,
+                 counters: Optional[Counters] = None):
+        super().__init__(config, logger, rate_limiter, counters)
+        self.auth = HTTPBasicAuth(config.email, config.api_token)
+        self.session = self._create_session()
+        self._prefetcher: Optional[ThreadPoolExecutor] = None
+        self._prefetcher_lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        """Create a keep-alive session whose pool is large enough for all workers"""
+        session = requests.Session()
+        session.auth = self.auth
+        concurrency = self.config.workers
+        if self.config.download_attachments:
+            concurrency += self.config.attachment_workers
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=max(self.config.pool_maxsize, concurrency),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(self, url: str, headers: Dict[str, str], stream: bool = False) -> requests.Response:
+        """GET through the shared session, retrying 429/5xx and connection errors.
+
+        The last response is returned once retries are exhausted so that the
+        caller can raise for its status.
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(honor_pause=attempt == 0)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, stream=stream, timeout=self.config.request_timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                reason = str(e)
+            else:
+                self._record_response(url, time.monotonic() - started, response.status_code, response.headers)
+                delay = self._retry_delay(attempt, response.status_code, response.headers.get("Retry-After"))
+                if delay is None:
+                    return response
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            attempt += 1
+            self._log_retry(url, delay, reason, attempt)
+            time.sleep(delay)
 
     def make_request(self, url: str, description: str) -> Optional[Dict]:
         """Make API request and return response"""
         try:
             self.logger.debug(f"Making {description} request to: {url}")
-            response = requests.get(url, headers=self.headers, auth=self.auth)
+            response = self._get(url, self.headers)
             response.raise_for_status()
+            self.counters.add("api.bytes_in", len(response.content))
             return response.json()
         except Exception as e:
             self.logger.error(f"Error making {description} request to {url}: {str(e)}")
@@ -50,32 +216,85 @@ class ApiClient:
 
     def get_page_data_v1(self, page_id: str) -> Optional[Dict]:
         """Get page data using V1 API"""
-        url = f"{self.config.base_url}/rest/api/content/{page_id}?expand=title,ancestors,body.storage,body.view"
-        return self.make_request(url, "V1 API page data")
+        return self.make_request(self.page_v1_url(page_id), "V1 API page data")
 
     def get_page_data_v2(self, page_id: str) -> Optional[Dict]:
         """Get page data using V2 API"""
-        url = f"{self.config.base_url}/api/v2/pages/{page_id}?body-format=atlas_doc_format"
-        return self.make_request(url, "V2 API page data")
+        return self.make_request(self.page_v2_url(page_id), "V2 API page data")
+
+    def get_page_summaries(self, page_ids: List[str]) -> Dict[str, Dict]:
+        """Get id, title, parentId and version of many pages (at most 250) in one V2 API request"""
+        data = self.make_request(self.page_summaries_url(page_ids), "V2 API page summaries")
+        return {str(page["id"]): page for page in (data or {}).get("results", [])}
 
     def get_child_pages(self, page_id: str) -> Optional[Dict]:
-        """Get child pages using V2 API"""
-        url = f"{self.config.base_url}/api/v2/pages/{page_id}/children?type=page&limit=100"
-        return self.make_request(url, "V2 API child pages")
+        """Get child pages using V2 API, following the cursor through every result page"""
+        return self.merge_result_pages(list(self.iter_child_pages(page_id)))
+
+    def iter_child_pages(self, page_id: str) -> Iterator[Dict]:
+        """Yield each result page of child pages.
+
+        The request for the next page is issued as soon as its cursor is known,
+        so it is in flight while the caller handles the current page.
+        """
+        data = self.make_request(self.child_pages_url(page_id), "V2 API child pages")
+        while data is not None:
+            next_url = self.next_page_url(data)
+            future = self._prefetch(next_url, "V2 API child pages") if next_url else None
+            yield data
+            data = future.result() if future else None
+
+    def _prefetch(self, url: str, description: str) -> Future:
+        """Start a request in the background and return its future"""
+        with self._prefetcher_lock:
+            if self._prefetcher is None:
+                self._prefetcher = ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return self._prefetcher.submit(self.make_request, url, description)
+
+    def close(self) -> None:
+        """Stop the prefetch thread; the client can still make requests afterwards"""
+        with self._prefetcher_lock:
+            prefetcher, self._prefetcher = self._prefetcher, None
+        if prefetcher:
+            prefetcher.shutdown(wait=True)
 
     def get_attachments(self, page_id: str) -> Optional[Dict]:
         """Get attachments using V1 API"""
-        url = f"{self.config.base_url}/rest/api/content/{page_id}/child/attachment"
-        return self.make_request(url, "V1 API attachments")
+        return self.make_request(self.attachments_url(page_id), "V1 API attachments")
 
     def get_recently_modified_pages(self, days: int, space_key: str, since_date: Optional[str] = None) -> List[str]:
         """Get a list of page IDs modified since a date or in the last N days.
 
+        See iter_recently_modified_pages for the arguments.
+        """
+        page_ids = [page_id for batch in self.iter_recently_modified_pages(days, space_key, since_date) for page_id in batch]
+        self.logger.info(f"Found {len(page_ids)} recently modified pages")
+        return page_ids
+
+    def iter_recently_modified_pages(self, days: int, space_key: str, since_date: Optional[str] = None) -> Iterator[List[str]]:
+        """Yield page IDs modified since a date or in the last N days, one CQL result page at a time.
+
+        See iter_recently_modified_page_results for the arguments.
+        """
+        for results in self.iter_recently_modified_page_results(days, space_key, since_date):
+            page_ids = [result["id"] for result in results if result.get("id")]
+            if page_ids:
+                yield page_ids
+
+    def iter_recently_modified_page_results(self, days: int, space_key: str, since_date: Optional[str] = None,
+                                            expand: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Yield search results of pages modified since a date or in the last N days, one CQL result page at a time.
+
+        The request for the next result page is issued before the current one is
+        yielded, so the caller can download pages while the search continues.
+
         Args:
             days: Number of days to look back (used when since_date is not provided)
             space_key: Confluence space key
             since_date: ISO 8601 date string (e.g. version.createdAt from page.v2.yaml).
                         If provided, overrides days parameter. A 1-day safety margin is subtracted.
+            expand: Fields to expand in each result, e.g. PAGE_V1_EXPAND to receive page bodies
+                    inline. Confluence may answer with a smaller page size than requested.
         """
         try:
             if since_date:
@@ -92,53 +311,47 @@ class ApiClient:
 
             # Build CQL query
             cql_query = f'lastModified >= "{date_str}" AND type = page AND space = "{space_key}"'
-            encoded_query = quote(cql_query)
-
-            # Use CQL search API
-            url = f"{self.config.base_url}/rest/api/content/search?cql={encoded_query}&limit=1000"
-
             self.logger.debug(f"CQL query: {cql_query}")
+            description = "CQL search for recently modified pages"
 
-            page_ids = []
             start = 0
-            limit = 100
-
-            while True:
-                paginated_url = f"{url}&start={start}&limit={limit}"
-                response_data = self.make_request(paginated_url, "CQL search for recently modified pages")
-
-                if not response_data:
-                    break
+            limit = self.SEARCH_LIMIT
+            response_data = self.make_request(self.search_url(cql_query, start, limit, expand), description)
 
+            while response_data:
                 results = response_data.get("results", [])
                 if not results:
                     break
 
-                for result in results:
-                    page_id = result.get("id")
-                    if page_id:
-                        page_ids.append(page_id)
+                # Check if there are more results, and request them before handing out this page.
+                # The server reports the page size it applied, which is capped when bodies are expanded.
+                future = None
+                if len(results) >= response_data.get("limit", limit):
+                    start += len(results)
+                    future = self._prefetch(self.search_url(cql_query, start, limit, expand), description)
 
-                # Check if there are more results
-                if len(results) < limit:
-                    break
+                yield results
 
-                start += limit
-
-            self.logger.info(f"Found {len(page_ids)} recently modified pages")
-            return page_ids
+                response_data = future.result() if future else None
 
         except Exception as e:
             self.logger.error(f"Error getting recently modified pages: {str(e)}")
             raise ApiError(f"Failed to get recently modified pages: {str(e)}")
 
-    def download_attachment(self, page_id: str, attachment_id: str) -> Optional[bytes]:
-        """Download attachment content"""
+    def iter_attachment_chunks(self, page_id: str, attachment_id: str) -> Iterator[bytes]:
+        """Stream attachment content in chunks of Config.download_chunk_size bytes"""
         try:
-            url = f"{self.config.base_url}/rest/api/content/{page_id}/child/attachment/{attachment_id}/download"
-            response = requests.get(url, headers={"Accept": "*/*"}, auth=self.auth)
+            response = self._get(self.attachment_download_url(page_id, attachment_id), {"Accept": "*/*"}, stream=True)
             response.raise_for_status()
-            return response.content
         except Exception as e:
             self.logger.error(f"Error downloading attachment {attachment_id}: {str(e)}")
             raise ApiError(f"Failed to download attachment: {str(e)}")
+
+        with response:
+            try:
+                for chunk in response.iter_content(chunk_size=self.config.download_chunk_size):
+                    self.counters.add("api.bytes_in", len(chunk))
+                    yield chunk
+            except Exception as e:
+                self.logger.error(f"Error downloading attachment {attachment_id}: {str(e)}")
+                raise ApiError(f"Failed to download attachment: {str(e)}")
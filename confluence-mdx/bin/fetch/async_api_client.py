@@ -0,0 +1,141 @@
+"""Asyncio Confluence REST API client built on httpx."""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, Optional, Protocol
+
+try:
+    import httpx
+except ImportError:  # Only required for the async backend
+    httpx = None
+
+from fetch.api_client import ApiClientBase
+from fetch.config import Config
+from fetch.exceptions import ApiError
+from fetch.report import Counters
+from rate_limiter import RequestRateLimiter
+
+
+class AsyncApiClientProtocol(Protocol):
+    """Protocol for asynchronous API client operations"""
+
+    async def make_request(self, url: str, description: str) -> Optional[Dict]:
+        ...
+
+    async def get_page_data_v1(self, page_id: str) -> Optional[Dict]:
+        ...
+
+    async def get_page_data_v2(self, page_id: str) -> Optional[Dict]:
+        ...
+
+    async def get_child_pages(self, page_id: str) -> Optional[Dict]:
+        ...
+
+    async def get_attachments(self, page_id: str) -> Optional[Dict]:
+        ...
+
+
+class AsyncApiClient(ApiClientBase):
+    """Asynchronous counterpart of ApiClient with a global in-flight request cap.
+
+    Must be used as an async context manager so that the underlying
+    connection pool and semaphore belong to the running event loop.
+    """
+
+    def __init__(self, config: Config, logger: logging.Logger, rate_limiter: Optional[RequestRateLimiter] = None,
+                 counters: Optional[Counters] = None):
+        if httpx is None:
+            raise SystemExit(
+                "Required package 'httpx' is not installed for the async backend.\n"
+                "Run: pip install 'httpx>=0.27.0'"
+            )
+        super().__init__(config, logger, rate_limiter, counters)
+        self.client: Optional["httpx.AsyncClient"] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        limits = httpx.Limits(
+            max_connections=self.config.max_in_flight,
+            max_keepalive_connections=self.config.max_in_flight,
+        )
+        self.client = httpx.AsyncClient(
+            auth=(self.config.email, self.config.api_token),
+            limits=limits,
+            timeout=self.config.request_timeout,
+        )
+        self.semaphore = asyncio.Semaphore(self.config.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.client.aclose()
+        self.client = None
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> "httpx.Response":
+        """GET with the same retry policy and rate limit as ApiClient._get, holding the semaphore per attempt"""
+        attempt = 0
+        while True:
+            delay = self.rate_limiter.reserve(honor_pause=attempt == 0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                async with self.semaphore:
+                    response = await self.client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                reason = str(e) or type(e).__name__
+            else:
+                self._record_response(url, time.monotonic() - started, response.status_code, response.headers)
+                delay = self._retry_delay(attempt, response.status_code, response.headers.get("Retry-After"))
+                if delay is None:
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            attempt += 1
+            self._log_retry(url, delay, reason, attempt)
+            await asyncio.sleep(delay)
+
+    async def make_request(self, url: str, description: str) -> Optional[Dict]:
+        """Make API request and return response"""
+        try:
+            self.logger.debug(f"Making {description} request to: {url}")
+            response = await self._get(url, self.headers)
+            response.raise_for_status()
+            self.counters.add("api.bytes_in", len(response.content))
+            return response.json()
+        except Exception as e:
+            self.logger.error(f"Error making {description} request to {url}: {str(e)}")
+            raise ApiError(f"Failed to make {description} request: {str(e)}")
+
+    async def get_page_data_v1(self, page_id: str) -> Optional[Dict]:
+        """Get page data using V1 API"""
+        return await self.make_request(self.page_v1_url(page_id), "V1 API page data")
+
+    async def get_page_data_v2(self, page_id: str) -> Optional[Dict]:
+        """Get page data using V2 API"""
+        return await self.make_request(self.page_v2_url(page_id), "V2 API page data")
+
+    async def get_child_pages(self, page_id: str) -> Optional[Dict]:
+        """Get child pages using V2 API, following the cursor through every result page"""
+        return self.merge_result_pages([data async for data in self.iter_child_pages(page_id)])
+
+    async def iter_child_pages(self, page_id: str) -> AsyncIterator[Dict]:
+        """Yield each result page of child pages, with the request for the next one already running"""
+        data = await self.make_request(self.child_pages_url(page_id), "V2 API child pages")
+        while data is not None:
+            next_url = self.next_page_url(data)
+            task = asyncio.ensure_future(self.make_request(next_url, "V2 API child pages")) if next_url else None
+            try:
+                yield data
+            except BaseException:
+                if task:
+                    task.cancel()
+                raise
+            data = await task if task else None
+
+    async def get_attachments(self, page_id: str) -> Optional[Dict]:
+        """Get attachments using V1 API"""
+        return await self.make_request(self.attachments_url(page_id), "V1 API attachments")
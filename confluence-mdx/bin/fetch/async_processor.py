@@ -0,0 +1,183 @@
+"""Asyncio variant of the Confluence page processing orchestrator."""
+
+import asyncio
+import traceback
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+from fetch.async_api_client import AsyncApiClient
+from fetch.models import Page
+from fetch.processor import ConfluencePageProcessor
+from fetch.stages import PageContext, Stage1Processor
+
+
+class AsyncStage1Processor(Stage1Processor):
+    """Stage 1 issuing all API requests of a page concurrently."""
+
+    async def process_async(self, page_id: str, context: Optional[PageContext] = None) -> bool:
+        self.logger.info(f"Stage 1: Collecting API data for page ID {page_id}")
+
+        if self.config.mode == "local":
+            self.logger.info(f"Stage 1 skipped for page ID {page_id} (local mode)")
+            return True
+
+        directory = self.get_page_directory(page_id)
+        self.file_manager.ensure_directory(directory)
+
+        operations = await asyncio.to_thread(self.operations_for, page_id, directory)
+
+        async def collect(method_name: str, name: str) -> Optional[Dict]:
+            primed = context.take_primed(name) if context is not None else None
+            return primed if primed is not None else await getattr(self.api_client, method_name)(page_id)
+
+        results = await asyncio.gather(
+            *(collect(method_name, name) for method_name, _, name in operations),
+            return_exceptions=True,
+        )
+
+        # Save in the same order as the sync path so that var/ output is identical
+        collected = True
+        for (_, description, name), result in zip(operations, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to collect {description} for page ID {page_id}: {str(result)}")
+                collected = False
+                continue
+            try:
+                await asyncio.to_thread(self.save_api_result, page_id, directory, description, name, result, context)
+            except Exception as e:
+                self.logger.error(f"Failed to collect {description} for page ID {page_id}: {str(e)}")
+                collected = False
+
+        await asyncio.to_thread(self.mark_fetched, page_id)
+        self.logger.info(f"Stage 1 completed for page ID {page_id}")
+        return collected
+
+
+class AsyncConfluencePageProcessor(ConfluencePageProcessor):
+    """ConfluencePageProcessor whose API-bound work runs on an asyncio event loop.
+
+    Stage 1 requests go through AsyncApiClient, capped globally by
+    Config.max_in_flight. Stages 2-4 are file-bound and run in worker threads.
+    Local-mode tree walks are not API-bound and fall back to the sync path.
+    """
+
+    def fetch_page_tree(self, page_id: str, start_page_id: Optional[str] = None, use_local: bool = False) -> Generator[Page, None, None]:
+        if use_local:
+            return super().fetch_page_tree(page_id, start_page_id, use_local)
+        if start_page_id is None:
+            start_page_id = page_id
+        results = asyncio.run(self._fetch_page_tree_async(page_id, start_page_id))
+        return self._iter_depth_first(page_id, results)
+
+    def download_page_batches(self, page_id_batches: Iterable[List[str]], start_page_id: str) -> List[Page]:
+        return asyncio.run(self._download_pages_async(page_id_batches, start_page_id))
+
+    async def _fetch_page_tree_async(self, page_id: str, start_page_id: str) -> Dict[str, Tuple[Optional[Page], List[str]]]:
+        """Walk the tree, expanding every child as soon as its parent is processed"""
+        self.logger.info(f"Processing page tree for page ID {page_id} with async backend")
+        results: Dict[str, Tuple[Optional[Page], List[str]]] = {}
+        scheduled = {page_id}
+
+        async with AsyncApiClient(self.config, self.logger, self.api_client.rate_limiter,
+                                  self.report.counters) as client:
+            stage1 = AsyncStage1Processor(self.config, client, self.file_manager, self.logger, self.version_index,
+                                          self.manifest, self.writer)
+
+            async def visit(node_id: str) -> None:
+                page, child_ids = await self._process_page_async(stage1, node_id, start_page_id)
+                results[node_id] = (page, child_ids)
+                children = [child_id for child_id in child_ids if child_id not in scheduled]
+                scheduled.update(children)
+                await asyncio.to_thread(self.prefetch_versions, children)
+                await asyncio.gather(*(visit(child_id) for child_id in children))
+
+            await visit(page_id)
+
+        return results
+
+    async def _download_pages_async(self, page_id_batches: Iterable[List[str]], start_page_id: str) -> List[Page]:
+        """Start downloading each batch while the next one is still being fetched.
+
+        Like the sync path, pages are printed in input order, each one as soon
+        as it and the pages before it are done.
+        """
+        batches = iter(page_id_batches)
+        # Download task of each page in input order, then None once every batch is scheduled
+        queue: "asyncio.Queue[Optional[asyncio.Future]]" = asyncio.Queue()
+        pages = []
+        async with AsyncApiClient(self.config, self.logger, self.api_client.rate_limiter,
+                                  self.report.counters) as client:
+            stage1 = AsyncStage1Processor(self.config, client, self.file_manager, self.logger, self.version_index,
+                                          self.manifest, self.writer)
+
+            async def schedule() -> None:
+                try:
+                    while True:
+                        batch = await asyncio.to_thread(next, batches, None)
+                        if batch is None:
+                            break
+                        await asyncio.to_thread(self.prefetch_versions, batch)
+                        for page_id in batch:
+                            queue.put_nowait(asyncio.ensure_future(self._process_page_async(stage1, page_id, start_page_id)))
+                finally:
+                    queue.put_nowait(None)
+
+            scheduler = asyncio.ensure_future(schedule())
+            try:
+                while (task := await queue.get()) is not None:
+                    page, _ = await task
+                    if page:
+                        self.print_page(page)
+                        pages.append(page)
+                await scheduler  # Raises the error of the batch iterator, if any
+            except BaseException:
+                scheduler.cancel()
+                raise
+        return pages
+
+    async def _process_page_async(self, stage1: AsyncStage1Processor, page_id: str, start_page_id: str) -> Tuple[Optional[Page], List[str]]:
+        """Process a single page through all 4 stages and return it with its child page IDs"""
+        try:
+            context = self.create_download_context(page_id)
+            if page_id in self.resumed:
+                return await asyncio.to_thread(self._resume_page, page_id, start_page_id, context)
+            self.logger.info(f"Processing page ID {page_id} through all stages")
+            with self.report.stage("stage1", page_id):
+                collected = await stage1.process_async(page_id, context)
+            self.journal_stage1(page_id, collected)
+            return await asyncio.to_thread(self._complete_page, page_id, start_page_id, context)
+        except Exception as e:
+            self.logger.error(f"Error processing page ID {page_id}: {str(e)}")
+            self.logger.debug(traceback.format_exc())
+            return None, []
+
+    def _resume_page(self, page_id: str, start_page_id: str,
+                     context: PageContext) -> Tuple[Optional[Page], List[str]]:
+        page = self.resume_page(page_id, start_page_id, context)
+        if not page:
+            return None, []
+        self.apply_translation(page)
+        return page, self.get_child_page_ids(page_id, context) or []
+
+    def _complete_page(self, page_id: str, start_page_id: str,
+                       context: PageContext) -> Tuple[Optional[Page], List[str]]:
+        """Run Stage 2-4 for a page whose API data has been collected into context"""
+        try:
+            with self.report.stage("stage2", page_id):
+                self.stage2.process(page_id, context)
+            self.journal_stage(page_id, "stage2")
+            with self.report.stage("stage3", page_id):
+                self.stage3.process(page_id, context)
+            with self.report.stage("stage4", page_id):
+                page = self.stage4.process(page_id, start_page_id, context)
+            if page:
+                self.journal_stage(page_id, "stage4")
+            self.logger.info(f"Completed all stages for page ID {page_id}")
+        except Exception as e:
+            self.logger.error(f"Error processing page ID {page_id}: {str(e)}")
+            return None, []
+
+        if not page:
+            return None, []
+
+        self.apply_translation(page)
+        return page, self.get_child_page_ids(page_id, context) or []
@@ -0,0 +1,98 @@
+"""Content-addressed attachment store under cache/."""
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from fetch.config import Config
+from fetch.exceptions import FileError
+from fetch.file_manager import FileManager
+
+
+class AttachmentCache:
+    """Store attachment bodies once per content and link them into var/.
+
+    Layout:
+      cache/objects/<sha256>                     attachment body
+      cache/refs/<attachment_id>/<version_key>   SHA-256 of that attachment version
+
+    The version key is extensions.fileId, which changes with every upload of
+    a new attachment version, or version.number when fileId is not available.
+    Attachments with neither are not cached and always downloaded.
+    Identical files attached to several pages share one object.
+
+    Files in var/ are hardlinks to the objects where possible, so they must
+    be replaced (FileManager.save_stream, link_file) rather than edited in place.
+    """
+
+    def __init__(self, config: Config, file_manager: FileManager, logger: logging.Logger):
+        self.config = config
+        self.file_manager = file_manager
+        self.logger = logger
+        self.objects_dir = os.path.join(config.cache_dir, "objects")
+        self.refs_dir = os.path.join(config.cache_dir, "refs")
+
+    @staticmethod
+    def version_key(attachment: Dict) -> Optional[str]:
+        """Return the key identifying the current version of an attachment"""
+        extensions = attachment.get("extensions", {})
+        if extensions.get("fileId"):
+            return str(extensions["fileId"])
+        number = attachment.get("version", {}).get("number")
+        if number is not None:
+            return f"version-{number}"
+        return None
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256)
+
+    def _ref_path(self, attachment_id: str, version_key: str) -> str:
+        return os.path.join(self.refs_dir, attachment_id, version_key)
+
+    def lookup(self, attachment: Dict, expected_size: Optional[int] = None) -> Optional[str]:
+        """Return the SHA-256 of a cached attachment version, or None if it is not cached"""
+        version_key = self.version_key(attachment)
+        if not version_key:
+            return None
+        ref_path = self._ref_path(attachment["id"], version_key)
+        try:
+            with open(ref_path, "r", encoding="utf-8") as f:
+                sha256 = f.read().strip()
+        except OSError:
+            return None
+
+        object_path = self.object_path(sha256)
+        if not os.path.exists(object_path):
+            return None
+        if expected_size is not None and os.path.getsize(object_path) != expected_size:
+            self.logger.warning(f"Cached object {sha256} has unexpected size for attachment {attachment['id']}")
+            return None
+        return sha256
+
+    def store(self, attachment: Dict, chunks: Iterable[bytes], expected_size: Optional[int] = None) -> Tuple[int, str]:
+        """Write chunks into the object store and record them for the attachment version.
+
+        Returns:
+            Tuple of (size in bytes, SHA-256 hex digest)
+        """
+        incoming_path = os.path.join(self.objects_dir, f".incoming-{attachment['id']}.{threading.get_ident()}")
+        size, sha256 = self.file_manager.save_stream(incoming_path, chunks, expected_size)
+        object_path = self.object_path(sha256)
+        try:
+            if os.path.exists(object_path) and os.path.getsize(object_path) == size:
+                # Same content already stored (e.g. the same image on another page)
+                os.remove(incoming_path)
+            else:
+                os.replace(incoming_path, object_path)
+        except OSError as e:
+            raise FileError(f"Failed to store cache object {sha256}: {str(e)}")
+
+        version_key = self.version_key(attachment)
+        if version_key:
+            self.file_manager.save_file(self._ref_path(attachment["id"], version_key), sha256)
+        return size, sha256
+
+    def link(self, sha256: str, filepath: str) -> str:
+        """Place a cached object at filepath; returns the method used"""
+        return self.file_manager.link_file(self.object_path(sha256), filepath)
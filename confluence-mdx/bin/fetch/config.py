@@ -18,8 +18,31 @@ class Config:
     translations_file: str = "etc/korean-titles-translations.txt"
     email: Optional[str] = None
     api_token: Optional[str] = None
+    storage_format: str = "json"  # Format of raw API responses in var/<page_id>/: "json", "json.zst" or "yaml"
     download_attachments: bool = False
+    attachment_workers: int = 4  # Maximum concurrent attachment downloads across all pages
+    attachment_rate_limit: int = 0  # Combined attachment download rate in bytes per second (0 = unlimited)
+    progress_interval: float = 10.0  # Seconds between attachment download progress messages
+    skip_unchanged: bool = True  # Skip page body requests when version, title and parent are unchanged
+    bulk_bodies: bool = True  # In recent mode, take page.v1 from the CQL search results instead of one request per page
     mode: str = "recent"  # Mode: "local", "remote", or "recent"
+    incremental_tree: bool = True  # In recent mode, update the previous pages.yaml around changed pages instead of walking the tree
+    resume: bool = False  # Skip pages completed by the interrupted run recorded in var/fetch-journal.jsonl
+    subtree_page_id: Optional[str] = None  # Refresh only this page and its descendants in pages.yaml and list.txt
+    workers: int = 1  # Number of pages processed concurrently during the page tree walk
+    local_processes: int = 0  # Processes parsing var/ for the local page tree walk (0 = one per CPU, 1 = in-process)
+    backend: str = "sync"  # API backend: "sync" (requests, thread pool) or "async" (httpx, asyncio)
+    max_in_flight: int = 16  # Maximum concurrent API requests with the async backend
+    rate_limit: float = 0.0  # Maximum API requests per second across all workers (0 = unlimited)
+    rate_burst: int = 10  # API requests allowed at once before rate_limit applies
+    pool_connections: int = 4  # Number of per-host connection pools kept by the HTTP session
+    pool_maxsize: int = 16  # Maximum keep-alive connections per host (raised to workers if lower)
+    request_timeout: float = 60.0  # Seconds to wait for connect/read on a single request
+    download_chunk_size: int = 64 * 1024  # Bytes read per chunk when streaming attachments
+    max_retries: int = 5  # Retries for 429, 5xx and connection errors
+    backoff_base: float = 1.0  # Initial retry backoff in seconds, doubled on every attempt
+    backoff_max: float = 60.0  # Upper bound of a single backoff sleep without Retry-After
+    retry_after_max: float = 300.0  # Longest Retry-After or X-RateLimit-Reset wait honored; longer ones are clamped
 
     def __post_init__(self):
         if self.email is None:
@@ -0,0 +1,178 @@
+"""Shared attachment download queue with a global concurrency cap and rate limit."""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Set
+
+from fetch.config import Config
+
+
+def parse_byte_rate(value: str) -> int:
+    """Parse a bytes-per-second limit such as "500K", "2M" or "1048576" (0 = unlimited)"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid byte rate: {value!r}")
+    number, unit = match.groups()
+    multiplier = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}[unit.upper()]
+    return int(float(number) * multiplier)
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for progress messages"""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class ByteRateLimiter:
+    """Token bucket shared by all download threads.
+
+    The bucket holds up to one second worth of bytes. A consumer that takes
+    more than what is available goes into debt and sleeps until it is repaid,
+    so the long-run rate never exceeds bytes_per_second.
+    """
+
+    def __init__(self, bytes_per_second: int, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = float(bytes_per_second)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.rate
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int) -> None:
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= nbytes
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self.sleep(delay)
+
+
+class DownloadProgress:
+    """Thread-safe counters of queued and finished attachment downloads"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.files_total = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.bytes_done = 0
+        self.started = clock()
+        self._lock = threading.Lock()
+
+    def add_file(self) -> None:
+        with self._lock:
+            self.files_total += 1
+
+    def add_bytes(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes_done += nbytes
+
+    def finish_file(self, ok: bool) -> None:
+        with self._lock:
+            self.files_done += 1
+            if not ok:
+                self.files_failed += 1
+
+    def throughput(self) -> float:
+        """Bytes per second since the first download was queued"""
+        elapsed = self.clock() - self.started
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        failed = f", {self.files_failed} failed" if self.files_failed else ""
+        return (f"Attachments: {self.files_done}/{self.files_total} files{failed}, "
+                f"{format_bytes(self.bytes_done)}, {format_bytes(self.throughput())}/s")
+
+
+class AttachmentDownloadScheduler:
+    """Download attachments of all pages from one queue.
+
+    At most Config.attachment_workers downloads run at once, and the combined
+    transfer rate is capped by Config.attachment_rate_limit (bytes per second,
+    0 for unlimited). Only API downloads are queued; attachments found in the
+    cache are linked by Stage 3 directly. Progress is logged every
+    Config.progress_interval seconds and once more when the queue is drained.
+    """
+
+    def __init__(self, config: Config, logger: logging.Logger):
+        self.config = config
+        self.logger = logger
+        self.executor = ThreadPoolExecutor(max_workers=config.attachment_workers, thread_name_prefix="attachment")
+        self.limiter = ByteRateLimiter(config.attachment_rate_limit) if config.attachment_rate_limit > 0 else None
+        self.progress = DownloadProgress()
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._last_report = self.progress.started
+
+    def submit(self, fn: Callable[..., Optional[object]], *args,
+               callback: Optional[Callable[[Optional[object]], None]] = None) -> Future:
+        """Queue fn(*args); a None result counts as a failed download. callback receives the result."""
+        self.progress.add_file()
+        future = self.executor.submit(self._run, fn, args, callback)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, fn: Callable[..., Optional[object]], args: tuple,
+             callback: Optional[Callable[[Optional[object]], None]]) -> Optional[object]:
+        result = None
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.logger.error(f"Attachment download failed: {str(e)}")
+        finally:
+            self.progress.finish_file(result is not None)
+            if callback:
+                try:
+                    callback(result)
+                except Exception as e:
+                    self.logger.error(f"Attachment download callback failed: {str(e)}")
+            self._maybe_report()
+        return result
+
+    def throttle(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass chunks through the shared rate limit, counting transferred bytes"""
+        for chunk in chunks:
+            if self.limiter:
+                self.limiter.consume(len(chunk))
+            self.progress.add_bytes(len(chunk))
+            self._maybe_report()
+            yield chunk
+
+    def _maybe_report(self) -> None:
+        now = self.progress.clock()
+        with self._lock:
+            if now - self._last_report < self.config.progress_interval:
+                return
+            self._last_report = now
+        self.logger.warning(self.progress.summary())
+
+    def join(self) -> None:
+        """Wait until every queued download, including ones queued meanwhile, has finished"""
+        while True:
+            with self._lock:
+                futures = set(self._futures)
+            if not futures:
+                break
+            wait(futures)
+        if self.progress.files_total:
+            self.logger.warning(self.progress.summary())
+
+    def close(self) -> None:
+        self.join()
+        self.executor.shutdown(wait=True)
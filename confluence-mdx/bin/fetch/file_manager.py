@@ -1,12 +1,21 @@
 """File I/O operations for Confluence data."""
 
+import errno
+import fcntl
+import hashlib
 import logging
 import os
-from typing import Dict, Optional, Any, Protocol
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol, Set, Tuple, Union
 
 import yaml
 
-from fetch.exceptions import FileError
+import raw_store
+from fetch.exceptions import ConfluenceError, FileError
+from fetch.report import Counters
 
 
 class FileManagerProtocol(Protocol):
@@ -15,12 +24,21 @@ class FileManagerProtocol(Protocol):
     def save_file(self, filepath: str, content: Any, is_binary: bool = False) -> bool:
         ...
 
+    def save_stream(self, filepath: str, chunks: Iterable[bytes], expected_size: Optional[int] = None) -> Tuple[int, str]:
+        ...
+
     def save_yaml(self, filepath: str, data: Any) -> bool:
         ...
 
     def load_yaml(self, filepath: str) -> Optional[Dict]:
         ...
 
+    def save_raw(self, directory: str, name: str, data: Any) -> str:
+        ...
+
+    def load_raw(self, directory: str, name: str) -> Optional[Dict]:
+        ...
+
     def ensure_directory(self, directory: str) -> bool:
         ...
 
@@ -28,8 +46,12 @@ class FileManagerProtocol(Protocol):
 class FileManager:
     """Handles all file I/O operations"""
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, storage_format: str = raw_store.DEFAULT_FORMAT,
+                 counters: Optional[Counters] = None):
+        raw_store.check_format(storage_format)
         self.logger = logger
+        self.storage_format = storage_format
+        self.counters = counters or Counters()
 
     def ensure_directory(self, directory: str) -> bool:
         """Ensure directory exists"""
@@ -41,24 +63,116 @@ class FileManager:
             raise FileError(f"Failed to create directory: {str(e)}")
 
     def save_file(self, filepath: str, content: Any, is_binary: bool = False) -> bool:
-        """Save content to file"""
+        """Save content to a temporary file and atomically rename it to filepath.
+
+        A crash while writing leaves the previous file (or none) in place,
+        never a partially written one.
+        """
+        directory = os.path.dirname(filepath)
+        temp_path = os.path.join(directory, f".{os.path.basename(filepath)}.{os.getpid()}.{threading.get_ident()}.tmp")
         try:
-            self.ensure_directory(os.path.dirname(filepath))
+            self.ensure_directory(directory)
             mode = 'wb' if is_binary else 'w'
             encoding = None if is_binary else 'utf-8'
 
-            with open(filepath, mode, encoding=encoding) as f:
-                f.write(content)
+            with self.counters.timed("files.seconds"):
+                with open(temp_path, mode, encoding=encoding) as f:
+                    f.write(content)
+                    self.counters.add("files.bytes_out", f.tell())
+                os.replace(temp_path, filepath)
+            self.counters.add("files.written")
 
             self.logger.debug(f"Saved {len(content)} bytes to {filepath}")
             return True
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             self.logger.error(f"Error saving file {filepath}: {str(e)}")
             raise FileError(f"Failed to save file: {str(e)}")
 
+    def save_stream(self, filepath: str, chunks: Iterable[bytes], expected_size: Optional[int] = None) -> Tuple[int, str]:
+        """Write chunks to a temporary file and atomically rename it to filepath.
+
+        The SHA-256 digest is computed while writing. When expected_size is
+        given and does not match, the temporary file is discarded and the
+        existing file at filepath is left untouched.
+
+        Returns:
+            Tuple of (size in bytes, SHA-256 hex digest)
+        """
+        directory = os.path.dirname(filepath)
+        self.ensure_directory(directory)
+        fd, temp_path = tempfile.mkstemp(dir=directory or None, prefix=f".{os.path.basename(filepath)}.", suffix=".part")
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+            if expected_size is not None and size != expected_size:
+                raise FileError(f"Size mismatch for {filepath}: got {size} bytes, expected {expected_size} bytes")
+
+            os.replace(temp_path, filepath)
+            self.counters.add("files.written")
+            self.counters.add("files.bytes_out", size)
+            self.logger.debug(f"Saved {size} bytes to {filepath}")
+            return size, digest.hexdigest()
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if isinstance(e, ConfluenceError):
+                raise
+            self.logger.error(f"Error saving file {filepath}: {str(e)}")
+            raise FileError(f"Failed to save file: {str(e)}")
+
+    def link_file(self, source: str, filepath: str) -> str:
+        """Place source at filepath as a hardlink, reflink or copy, replacing filepath atomically.
+
+        Returns the method used: "hardlink", "reflink" or "copy".
+        """
+        directory = os.path.dirname(filepath)
+        self.ensure_directory(directory)
+        temp_path = os.path.join(directory, f".{os.path.basename(filepath)}.{os.getpid()}.{threading.get_ident()}.link")
+        try:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            try:
+                os.link(source, temp_path)
+                method = "hardlink"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+                method = self._reflink_or_copy(source, temp_path)
+            os.replace(temp_path, filepath)
+            self.logger.debug(f"Linked {source} to {filepath} ({method})")
+            return method
+        except Exception as e:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            self.logger.error(f"Error linking {source} to {filepath}: {str(e)}")
+            raise FileError(f"Failed to link file: {str(e)}")
+
+    @staticmethod
+    def _reflink_or_copy(source: str, target: str) -> str:
+        """Clone source with FICLONE where the filesystem supports it, otherwise copy it"""
+        ficlone = 0x40049409  # FICLONE ioctl on Linux (btrfs, xfs, ...)
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), ficlone, src.fileno())
+                return "reflink"
+            except OSError:
+                shutil.copyfileobj(src, dst)
+        shutil.copystat(source, target)
+        return "copy"
+
     def save_yaml(self, filepath: str, data: Any) -> bool:
         """Save YAML data to a file with quoted strings"""
-        return self.save_file(filepath, yaml.dump(data, allow_unicode=True, sort_keys=False, default_style='"'))
+        with self.counters.timed("files.encode_seconds"):
+            content = yaml.dump(data, allow_unicode=True, sort_keys=False, default_style='"')
+        return self.save_file(filepath, content)
 
     def load_yaml(self, filepath: str) -> Optional[Dict]:
         """Read YAML from a file"""
@@ -70,3 +184,93 @@ class FileManager:
             self.logger.error(f"Error loading YAML from {filepath}: {str(e)}")
             raise FileError(f"Failed to load YAML: {str(e)}")
         return None
+
+    def save_raw(self, directory: str, name: str, data: Any) -> str:
+        """Save a raw API response (page.v1, children.v2, ...) in the configured storage format.
+
+        Copies of the same document in other formats are removed, so that readers
+        never pick up a stale one. Returns the path written.
+        """
+        filepath = raw_store.raw_path(directory, name, self.storage_format)
+        with self.counters.timed("files.encode_seconds"):
+            content = raw_store.encode(data, self.storage_format)
+        self.save_file(filepath, content, is_binary=True)
+        for fmt in raw_store.FORMATS:
+            other_path = raw_store.raw_path(directory, name, fmt)
+            if fmt != self.storage_format and os.path.exists(other_path):
+                os.remove(other_path)
+        return filepath
+
+    def load_raw(self, directory: str, name: str) -> Optional[Dict]:
+        """Read a raw API response in whichever format it is stored, or None if it does not exist"""
+        try:
+            return raw_store.load_raw(directory, name)
+        except Exception as e:
+            self.logger.error(f"Error loading {name} from {directory}: {str(e)}")
+            raise FileError(f"Failed to load {name}: {str(e)}")
+
+    def has_raw(self, directory: str, name: str) -> bool:
+        """Check whether a raw API response is stored in any format"""
+        return raw_store.find_raw(directory, name) is not None
+
+
+class WriteBehindWriter:
+    """Save raw API responses on a background thread.
+
+    Stage 1 hands each response to the later stages in memory (see
+    stages.PageContext), so encoding and writing it is off the critical path.
+    At most max_pending documents wait in the queue; a full queue blocks the
+    producer instead of holding an unbounded amount of page bodies in memory.
+    Call flush() before anything reads the written files back.
+    """
+
+    def __init__(self, file_manager: FileManager, logger: logging.Logger, max_pending: int = 256):
+        self.file_manager = file_manager
+        self.logger = logger
+        self.failures = 0
+        self.failed_directories: Set[str] = set()
+        self._queue: "queue.Queue[Optional[Union[Tuple[str, str, Any], Callable[[], None]]]]" = queue.Queue(
+            maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def save_raw(self, directory: str, name: str, data: Any) -> str:
+        """Queue a raw document for saving and return the path it will be written to"""
+        self._queue.put((directory, name, data))
+        return raw_store.raw_path(directory, name, self.file_manager.storage_format)
+
+    def after_pending(self, callback: Callable[[], None]) -> None:
+        """Call callback on the writer thread once every document queued so far has been written"""
+        self._queue.put(callback)
+
+    def flush(self) -> None:
+        """Block until every queued document has been written"""
+        self._queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if callable(item):
+                    try:
+                        item()
+                    except Exception as e:
+                        self.logger.error(f"Write-behind callback failed: {str(e)}")
+                    continue
+                directory, name, data = item
+                try:
+                    self.file_manager.save_raw(directory, name, data)
+                except Exception as e:
+                    self.failures += 1
+                    self.failed_directories.add(directory)
+                    self.logger.error(f"Failed to save {name} in {directory}: {str(e)}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,127 @@
+"""Append-only journal of per-page stage completion kept in var/fetch-journal.jsonl."""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, IO, List, Optional, Set
+
+from fetch.manifest import utc_now
+
+
+class FetchJournal:
+    """Records which pages finished which stage, so an interrupted fetch can be resumed.
+
+    One JSON object per line, appended and flushed as each stage completes:
+
+        {"event": "start", "mode": "remote", "start_page_id": "...", "subtree": null, "at": "..."}
+        {"event": "stage", "page_id": "...", "stage": "stage1", "stale": true}
+        {"event": "resume", "at": "..."}
+        {"event": "finish", "at": "..."}
+
+    A page is complete once all of STAGES are recorded for it. Stage 1 is
+    recorded only after its raw responses are on disk and Stage 3 only after
+    every attachment of the page has been stored. A line cut short by a crash
+    is ignored when the journal is read back. A run that is not resumed
+    replaces the journal, so it only ever describes the latest run.
+    """
+
+    FILENAME = "fetch-journal.jsonl"
+    STAGES = ("stage1", "stage2", "stage3", "stage4")
+
+    def __init__(self, path: str, logger: logging.Logger):
+        self.path = path
+        self.logger = logger
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str, logger: logging.Logger) -> "FetchJournal":
+        return cls(os.path.join(output_dir, cls.FILENAME), logger)
+
+    def read(self) -> List[Dict]:
+        """Return the events of the journal, skipping lines that were not written completely"""
+        if not os.path.exists(self.path):
+            return []
+        events = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Ignoring incomplete line {number} of {self.path}")
+                    continue
+                if isinstance(event, dict):
+                    events.append(event)
+        return events
+
+    def begin(self, mode: str, start_page_id: str, subtree_page_id: Optional[str] = None,
+              resume: bool = False) -> List[Dict]:
+        """Open the journal for a run, and return the stage events of the interrupted run being resumed.
+
+        Without resume, or when the journal describes a finished run or a
+        different one (mode, start page or subtree), a new journal is started
+        and the returned list is empty.
+        """
+        start = {"event": "start", "mode": mode, "start_page_id": start_page_id, "subtree": subtree_page_id}
+        events = self.read() if resume else []
+        resumable = (
+            bool(events) and events[-1].get("event") != "finish"
+            and {key: events[0].get(key) for key in start} == start
+        )
+        if resume and not resumable:
+            self.logger.warning(f"No interrupted {mode} run in {self.path} to resume, fetching everything")
+
+        if resumable:
+            self._open("a")
+            self._append({"event": "resume", "at": utc_now()})
+            return [event for event in events if event.get("event") == "stage"]
+
+        # Start a new journal atomically, so a crash never leaves the previous run half overwritten
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(dict(start, at=utc_now()), ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.path)
+        self._open("a")
+        return []
+
+    @classmethod
+    def completed_pages(cls, events: List[Dict]) -> Set[str]:
+        """IDs of the pages for which every stage has been recorded"""
+        stages: Dict[str, Set[str]] = {}
+        for event in events:
+            stages.setdefault(event.get("page_id"), set()).add(event.get("stage"))
+        return {page_id for page_id, done in stages.items() if page_id and done.issuperset(cls.STAGES)}
+
+    def record(self, page_id: str, stage: str, **fields) -> None:
+        """Append the completion of a stage of a page"""
+        self._append(dict({"event": "stage", "page_id": page_id, "stage": stage}, **fields))
+
+    def finish(self) -> None:
+        """Mark the run as finished and close the journal; a later --resume starts over"""
+        self._append({"event": "finish", "at": utc_now()})
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _open(self, mode: str) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._file = open(self.path, mode, encoding="utf-8")
+
+    def _append(self, event: Dict) -> None:
+        # One write and flush per line: a crash loses at most the line being written
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(line)
+                self._file.flush()
+            except OSError as e:
+                self.logger.error(f"Failed to append to {self.path}: {str(e)}")
@@ -0,0 +1,186 @@
+"""In-memory index of the page tree stored in var/, built in parallel for --local."""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from fetch.config import Config
+from fetch.file_manager import FileManager
+from fetch.stages import PageContext, Stage2Processor
+
+
+@dataclass
+class LocalPage:
+    """The fields of one stored page that Stage 4 and the tree walk need"""
+    page_id: str
+    title: Optional[str]  # None when page.v1 is missing
+    ancestors: List[Dict]  # type, id and title of each ancestor
+    child_ids: Optional[List[str]]  # None when children.v2 is missing
+    xhtml_sha256: Optional[str] = None
+    seconds: float = 0.0  # Time spent parsing and extracting the page
+
+    def seed(self, context: PageContext) -> None:
+        """Put compact page.v1 and children.v2 documents into a page context"""
+        v1_data = None
+        if self.title is not None:
+            v1_data = {"title": self.title, "ancestors": self.ancestors}
+        context.put("page.v1", v1_data)
+        children = None
+        if self.child_ids is not None:
+            children = {"results": [{"id": child_id} for child_id in self.child_ids]}
+        context.put("children.v2", children)
+
+
+def extract_local_page(stage2: Stage2Processor, page_id: str) -> LocalPage:
+    """Run Stage 2 on a stored page and keep only what the tree walk needs"""
+    started = time.monotonic()
+    context = stage2.create_context(page_id)
+    stage2.process(page_id, context)
+
+    v1_data = context.get("page.v1")
+    children = context.get("children.v2")
+    title, ancestors, xhtml_sha256 = None, [], None
+    if v1_data:
+        title = v1_data.get("title")
+        ancestors = [
+            {key: ancestor[key] for key in ("type", "id", "title") if key in ancestor}
+            for ancestor in v1_data.get("ancestors", [])
+        ]
+        xhtml = v1_data.get("body", {}).get("storage", {}).get("value", "")
+        if xhtml:
+            xhtml_sha256 = hashlib.sha256(xhtml.encode("utf-8")).hexdigest()
+    child_ids = [child["id"] for child in children.get("results", [])] if children is not None else None
+    return LocalPage(page_id, title, ancestors, child_ids, xhtml_sha256, time.monotonic() - started)
+
+
+# Stage 2 processor of a pool worker process, created once by _init_worker
+_worker_stage2: Optional[Stage2Processor] = None
+
+
+def _init_worker(config: Config) -> None:
+    global _worker_stage2
+    logger = logging.getLogger(__name__)
+    _worker_stage2 = Stage2Processor(config, None, FileManager(logger, config.storage_format), logger)
+
+
+def _extract_in_worker(page_id: str) -> LocalPage:
+    return extract_local_page(_worker_stage2, page_id)
+
+
+class LocalIndexPool:
+    """Process pool running Stage 2 on stored pages, started on first use and shared by the index builds of a run.
+
+    Workers are spawned rather than forked: a fetch has threads running (the
+    write-behind writer, API prefetch, logging handlers), and a forked child
+    could inherit one of their locks in a held state.
+    """
+
+    def __init__(self, config: Config, processes: int):
+        self.config = config
+        self.processes = processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, page_id: str) -> Future:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker, initargs=(self.config,))
+        return self._executor.submit(_extract_in_worker, page_id)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class LocalPageIndex:
+    """Title, ancestors and child IDs of the stored pages below one or more start pages, parsed once.
+
+    Building the index runs Stage 2 (content extraction) on each page. Small
+    trees are parsed in this process; once more than IN_PROCESS_PAGES pages
+    have been parsed, the rest go to a process pool, so the per-page JSON/YAML
+    parsing of a large --local walk is spread over all CPUs. Children are
+    submitted as soon as their parent has been parsed. The tree walk then
+    builds pages.yaml from the index without reading var/ again.
+    """
+
+    # Pages parsed in this process before the rest of a tree is handed to the pool
+    IN_PROCESS_PAGES = 200
+
+    def __init__(self, pages: Optional[Dict[str, LocalPage]] = None):
+        self.pages = pages if pages is not None else {}
+
+    def __contains__(self, page_id: str) -> bool:
+        return page_id in self.pages
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def get(self, page_id: str) -> Optional[LocalPage]:
+        return self.pages.get(page_id)
+
+    def add_tree(self, config: Config, file_manager: FileManager, logger: logging.Logger, start_page_id: str,
+                 pool: Optional[LocalIndexPool] = None, on_page: Optional[Callable[[LocalPage], None]] = None) -> int:
+        """Parse every page reachable from start_page_id through children.v2 that is not indexed yet.
+
+        Without a pool every page is parsed in this process. on_page is called
+        in this process for each parsed page, e.g. to record it in the manifest.
+        Pages that fail to parse are left out of the index. Returns the number
+        of pages parsed.
+        """
+        if start_page_id in self.pages:
+            return 0
+        parsed = 0
+        scheduled = {start_page_id}
+
+        def collect(page: LocalPage) -> List[str]:
+            nonlocal parsed
+            parsed += 1
+            self.pages[page.page_id] = page
+            if on_page:
+                on_page(page)
+            child_ids = [child_id for child_id in page.child_ids or []
+                         if child_id not in scheduled and child_id not in self.pages]
+            scheduled.update(child_ids)
+            return child_ids
+
+        def failed(page_id: str, error: Exception) -> None:
+            logger.error(f"Error indexing local page ID {page_id}: {str(error)}")
+            logger.debug(traceback.format_exc())
+
+        stage2 = Stage2Processor(config, None, file_manager, logger)
+        queue = [start_page_id]
+        while queue and (pool is None or parsed < self.IN_PROCESS_PAGES):
+            page_id = queue.pop()
+            try:
+                queue.extend(collect(extract_local_page(stage2, page_id)))
+            except Exception as e:
+                failed(page_id, e)
+        if not queue:
+            return parsed
+
+        logger.info(f"Indexing {len(queue)}+ more local pages from {config.default_output_dir} "
+                    f"with {pool.processes} processes")
+        pending: Dict[Future, str] = {pool.submit(page_id): page_id for page_id in queue}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_id = pending.pop(future)
+                try:
+                    child_ids = collect(future.result())
+                except Exception as e:
+                    failed(page_id, e)
+                    continue
+                for child_id in child_ids:
+                    pending[pool.submit(child_id)] = child_id
+        return parsed
+
+
+def default_processes(config: Config) -> int:
+    """Number of processes used to build the index (config.local_processes, or one per CPU)"""
+    return config.local_processes if config.local_processes > 0 else (os.cpu_count() or 1)
@@ -0,0 +1,205 @@
+"""SQLite manifest of fetched pages kept in var/manifest.sqlite."""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    title TEXT,
+    version INTEGER,
+    created_at TEXT,
+    xhtml_sha256 TEXT,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_created_at ON pages (created_at);
+CREATE INDEX IF NOT EXISTS pages_parent_id ON pages (parent_id);
+CREATE TABLE IF NOT EXISTS attachments (
+    page_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    attachment_id TEXT,
+    file_id TEXT,
+    size INTEGER,
+    sha256 TEXT,
+    PRIMARY KEY (page_id, filename)
+);
+CREATE TABLE IF NOT EXISTS children (
+    parent_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    child_id TEXT NOT NULL,
+    PRIMARY KEY (parent_id, position)
+);
+CREATE INDEX IF NOT EXISTS children_child_id ON children (child_id);
+"""
+
+
+def utc_now() -> str:
+    """Current time in the format Confluence uses for version.createdAt"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class PageManifest:
+    """Per-page record of what has been fetched into var/.
+
+    Holds id, parent, title, version and version.createdAt from page.v2,
+    the SHA-256 of page.xhtml, the attachments of each page, the time
+    the page was last checked against Confluence and the ordered child
+    page IDs of each page (the parent-to-children index of the tree). Each stage updates its
+    columns in a single transaction, so the manifest never holds a half
+    written page. Queries such as "pages changed since X" use the
+    created_at index instead of parsing every page directory.
+    """
+
+    FILENAME = "manifest.sqlite"
+    QUERY_BATCH = 500  # Stay below SQLite's bound parameter limit
+
+    def __init__(self, path: str, logger: logging.Logger):
+        self.path = path
+        self.logger = logger
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str, logger: logging.Logger) -> "PageManifest":
+        return cls(os.path.join(output_dir, cls.FILENAME), logger)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_version(self, page_id: str, v2_data: Dict, fetched_at: Optional[str] = None) -> None:
+        """Record parent, title and version of a page from its page.v2 response"""
+        version = v2_data.get("version") or {}
+        parent_id = v2_data.get("parentId")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pages (page_id, parent_id, title, version, created_at, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (page_id) DO UPDATE SET parent_id = excluded.parent_id, title = excluded.title,"
+                " version = excluded.version, created_at = excluded.created_at,"
+                " fetched_at = COALESCE(excluded.fetched_at, pages.fetched_at)",
+                (page_id, str(parent_id) if parent_id is not None else None, v2_data.get("title"),
+                 version.get("number"), version.get("createdAt"), fetched_at),
+            )
+
+    def mark_fetched(self, page_id: str, fetched_at: Optional[str] = None) -> None:
+        """Record that a page has just been checked against Confluence"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pages (page_id, fetched_at) VALUES (?, ?)"
+                " ON CONFLICT (page_id) DO UPDATE SET fetched_at = excluded.fetched_at",
+                (page_id, fetched_at or utc_now()),
+            )
+
+    def record_xhtml(self, page_id: str, sha256: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pages (page_id, xhtml_sha256) VALUES (?, ?)"
+                " ON CONFLICT (page_id) DO UPDATE SET xhtml_sha256 = excluded.xhtml_sha256",
+                (page_id, sha256),
+            )
+
+    def record_attachments(self, page_id: str, entries: Dict[str, Dict]) -> None:
+        """Replace the attachments of a page with the entries of its attachments manifest"""
+        rows = [
+            (page_id, filename, entry.get("id"), entry.get("fileId"), entry.get("size"), entry.get("sha256"))
+            for filename, entry in entries.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM attachments WHERE page_id = ?", (page_id,))
+            self._conn.executemany(
+                "INSERT INTO attachments (page_id, filename, attachment_id, file_id, size, sha256)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def record_children(self, page_id: str, child_ids: List[str]) -> None:
+        """Replace the ordered child page IDs of a page"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM children WHERE parent_id = ?", (page_id,))
+            self._conn.executemany(
+                "INSERT INTO children (parent_id, position, child_id) VALUES (?, ?, ?)",
+                [(page_id, position, child_id) for position, child_id in enumerate(child_ids)],
+            )
+
+    def get_children(self, page_id: str) -> List[str]:
+        """Return the ordered child page IDs of a page (empty for leaves and pages never recorded)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT child_id FROM children WHERE parent_id = ? ORDER BY position", (page_id,)
+            ).fetchall()
+        return [row["child_id"] for row in rows]
+
+    def get_parents_in_index(self, page_id: str) -> List[str]:
+        """Return the pages whose recorded children include page_id (more than one while a move is being applied)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT parent_id FROM children WHERE child_id = ? ORDER BY parent_id", (page_id,)
+            ).fetchall()
+        return [row["parent_id"] for row in rows]
+
+    def get_page(self, page_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pages WHERE page_id = ?", (page_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_attachments(self, page_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM attachments WHERE page_id = ? ORDER BY rowid", (page_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def missing_versions(self, page_ids: Iterable[str]) -> List[str]:
+        """Return the given page IDs that have no recorded version"""
+        page_ids = list(page_ids)
+        known = set()
+        for batch in self._batches(page_ids):
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT page_id FROM pages WHERE created_at IS NOT NULL AND page_id IN ({placeholders})", batch
+                ).fetchall()
+            known.update(row["page_id"] for row in rows)
+        return [page_id for page_id in page_ids if page_id not in known]
+
+    def max_created_at(self, page_ids: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Return the latest version.createdAt among the given pages, or among all pages"""
+        if page_ids is None:
+            with self._lock:
+                row = self._conn.execute("SELECT MAX(created_at) AS max_date FROM pages").fetchone()
+            return row["max_date"]
+        max_date = None
+        for batch in self._batches(list(page_ids)):
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT MAX(created_at) AS max_date FROM pages WHERE page_id IN ({placeholders})", batch
+                ).fetchone()
+            if row["max_date"] and (max_date is None or row["max_date"] > max_date):
+                max_date = row["max_date"]
+        return max_date
+
+    def changed_since(self, since: str) -> List[str]:
+        """Return IDs of pages whose current version was created at or after since, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id FROM pages WHERE created_at >= ? ORDER BY created_at, page_id", (since,)
+            ).fetchall()
+        return [row["page_id"] for row in rows]
+
+    def _batches(self, page_ids: List[str]) -> Iterable[List[str]]:
+        for i in range(0, len(page_ids), self.QUERY_BATCH):
+            yield page_ids[i:i + self.QUERY_BATCH]
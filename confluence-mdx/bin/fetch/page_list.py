@@ -0,0 +1,149 @@
+"""Editing pages.yaml entries in place: find, replace and insert subtrees.
+
+pages.yaml lists the page tree depth-first, so a page and its descendants
+form one contiguous block: the page followed by every entry with longer
+breadcrumbs, up to the next entry at the same depth or above. The first
+entry is the start page, whose breadcrumbs hold only its own title like
+those of its children; its block is the whole list.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def _depth(entries: Sequence[Dict], index: int) -> int:
+    return len(entries[index].get("breadcrumbs") or []) if index > 0 else 0
+
+
+def find_entry(entries: Sequence[Dict], page_id: str) -> Optional[int]:
+    return next((i for i, entry in enumerate(entries) if entry["page_id"] == page_id), None)
+
+
+def subtree_span(entries: Sequence[Dict], page_id: str) -> Optional[Tuple[int, int]]:
+    """Return the [start, end) range of the block of page_id and its descendants, or None if not listed"""
+    start = find_entry(entries, page_id)
+    if start is None:
+        return None
+    depth = _depth(entries, start)
+    end = start + 1
+    while end < len(entries) and _depth(entries, end) > depth:
+        end += 1
+    return start, end
+
+
+def child_positions(entries: Sequence[Dict], parent_index: int) -> List[int]:
+    """Indexes of the direct children of the entry at parent_index"""
+    start, end = subtree_span(entries, entries[parent_index]["page_id"])
+    depth = _depth(entries, start) + 1
+    return [i for i in range(start + 1, end) if _depth(entries, i) == depth]
+
+
+def remove_pages(entries: List[Dict], page_ids: Iterable[str]) -> List[Dict]:
+    """Remove the blocks of the given pages, descendants included, and return the removed entries"""
+    removed: List[Dict] = []
+    for page_id in page_ids:
+        span = subtree_span(entries, page_id)
+        if span:
+            removed.extend(entries[span[0]:span[1]])
+            del entries[span[0]:span[1]]
+    return removed
+
+
+def insert_subtree(entries: List[Dict], parent_id: str, sibling_order: Sequence[str], block: List[Dict]) -> bool:
+    """Insert a block below parent_id, before the first listed sibling that follows it in sibling_order.
+
+    Returns False if the parent is not listed.
+    """
+    parent_index = find_entry(entries, parent_id)
+    if parent_index is None:
+        return False
+    order = {page_id: position for position, page_id in enumerate(sibling_order)}
+    position = order.get(block[0]["page_id"], len(order))
+    insert_at = subtree_span(entries, parent_id)[1]
+    for child_index in child_positions(entries, parent_index):
+        if order.get(entries[child_index]["page_id"], len(order)) > position:
+            insert_at = child_index
+            break
+    entries[insert_at:insert_at] = block
+    return True
+
+
+def splice_subtree(entries: List[Dict], block: List[Dict]) -> List[str]:
+    """Replace the block of block[0] with the new block, and return the IDs of the pages that left it, in list order.
+
+    Pages of the new block listed elsewhere (moved into the subtree) are removed
+    from their old place first.
+    """
+    root_id = block[0]["page_id"]
+    new_ids = {entry["page_id"] for entry in block}
+    span = subtree_span(entries, root_id)
+    old_ids = [entry["page_id"] for entry in entries[span[0]:span[1]]] if span else []
+    listed_ids = set(old_ids)
+    moved_in = [entry["page_id"] for entry in entries if entry["page_id"] in new_ids and entry["page_id"] not in listed_ids]
+    remove_pages(entries, moved_in)
+    span = subtree_span(entries, root_id)
+    if span:
+        entries[span[0]:span[1]] = block
+    return [page_id for page_id in old_ids if page_id not in new_ids]
+
+
+def rebase_block(block: List[Dict], root_breadcrumbs: List[str]) -> List[Dict]:
+    """Give the root of a block new breadcrumbs, keeping the path of each descendant below it.
+
+    Returns the entries whose breadcrumbs changed.
+    """
+    old_root = block[0].get("breadcrumbs") or []
+    if old_root == root_breadcrumbs:
+        return []
+    for entry in block:
+        entry["breadcrumbs"] = list(root_breadcrumbs) + (entry.get("breadcrumbs") or [])[len(old_root):]
+    return block
+
+
+def replace_children(entries: List[Dict], parent_id: str, child_ids: Sequence[str], detached: Dict[str, List[Dict]],
+                     walk: Callable[[str], List[Dict]]) -> Optional[List[Dict]]:
+    """Rebuild the child blocks of a listed page in the order of child_ids.
+
+    A child keeps its current block if it has one, wherever it is listed, and
+    is walked otherwise. Blocks of pages that are no longer children go to
+    detached, where a later call can pick them up again (a move). Returns the
+    entries whose breadcrumbs changed, or None if parent_id is not listed.
+    """
+    if find_entry(entries, parent_id) is None:
+        return None
+    current = {entries[i]["page_id"] for i in child_positions(entries, find_entry(entries, parent_id))}
+    for child_id in child_ids:
+        if child_id not in current and child_id not in detached and find_entry(entries, child_id) is not None:
+            span = subtree_span(entries, child_id)
+            if span[0] <= find_entry(entries, parent_id) < span[1]:
+                continue  # The child is an ancestor of its new parent, leave the cycle alone
+            detached[child_id] = entries[span[0]:span[1]]
+            del entries[span[0]:span[1]]
+
+    parent_index = find_entry(entries, parent_id)
+    start, end = subtree_span(entries, parent_id)
+    positions = child_positions(entries, parent_index) + [end]
+    blocks = {entries[a]["page_id"]: entries[a:b] for a, b in zip(positions, positions[1:])}
+    parent_breadcrumbs = (entries[parent_index].get("breadcrumbs") or []) if parent_index > 0 else []
+
+    region: List[Dict] = []
+    rebased: List[Dict] = []
+    for child_id in child_ids:
+        block = blocks.pop(child_id, None)
+        if block is None:
+            block = detached.pop(child_id, None)
+            if block is not None:
+                rebased.extend(rebase_block(block, parent_breadcrumbs + (block[0].get("breadcrumbs") or [])[-1:]))
+            else:
+                block = walk(child_id)
+        region.extend(block)
+    detached.update(blocks)
+    entries[start + 1:end] = region
+    return rebased
+
+
+def list_lines(entries: Iterable[Dict], start_page_id: str) -> List[str]:
+    """Lines of list.txt for the given pages.yaml entries (the start page itself is not listed)"""
+    return [
+        f"{entry['page_id']}\t{' />> '.join(entry.get('breadcrumbs') or [])}\n"
+        for entry in entries if entry["page_id"] != start_page_id
+    ]
@@ -4,15 +4,25 @@ import logging
 import os
 import sys
 import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Dict, Generator, List, Optional
+from typing import Deque, Dict, Generator, Iterable, Iterator, List, Optional, Set, Tuple
 
 from fetch.config import Config
-from fetch.api_client import ApiClient
-from fetch.file_manager import FileManager
+from fetch.api_client import ApiClient, ApiClientBase
+from fetch.download_scheduler import AttachmentDownloadScheduler
+from fetch.file_manager import FileManager, WriteBehindWriter
+from fetch.journal import FetchJournal
+from fetch.local_index import LocalIndexPool, LocalPage, LocalPageIndex, default_processes
+from fetch.manifest import PageManifest
+from fetch.page_list import (find_entry, insert_subtree, list_lines as page_list_lines, rebase_block, remove_pages, replace_children,
+                             splice_subtree, subtree_span)
 from fetch.translation import TranslationService
-from fetch.stages import Stage1Processor, Stage2Processor, Stage3Processor, Stage4Processor
+from fetch.stages import PageContext, Stage1Processor, Stage2Processor, Stage3Processor, Stage4Processor
 from fetch.models import Page
+from fetch.report import FetchReport
+from fetch.version_index import PageVersionIndex
 from text_utils import slugify
 
 
@@ -24,35 +34,76 @@ class ConfluencePageProcessor:
         self.logger = logger
 
         # Initialize services with dependency injection
-        self.api_client = ApiClient(config, logger)
-        self.file_manager = FileManager(logger)
-        self.translation_service = TranslationService(config.translations_file, logger)
+        self.report = FetchReport(logger)
+        self.api_client = ApiClient(config, logger, counters=self.report.counters)
+        self.file_manager = FileManager(logger, config.storage_format, self.report.counters)
+        self.translation_service = TranslationService(config.translations_file, logger, cache_dir=config.cache_dir)
+        self.manifest = PageManifest.for_output_dir(config.default_output_dir, logger)
+        self.version_index = (
+            PageVersionIndex(config, self.api_client, self.file_manager, logger) if config.skip_unchanged else None
+        )
+
+        self.download_scheduler = (
+            AttachmentDownloadScheduler(config, logger)
+            if config.download_attachments and config.mode != "local" else None
+        )
+
+        # Raw API responses are handed to Stage 2-4 in memory and written in the background
+        self.writer = WriteBehindWriter(self.file_manager, logger) if config.mode != "local" else None
+
+        # Stage completion of each page, so an interrupted run can be resumed with --resume
+        self.journal = FetchJournal.for_output_dir(config.default_output_dir, logger) if config.mode != "local" else None
+        # Pages completed by the interrupted run being resumed, read back from var/ instead of fetched
+        self.resumed: Set[str] = set()
 
         # Initialize stage processors
-        self.stage1 = Stage1Processor(config, self.api_client, self.file_manager, logger)
-        self.stage2 = Stage2Processor(config, self.api_client, self.file_manager, logger)
-        self.stage3 = Stage3Processor(config, self.api_client, self.file_manager, logger)
-        self.stage4 = Stage4Processor(config, self.api_client, self.file_manager, logger)
+        self.stage1 = Stage1Processor(config, self.api_client, self.file_manager, logger, self.version_index, self.manifest,
+                                      self.writer)
+        self.stage2 = Stage2Processor(config, self.api_client, self.file_manager, logger, self.manifest)
+        self.stage3 = Stage3Processor(config, self.api_client, self.file_manager, logger, self.download_scheduler,
+                                      self.manifest, self.report.counters,
+                                      on_complete=lambda page_id: self.journal_stage(page_id, "stage3"))
+        self.stage4 = Stage4Processor(config, self.api_client, self.file_manager, logger, self.manifest)
+
+        # Title, ancestors and children of stored pages, parsed once per run and shared by every local tree walk
+        self.local_index: Optional[LocalPageIndex] = None
+        processes = default_processes(config)
+        self.local_pool = LocalIndexPool(config, processes) if processes > 1 else None
+
+        # page.v1 documents returned inline by the CQL search, waiting for their page's Stage 1
+        self._primed_v1: Dict[str, Dict] = {}
 
         # Load translations
         self.translation_service.load_translations()
 
-    def process_page_complete(self, page_id: str, start_page_id: Optional[str] = None) -> Optional[Page]:
-        """Process a single page through all 4 stages"""
+    def process_page_complete(self, page_id: str, start_page_id: Optional[str] = None,
+                              context: Optional[PageContext] = None) -> Optional[Page]:
+        """Process a single page through all 4 stages, handing API responses from stage to stage in context"""
         try:
+            context = context or self.stage1.create_context(page_id)
+            if page_id in self.resumed:
+                return self.resume_page(page_id, start_page_id, context)
             self.logger.info(f"Processing page ID {page_id} through all stages")
 
             # Stage 1: API Data Collection
-            self.stage1.process(page_id)
+            with self.report.stage("stage1", page_id):
+                collected = self.stage1.process(page_id, context)
+            self.journal_stage1(page_id, collected)
 
             # Stage 2: Content Extraction
-            self.stage2.process(page_id)
+            with self.report.stage("stage2", page_id):
+                self.stage2.process(page_id, context)
+            self.journal_stage(page_id, "stage2")
 
-            # Stage 3: Attachment Download
-            self.stage3.process(page_id)
+            # Stage 3: Attachment Download (API downloads are queued on the shared scheduler)
+            with self.report.stage("stage3", page_id):
+                self.stage3.process(page_id, context)
 
             # Stage 4: Document Listing
-            page = self.stage4.process(page_id, start_page_id)
+            with self.report.stage("stage4", page_id):
+                page = self.stage4.process(page_id, start_page_id, context)
+            if page:
+                self.journal_stage(page_id, "stage4")
 
             self.logger.info(f"Completed all stages for page ID {page_id}")
             return page
@@ -61,25 +112,153 @@ class ConfluencePageProcessor:
             self.logger.error(f"Error processing page ID {page_id}: {str(e)}")
             return None
 
-    def get_child_page_ids(self, page_id: str) -> List[str]:
-        """Get child page IDs for recursive processing"""
+    def resume_page(self, page_id: str, start_page_id: Optional[str], context: PageContext) -> Optional[Page]:
+        """List a page completed by the interrupted run: Stage 4 only, from the documents stored in var/"""
+        self.logger.info(f"Page ID {page_id} was completed by the interrupted run, reading it from var/")
+        self.report.counters.add("pages.resumed")
+        with self.report.stage("stage4", page_id):
+            return self.stage4.process(page_id, start_page_id, context)
+
+    def journal_stage(self, page_id: str, stage: str) -> None:
+        if self.journal:
+            self.journal.record(page_id, stage)
+
+    def journal_stage1(self, page_id: str, collected: bool) -> None:
+        """Record Stage 1 of a page once all its responses were collected and their files are written"""
+        if not self.journal or not collected:
+            return
+        fields = {"stale": True} if self.version_index and self.version_index.is_stale(page_id) else {}
+        if not self.writer:
+            self.journal.record(page_id, "stage1", **fields)
+            return
+        directory = self.stage1.get_page_directory(page_id)
+
+        def record() -> None:
+            if directory not in self.writer.failed_directories:
+                self.journal.record(page_id, "stage1", **fields)
+
+        self.writer.after_pending(record)
+
+    def begin_journal(self, start_page_id: str) -> None:
+        """Open the journal of this run; with --resume, pick up the pages completed by the interrupted run"""
+        if not self.journal:
+            return
+        events = self.journal.begin(self.config.mode, start_page_id, self.config.subtree_page_id, self.config.resume)
+        self.resumed = FetchJournal.completed_pages(events)
+        if self.version_index:
+            # Descendants of pages found moved or renamed before the interruption still need their bodies
+            for event in events:
+                if event.get("stale"):
+                    self.version_index.mark_stale(event["page_id"])
+        if self.config.resume and events:
+            self.logger.warning(f"Resuming interrupted {self.config.mode} run: {len(self.resumed)} pages already "
+                                f"completed are read from {self.config.default_output_dir}")
+
+    def process_page_local(self, page_id: str, start_page_id: str,
+                           context: Optional[PageContext] = None) -> Optional[Page]:
+        """Process a page from local files only: Stage 2 (content extraction) and Stage 4 (document listing)
+
+        Pages in the local index already went through Stage 2 while it was built.
+        """
+        context = context or self.create_tree_context(page_id, use_local=True)
+        if not (self.local_index and page_id in self.local_index):
+            with self.report.stage("stage2", page_id):
+                self.stage2.process(page_id, context)
+        with self.report.stage("stage4", page_id):
+            return self.stage4.process(page_id, start_page_id, context)
+
+    def process_tree_page(self, page_id: str, start_page_id: str, use_local: bool,
+                          context: PageContext) -> Optional[Page]:
+        """Process a page of the tree walk from local files or through all 4 stages"""
+        if use_local:
+            # In local mode, skip Stage 1 (API calls) and Stage 3 (attachment download)
+            return self.process_page_local(page_id, start_page_id, context)
+        return self.process_page_complete(page_id, start_page_id, context)
+
+    def create_tree_context(self, page_id: str, use_local: bool) -> PageContext:
+        """Create the context of a tree node, seeded from the local index when the page is in it"""
+        context = self.stage1.create_context(page_id)
+        page = self.local_index.get(page_id) if use_local and self.local_index else None
+        if page:
+            page.seed(context)
+        return context
+
+    def build_local_index(self, start_page_id: str) -> LocalPageIndex:
+        """Parse the stored pages below start_page_id that are not indexed yet and keep what the tree walk needs"""
+        if self.local_index is None:
+            self.local_index = LocalPageIndex()
+
+        def on_page(page: LocalPage) -> None:
+            self.report.record_stage("stage2", page.page_id, page.seconds)
+            if page.xhtml_sha256:
+                self.manifest.record_xhtml(page.page_id, page.xhtml_sha256)
+            if page.child_ids is not None:
+                self.manifest.record_children(page.page_id, page.child_ids)
+
+        with self.report.phase("local_index"):
+            parsed = self.local_index.add_tree(self.config, self.file_manager, self.logger, start_page_id,
+                                               self.local_pool, on_page)
+        self.logger.info(f"Indexed {parsed} local pages below page ID {start_page_id}, {len(self.local_index)} in total")
+        return self.local_index
+
+    def close(self) -> None:
+        """Stop the background threads and processes of the run and close the manifest.
+
+        The write-behind writer goes first, so documents still queued are
+        written before anything else is torn down. Closing the manifest
+        checkpoints its WAL, so no manifest.sqlite-wal and -shm files are
+        left behind.
+        """
+        if self.writer:
+            self.writer.close()
+        if self.local_pool:
+            self.local_pool.close()
+        self.api_client.close()
+        self.manifest.close()
+
+    def prefetch_versions(self, page_ids: List[str]) -> None:
+        """Look up current versions of pages about to be fetched, so unchanged bodies can be skipped"""
+        page_ids = [page_id for page_id in page_ids if page_id not in self.resumed]
+        if self.version_index and self.config.mode != "local" and page_ids:
+            self.version_index.prefetch(page_ids)
+
+    def get_child_page_ids(self, page_id: str, context: Optional[PageContext] = None) -> List[str]:
+        """Get child page IDs for recursive processing, from the page context or the stored children.v2"""
         try:
-            directory = self.stage1.get_page_directory(page_id)
-            yaml_filepath = os.path.join(directory, "children.v2.yaml")
-
-            if os.path.exists(yaml_filepath):
-                data = self.file_manager.load_yaml(yaml_filepath)
-                if data:
-                    child_ids = [child["id"] for child in data.get("results", [])]
-                    self.logger.info(f"Found {len(child_ids)} child pages for page ID {page_id}")
-                    return child_ids
-            else:
-                self.logger.warning(f"No children.v2.yaml found for page ID {page_id}")
+            context = context or self.stage1.create_context(page_id)
+            data = context.get("children.v2")
+            if data is None:
+                self.logger.warning(f"No children.v2 found for page ID {page_id}")
                 return []
+            child_ids = [child["id"] for child in data.get("results", [])]
+            self.logger.info(f"Found {len(child_ids)} child pages for page ID {page_id}")
+            return child_ids
         except Exception as e:
             self.logger.error(f"Error getting child page IDs for page ID {page_id}: {str(e)}")
             return []
 
+    def apply_translation(self, page: Page) -> None:
+        """Fill breadcrumbs_en and path of a page, translating titles if translations are available"""
+        if self.translation_service.translations:
+            self.translation_service.translate_page(page)
+        else:
+            # If no translations available, use original breadcrumbs for English and path
+            page.breadcrumbs_en = page.breadcrumbs
+            page.path = [slugify(crumb) for crumb in page.breadcrumbs]
+
+    def fetch_page_tree(self, page_id: str, start_page_id: Optional[str] = None, use_local: bool = False) -> Generator[Page, None, None]:
+        """Fetch page tree, concurrently when more than one worker is configured.
+
+        From local files, the stored pages are parsed into the local index first
+        and the walk itself needs no further file access.
+        """
+        if use_local:
+            self.build_local_index(page_id)
+            return self.fetch_page_tree_recursive(page_id, start_page_id, use_local)
+        if self.config.workers > 1:
+            return self.fetch_page_tree_concurrent(page_id, start_page_id, use_local)
+        return self.fetch_page_tree_recursive(page_id, start_page_id, use_local)
+
     def fetch_page_tree_recursive(self, page_id: str, start_page_id: Optional[str] = None, use_local: bool = False) -> Generator[Page, None, None]:
         """Recursively fetch page tree through all 4 stages"""
         try:
@@ -90,33 +269,373 @@ class ConfluencePageProcessor:
                 start_page_id = page_id
 
             # Process current page through all 4 stages
-            if use_local:
-                # In local mode, skip Stage 1 (API calls) and Stage 3 (attachment download)
-                # Only process Stage 2 (content extraction) and Stage 4 (document listing)
-                self.stage2.process(page_id)
-                page = self.stage4.process(page_id, start_page_id)
-            else:
-                page = self.process_page_complete(page_id, start_page_id)
+            context = self.create_tree_context(page_id, use_local)
+            page = self.process_tree_page(page_id, start_page_id, use_local, context)
 
             if page:
-                # Update translations if available
-                if self.translation_service.translations:
-                    self.translation_service.translate_page(page)
-                else:
-                    # If no translations available, use original breadcrumbs for English and path
-                    page.breadcrumbs_en = page.breadcrumbs
-                    page.path = [slugify(crumb) for crumb in page.breadcrumbs]
+                self.apply_translation(page)
 
                 yield page
 
                 # Process child pages recursively
-                child_ids = self.get_child_page_ids(page_id)
+                child_ids = self.get_child_page_ids(page_id, context) or []
+                if not use_local:
+                    self.prefetch_versions(child_ids)
                 for child_id in child_ids:
                     yield from self.fetch_page_tree_recursive(child_id, start_page_id, use_local)
         except Exception as e:
             self.logger.error(f"Error processing page ID {page_id}: {str(e)}")
             self.logger.debug(traceback.format_exc())
 
+    def _process_tree_node(self, page_id: str, start_page_id: str, use_local: bool) -> Tuple[Optional[Page], List[str]]:
+        """Process a single tree node and return the page with its child page IDs"""
+        self.logger.info(f"Processing page tree for page ID {page_id}")
+        context = self.create_tree_context(page_id, use_local)
+        page = self.process_tree_page(page_id, start_page_id, use_local, context)
+
+        if not page:
+            return None, []
+
+        self.apply_translation(page)
+        child_ids = self.get_child_page_ids(page_id, context) or []
+        if not use_local:
+            self.prefetch_versions(child_ids)
+        return page, child_ids
+
+    def fetch_page_tree_concurrent(self, page_id: str, start_page_id: Optional[str] = None, use_local: bool = False) -> Generator[Page, None, None]:
+        """Fetch page tree with a bounded worker pool.
+
+        Children are scheduled as soon as their parent's children.v2 is available,
+        so many pages go through the stages at once. Pages are yielded in the same
+        depth-first order as fetch_page_tree_recursive once the whole tree is done.
+        """
+        if start_page_id is None:
+            start_page_id = page_id
+
+        self.logger.info(f"Processing page tree for page ID {page_id} with {self.config.workers} workers")
+        results: Dict[str, Tuple[Optional[Page], List[str]]] = {}
+        scheduled = {page_id}
+
+        with ThreadPoolExecutor(max_workers=self.config.workers) as executor:
+            pending: Dict[Future, str] = {
+                executor.submit(self._process_tree_node, page_id, start_page_id, use_local): page_id
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node_id = pending.pop(future)
+                    try:
+                        page, child_ids = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error processing page ID {node_id}: {str(e)}")
+                        self.logger.debug(traceback.format_exc())
+                        page, child_ids = None, []
+                    results[node_id] = (page, child_ids)
+
+                    for child_id in child_ids:
+                        if child_id in scheduled:
+                            continue
+                        scheduled.add(child_id)
+                        pending[executor.submit(self._process_tree_node, child_id, start_page_id, use_local)] = child_id
+
+        yield from self._iter_depth_first(page_id, results)
+
+    @staticmethod
+    def _iter_depth_first(page_id: str, results: Dict[str, Tuple[Optional[Page], List[str]]]) -> Generator[Page, None, None]:
+        """Yield processed pages in depth-first order starting from page_id"""
+        stack = [page_id]
+        visited = set()
+        while stack:
+            node_id = stack.pop()
+            if node_id in visited or node_id not in results:
+                continue
+            visited.add(node_id)
+            page, child_ids = results[node_id]
+            if not page:
+                continue
+            yield page
+            stack.extend(reversed(child_ids))
+
+    def download_pages(self, page_ids: List[str], start_page_id: str) -> List[Page]:
+        """Download the given pages through all 4 stages, printing each one to stdout"""
+        return self.download_page_batches([page_ids], start_page_id)
+
+    def download_page_batches(self, page_id_batches: Iterable[List[str]], start_page_id: str) -> List[Page]:
+        """Download pages through all 4 stages as batches of IDs arrive, printing each one to stdout.
+
+        page_id_batches may be lazy, e.g. the CQL search pager: pages of a batch are
+        queued for download as soon as the batch is available, while the next batch is
+        still being fetched. Pages are printed and returned in input order.
+        """
+        pages = []
+        pending: Deque[Tuple[str, Future]] = deque()
+
+        def drain(block: bool) -> None:
+            while pending and (block or pending[0][1].done()):
+                page_id, future = pending.popleft()
+                try:
+                    page = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error downloading page ID {page_id}: {str(e)}")
+                    continue
+                if page:
+                    self.print_page(page)
+                    pages.append(page)
+
+        with ThreadPoolExecutor(max_workers=self.config.workers) as executor:
+            for batch in page_id_batches:
+                self.prefetch_versions(batch)
+                for page_id in batch:
+                    pending.append((page_id, executor.submit(self._download_page, page_id, start_page_id)))
+                drain(block=False)
+            drain(block=True)
+        return pages
+
+    @staticmethod
+    def print_page(page: Page) -> None:
+        """Output a downloaded page to stdout in the list.txt format"""
+        breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
+        print(f"{page.page_id}\t{breadcrumbs_str}")
+
+    def _exclude_pages(self, page_id_batches: Iterable[List[str]]) -> Iterator[List[str]]:
+        """Drop pages that must not be collected from the search results"""
+        # 576585864 - https://querypie.atlassian.net/wiki/spaces/QM/overview
+        excluded_page_id = "576585864"
+        for batch in page_id_batches:
+            filtered = [pid for pid in batch if pid != excluded_page_id]
+            if len(filtered) != len(batch):
+                self.logger.info(f"Excluded page ID {excluded_page_id} from collection")
+            yield filtered
+
+    def prime_page_bodies(self, result_batches: Iterable[List[Dict]]) -> Iterator[List[str]]:
+        """Keep the page.v1 documents found in search results and yield the page IDs of each batch.
+
+        Pages whose bodies were left out of the search response are requested
+        one by one in Stage 1 as before.
+        """
+        for results in result_batches:
+            page_ids = []
+            incomplete = 0
+            for result in results:
+                page_id = result.get("id")
+                if not page_id:
+                    continue
+                page_ids.append(page_id)
+                if ApiClientBase.is_complete_page_v1(result):
+                    self._primed_v1[page_id] = result
+                else:
+                    incomplete += 1
+            self.report.counters.add("api.bulk_bodies", len(page_ids) - incomplete)
+            if incomplete:
+                self.logger.info(f"{incomplete} of {len(page_ids)} search results have no complete body, "
+                                 f"fetching them per page")
+            if page_ids:
+                yield page_ids
+
+    def create_download_context(self, page_id: str) -> PageContext:
+        """Create the context of a page to download, primed with its page.v1 from the search results if any"""
+        context = self.stage1.create_context(page_id)
+        v1_data = self._primed_v1.pop(page_id, None)
+        if v1_data is not None:
+            context.prime("page.v1", v1_data)
+        return context
+
+    def _download_page(self, page_id: str, start_page_id: str) -> Optional[Page]:
+        page = self.process_page_complete(page_id, start_page_id, self.create_download_context(page_id))
+        if page:
+            self.apply_translation(page)
+        return page
+
+    def flush_writes(self) -> None:
+        """Block until every raw API response queued by Stage 1 has been written to var/"""
+        if self.writer:
+            self.writer.flush()
+
+    def wait_for_attachments(self) -> None:
+        """Block until all queued attachment downloads have finished"""
+        if self.download_scheduler:
+            self.download_scheduler.close()
+
+    def log_api_latency(self) -> None:
+        """Log the response time histogram of each API endpoint, used to tune the number of workers"""
+        rate_limiter = self.api_client.rate_limiter
+        for line in rate_limiter.latency.summary_lines():
+            self.logger.info(f"API latency: {line}")
+        if rate_limiter.throttled:
+            self.logger.warning(f"API rate limit: slowed down on {rate_limiter.throttled} responses")
+
+    def write_report(self) -> None:
+        """Write var/fetch-report.json with stage timings, counters and API latency, and log its summary"""
+        extra = {
+            "api_latency": self.api_client.rate_limiter.latency.snapshot(),
+            "rate_limit_throttled": self.api_client.rate_limiter.throttled,
+        }
+        if self.download_scheduler:
+            progress = self.download_scheduler.progress
+            extra["attachment_queue"] = {
+                "files": progress.files_total,
+                "failed": progress.files_failed,
+                "bytes": progress.bytes_done,
+                "bytes_per_second": round(progress.throughput(), 1),
+            }
+        try:
+            self.report.write(self.config.default_output_dir, self.config.mode, extra)
+        except OSError as e:
+            self.logger.error(f"Failed to write fetch report: {str(e)}")
+
+    def _current_parent(self, page_id: str, use_local: bool) -> Optional[str]:
+        """Return the parent ID of a page from page.v2, or None if the page is gone"""
+        if use_local:
+            v2_data = self.file_manager.load_raw(os.path.join(self.config.default_output_dir, page_id), "page.v2")
+        else:
+            try:
+                v2_data = self.api_client.get_page_data_v2(page_id)
+            except Exception as e:
+                self.logger.info(f"Page ID {page_id} is not available: {str(e)}")
+                return None
+        if not v2_data or v2_data.get("status", "current") != "current" or v2_data.get("parentId") is None:
+            return None
+        return str(v2_data["parentId"])
+
+    def _child_order(self, page_id: str, use_local: bool) -> List[str]:
+        """Return the current child page IDs of a page, refreshing its children.v2 when fetching remotely"""
+        directory = os.path.join(self.config.default_output_dir, page_id)
+        if use_local:
+            data = self.file_manager.load_raw(directory, "children.v2")
+        else:
+            data = self.api_client.get_child_pages(page_id)
+            if data:
+                self.file_manager.save_raw(directory, "children.v2", data)
+        return [child["id"] for child in (data or {}).get("results", [])]
+
+    def _fetch_block(self, page_id: str, start_page_id: str, use_local: bool) -> List[Dict]:
+        return [page.to_dict() for page in self.fetch_page_tree(page_id, start_page_id, use_local)]
+
+    def _place_block(self, entries: List[Dict], block: List[Dict], use_local: bool) -> bool:
+        """Insert a block whose root is not listed yet below its current parent, in sibling order"""
+        page_id = block[0]["page_id"]
+        parent_id = self._current_parent(page_id, use_local)
+        if parent_id is None or find_entry(entries, parent_id) is None:
+            return False
+        sibling_order = self._child_order(parent_id, use_local)
+        if page_id not in sibling_order:
+            return False
+        remove_pages(entries, [entry["page_id"] for entry in block if find_entry(entries, entry["page_id"]) is not None])
+        return insert_subtree(entries, parent_id, sibling_order, block)
+
+    def refresh_subtree(self, page_id: str, start_page_id: str, output_yaml_path: str, output_list_path: str) -> int:
+        """Fetch one page and its descendants, and splice their entries into pages.yaml and list.txt.
+
+        Breadcrumbs come from each page's ancestors in page.v1, so the rest of
+        the tree is neither fetched nor walked. Descendants that left the
+        subtree are listed again below their new parent, or dropped if they
+        were deleted or moved out of the start page's tree. Returns the number
+        of pages refreshed.
+        """
+        use_local = self.config.mode == "local"
+        entries = self.file_manager.load_yaml(output_yaml_path) or []
+        was_listed = find_entry(entries, page_id) is not None
+
+        block = self._fetch_block(page_id, start_page_id, use_local)
+        refreshed = list(block)
+        if not block:
+            removed = remove_pages(entries, [page_id])
+            self.logger.warning(f"Subtree page ID {page_id} is not available, removed {len(removed)} pages from the list")
+        else:
+            left_ids = splice_subtree(entries, block)
+            if not was_listed and not self._place_block(entries, block, use_local):
+                self.logger.warning(f"Subtree page ID {page_id} is not below start page ID {start_page_id}, not listed")
+            # Descendants that are no longer below page_id: moved elsewhere or deleted
+            for left_id in left_ids:
+                if find_entry(entries, left_id) is not None:
+                    continue  # Listed again as a descendant of another moved page
+                moved = self._fetch_block(left_id, start_page_id, use_local)
+                if moved and self._place_block(entries, moved, use_local):
+                    self.logger.warning(f"Page ID {left_id} moved out of subtree {page_id}")
+                    refreshed.extend(moved)
+                else:
+                    self.logger.warning(f"Page ID {left_id} was deleted or moved out of the tree, removed from the list")
+
+        if not use_local:
+            for entry in page_list_lines(refreshed, start_page_id):
+                print(entry, end="")
+
+        self.file_manager.save_yaml(output_yaml_path, entries)
+        self.file_manager.save_file(output_list_path, "".join(page_list_lines(entries, start_page_id)))
+        self.logger.info(f"Refreshed {len(refreshed)} pages of subtree {page_id} in {output_yaml_path} and {output_list_path}")
+        return len(refreshed)
+
+    def load_previous_page_list(self, output_yaml_path: str, start_page_id: str) -> Optional[List[Dict]]:
+        """Return the entries of the previous pages.yaml if recent mode can update them incrementally"""
+        if not self.config.incremental_tree or not os.path.exists(output_yaml_path):
+            return None
+        entries = self.file_manager.load_yaml(output_yaml_path)
+        if not entries or entries[0].get("page_id") != start_page_id:
+            return None
+        if not self.manifest.get_children(start_page_id):
+            self.logger.info(f"No children index in {PageManifest.FILENAME} yet, walking the whole tree")
+            return None
+        return entries
+
+    def update_page_list(self, entries: List[Dict], changed_pages: List[Page], start_page_id: str) -> List[Dict]:
+        """Apply the pages downloaded in recent mode to the entries of the previous pages.yaml.
+
+        Only the branches around changed pages are touched. The parent-to-children
+        index in the manifest tells the current children of each page: a changed
+        page whose parent (page.v2 parentId) differs from the one it was indexed
+        under has moved, and a child missing from a refreshed children.v2 has been
+        deleted or moved. Breadcrumbs of the descendants of moved or renamed pages
+        are rebased on the new breadcrumbs of the changed page.
+        """
+        changed = {page.page_id: page for page in changed_pages}
+        affected: List[str] = []
+        for page_id in changed:
+            parent_id = (self.manifest.get_page(page_id) or {}).get("parent_id")
+            if parent_id and page_id != start_page_id:
+                siblings = self.manifest.get_children(parent_id)
+                if page_id not in siblings:
+                    # The new parent was not modified itself, so its children.v2 does not list the page yet
+                    self.manifest.record_children(parent_id, siblings + [page_id])
+                for old_parent_id in self.manifest.get_parents_in_index(page_id):
+                    if old_parent_id != parent_id:
+                        self.logger.info(f"Page ID {page_id} moved from page ID {old_parent_id} to {parent_id}")
+                        self.manifest.record_children(
+                            old_parent_id, [child_id for child_id in self.manifest.get_children(old_parent_id)
+                                            if child_id != page_id])
+                        affected.append(old_parent_id)
+                affected.append(parent_id)
+            affected.append(page_id)
+
+        def walk(page_id: str) -> List[Dict]:
+            return [page.to_dict() for page in self.fetch_page_tree(page_id, start_page_id, use_local=True)]
+
+        detached: Dict[str, List[Dict]] = {}
+        rebased: Dict[str, Dict] = {}
+        for parent_id in dict.fromkeys(affected):
+            moved = replace_children(entries, parent_id, self.manifest.get_children(parent_id), detached, walk)
+            rebased.update((entry["page_id"], entry) for entry in moved or [])
+
+        # Refresh the entries of changed pages, parents first, and rebase their descendants
+        for page_id in sorted((page_id for page_id in changed if find_entry(entries, page_id) is not None),
+                              key=lambda page_id: find_entry(entries, page_id)):
+            start, end = subtree_span(entries, page_id)
+            page = changed[page_id]
+            if page_id != start_page_id:
+                rebased.update((entry["page_id"], entry) for entry in rebase_block(entries[start:end], page.breadcrumbs))
+            entries[start] = page.to_dict()
+            rebased.pop(page_id, None)
+
+        for entry in rebased.values():
+            page = Page.from_dict(entry)
+            self.apply_translation(page)
+            entry.update(page.to_dict())
+
+        for page_id in detached:
+            self.logger.warning(f"Page ID {page_id} is no longer below its parent, removed from the list")
+        self.logger.info(f"Updated page list for {len(changed)} changed pages, "
+                         f"{len(rebased)} descendants rebased, {len(detached)} removed")
+        return entries
+
     def _get_fetch_state_path(self, start_page_id: str) -> str:
         """Return the path to the fetch state file for a specific start_page_id."""
         return os.path.join(self.config.default_output_dir, start_page_id, "fetch_state.yaml")
@@ -134,19 +653,20 @@ class ConfluencePageProcessor:
         self.logger.warning(f"Fetch state saved to {state_path}")
 
     def _compute_max_modified_date(self, page_ids: List[str]) -> Optional[str]:
-        """Scan page.v2.yaml files for the given page IDs and return the maximum version.createdAt."""
-        max_date = None
-        for page_id in page_ids:
-            v2_path = os.path.join(self.config.default_output_dir, page_id, "page.v2.yaml")
+        """Return the maximum version.createdAt of the given page IDs from the manifest.
+
+        Pages fetched before the manifest existed are read from their stored
+        page.v2 documents once and recorded, so later runs need no scan.
+        """
+        for page_id in self.manifest.missing_versions(page_ids):
+            directory = os.path.join(self.config.default_output_dir, page_id)
             try:
-                v2_data = self.file_manager.load_yaml(v2_path)
+                v2_data = self.file_manager.load_raw(directory, "page.v2")
                 if v2_data and "version" in v2_data:
-                    created_at = v2_data["version"].get("createdAt")
-                    if created_at and (max_date is None or created_at > max_date):
-                        max_date = created_at
+                    self.manifest.record_version(page_id, v2_data)
             except Exception:
                 continue
-        return max_date
+        return self.manifest.max_created_at(page_ids)
 
     def run(self) -> None:
         """Main execution function"""
@@ -161,6 +681,23 @@ class ConfluencePageProcessor:
             output_list_path = os.path.join(self.config.default_output_dir, "list.txt")
 
             start_page_id = self.config.default_start_page_id
+            self.begin_journal(start_page_id)
+
+            if self.config.subtree_page_id:
+                # --subtree: refresh one section of pages.yaml and list.txt, leaving the fetch state alone
+                self.logger.warning(f"Subtree mode: Processing page tree from page ID {self.config.subtree_page_id}")
+                with self.report.phase("tree"):
+                    page_count = self.refresh_subtree(self.config.subtree_page_id, start_page_id,
+                                                      output_yaml_path, output_list_path)
+                self.flush_writes()
+                with self.report.phase("attachments"):
+                    self.wait_for_attachments()
+                self.log_api_latency()
+                if self.journal:
+                    self.journal.finish()
+                self.write_report()
+                self.logger.info(f"Completed processing {page_count} pages")
+                return
 
             # Handle different modes
             if self.config.mode == "recent":
@@ -176,71 +713,72 @@ class ConfluencePageProcessor:
                     # Auto-detect from fetch state
                     fetch_state = self._load_fetch_state(start_page_id)
                     since_date = fetch_state.get("last_modified_seen")
+                    source = "fetch_state.yaml"
+                    if not since_date:
+                        # No fetch state yet: fall back to the latest version recorded in the manifest
+                        since_date = self.manifest.max_created_at()
+                        source = PageManifest.FILENAME
                     if since_date:
                         try:
                             parsed = datetime.fromisoformat(since_date.replace("Z", "+00:00"))
                             days_ago = (datetime.now(timezone.utc) - parsed).days
-                            self.logger.warning(f"Recent mode: Auto-detected since_date {since_date} from fetch_state.yaml (~{days_ago} days ago)")
+                            self.logger.warning(f"Recent mode: Auto-detected since_date {since_date} from {source} (~{days_ago} days ago)")
                         except Exception:
-                            self.logger.warning(f"Recent mode: Auto-detected since_date {since_date} from fetch_state.yaml")
+                            self.logger.warning(f"Recent mode: Auto-detected since_date {since_date} from {source}")
                     else:
                         self.logger.warning(f"Recent mode: No fetch state for start_page_id {start_page_id}, using default {effective_days} days")
 
-                page_ids = self.api_client.get_recently_modified_pages(
-                    days=effective_days,
-                    space_key=self.config.space_key,
-                    since_date=since_date
-                )
-
-                # Exclude specific page_id from collection (576585864)
-                # 576585864 - https://querypie.atlassian.net/wiki/spaces/QM/overview
-                excluded_page_id = "576585864"
-                original_count = len(page_ids)
-                page_ids = [pid for pid in page_ids if pid != excluded_page_id]
-                if original_count != len(page_ids):
-                    self.logger.info(f"Excluded page ID {excluded_page_id} from collection ({original_count} -> {len(page_ids)} pages)")
-
-                # Download each page through all 4 stages and output to stdout
-                # Store downloaded pages for list.txt
-                self.logger.warning(f"Downloading {len(page_ids)} recently modified pages")
-                downloaded_list_lines = []
-                for page_id in page_ids:
-                    try:
-                        page = self.process_page_complete(page_id, start_page_id)
-                        if page:
-                            # Update translations if available
-                            if self.translation_service.translations:
-                                self.translation_service.translate_page(page)
-                            else:
-                                page.breadcrumbs_en = page.breadcrumbs
-                                page.path = [slugify(crumb) for crumb in page.breadcrumbs]
-
-                            # Output to stdout during download
-                            breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
-                            print(f"{page.page_id}\t{breadcrumbs_str}")
-                            # Store for list.txt (only downloaded pages)
-                            downloaded_list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
-                    except Exception as e:
-                        self.logger.error(f"Error downloading page ID {page_id}: {str(e)}")
-                        continue
+                if self.config.bulk_bodies:
+                    # Receive page.v1 of up to SEARCH_LIMIT pages with each search request
+                    page_id_batches = self.prime_page_bodies(self.api_client.iter_recently_modified_page_results(
+                        days=effective_days,
+                        space_key=self.config.space_key,
+                        since_date=since_date,
+                        expand=ApiClientBase.PAGE_V1_EXPAND,
+                    ))
+                else:
+                    page_id_batches = self.api_client.iter_recently_modified_pages(
+                        days=effective_days,
+                        space_key=self.config.space_key,
+                        since_date=since_date
+                    )
+
+                # Download pages through all 4 stages while the search is still paging, and output to stdout
+                self.logger.warning("Downloading recently modified pages")
+                with self.report.phase("download"):
+                    downloaded = self.download_page_batches(self._exclude_pages(page_id_batches), start_page_id)
+                    # The local traversal below reads the downloaded pages back from var/
+                    self.flush_writes()
+                self.logger.warning(f"Downloaded {len(downloaded)} recently modified pages")
 
                 # After downloading, process like local mode (hierarchical traversal from start_page_id)
                 # Generate pages.yaml and list.txt with full hierarchical tree (like --local mode)
                 # No stdout output in this phase (like --local mode)
-                self.logger.warning(f"Processing page tree from start page ID {start_page_id} (local mode)")
                 page_count = 0
                 yaml_entries = []
                 list_lines = []
 
-                for page in self.fetch_page_tree_recursive(start_page_id, start_page_id, use_local=True):
-                    if page:
-                        breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
-                        # No stdout output in local mode
-                        # Exclude start_page_id from list.txt (root page is not converted to MDX)
-                        if page.page_id != start_page_id:
-                            list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
-                        page_count += 1
-                        yaml_entries.append(page.to_dict())
+                previous_entries = self.load_previous_page_list(output_yaml_path, start_page_id)
+                if previous_entries is not None:
+                    # Update only the branches of the changed pages in the previous pages.yaml
+                    self.logger.warning(f"Updating page tree from start page ID {start_page_id} "
+                                        f"with {len(downloaded)} changed pages")
+                    with self.report.phase("tree"):
+                        yaml_entries = self.update_page_list(previous_entries, downloaded, start_page_id)
+                    list_lines = page_list_lines(yaml_entries, start_page_id)
+                    page_count = len(yaml_entries)
+                else:
+                    self.logger.warning(f"Processing page tree from start page ID {start_page_id} (local mode)")
+                    with self.report.phase("tree"):
+                        for page in self.fetch_page_tree(start_page_id, start_page_id, use_local=True):
+                            if page:
+                                breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
+                                # No stdout output in local mode
+                                # Exclude start_page_id from list.txt (root page is not converted to MDX)
+                                if page.page_id != start_page_id:
+                                    list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
+                                page_count += 1
+                                yaml_entries.append(page.to_dict())
 
             elif self.config.mode == "local":
                 # --local mode: Process existing local files hierarchically from start_page_id
@@ -250,15 +788,16 @@ class ConfluencePageProcessor:
                 yaml_entries = []
                 list_lines = []
 
-                for page in self.fetch_page_tree_recursive(start_page_id, start_page_id, use_local=True):
-                    if page:
-                        breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
-                        # No stdout output in local mode
-                        # Exclude start_page_id from list.txt (root page is not converted to MDX)
-                        if page.page_id != start_page_id:
-                            list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
-                        page_count += 1
-                        yaml_entries.append(page.to_dict())
+                with self.report.phase("tree"):
+                    for page in self.fetch_page_tree(start_page_id, start_page_id, use_local=True):
+                        if page:
+                            breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
+                            # No stdout output in local mode
+                            # Exclude start_page_id from list.txt (root page is not converted to MDX)
+                            if page.page_id != start_page_id:
+                                list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
+                            page_count += 1
+                            yaml_entries.append(page.to_dict())
 
             elif self.config.mode == "remote":
                 # --remote mode: Download and process hierarchically from start_page_id via API
@@ -268,15 +807,22 @@ class ConfluencePageProcessor:
                 yaml_entries = []
                 list_lines = []
 
-                for page in self.fetch_page_tree_recursive(start_page_id, start_page_id, use_local=False):
-                    if page:
-                        breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
-                        # Exclude start_page_id from stdout and list.txt (root page is not converted to MDX)
-                        if page.page_id != start_page_id:
-                            print(f"{page.page_id}\t{breadcrumbs_str}")
-                            list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
-                        page_count += 1
-                        yaml_entries.append(page.to_dict())
+                with self.report.phase("tree"):
+                    for page in self.fetch_page_tree(start_page_id, start_page_id, use_local=False):
+                        if page:
+                            breadcrumbs_str = " />> ".join(page.breadcrumbs) if page.breadcrumbs else ""
+                            # Exclude start_page_id from stdout and list.txt (root page is not converted to MDX)
+                            if page.page_id != start_page_id:
+                                print(f"{page.page_id}\t{breadcrumbs_str}")
+                                list_lines.append(f"{page.page_id}\t{breadcrumbs_str}\n")
+                            page_count += 1
+                            yaml_entries.append(page.to_dict())
+
+            # Raw responses and attachments are written in the background; finish them before recording the state
+            self.flush_writes()
+            with self.report.phase("attachments"):
+                self.wait_for_attachments()
+            self.log_api_latency()
 
             # Update fetch state for remote and recent modes
             if self.config.mode in ("remote", "recent") and yaml_entries:
@@ -311,8 +857,18 @@ class ConfluencePageProcessor:
                 self.file_manager.save_file(output_list_path, "".join(list_lines))
                 self.logger.info(f"List file saved to {output_list_path}")
 
+            if self.journal:
+                self.journal.finish()
+
+            self.write_report()
             self.logger.info(f"Completed processing {page_count} pages")
         except Exception as e:
             self.logger.error(f"Error in main execution: {str(e)}")
             self.logger.debug(traceback.format_exc())
+            # Keep the responses collected so far, and the journal to resume from
+            self.flush_writes()
+            if self.journal:
+                self.journal.close()
             sys.exit(1)
+        finally:
+            self.close()
@@ -0,0 +1,189 @@
+"""Per-stage timing and throughput report of a fetch run (var/fetch-report.json)."""
+
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fetch.download_scheduler import format_bytes
+
+
+class Counters:
+    """Thread-safe named counters shared by the API client, file manager and stages.
+
+    Keys in use:
+    - api.requests, api.retries, api.bytes_in, api.seconds (time spent waiting for responses),
+      api.bulk_bodies (page.v1 documents taken from CQL search results)
+    - files.written, files.bytes_out, files.seconds (time spent writing),
+      files.encode_seconds (time spent serializing JSON/YAML)
+    - attachments.up_to_date, attachments.cache_hits, attachments.downloaded, attachments.bytes_in
+    - pages.resumed (pages completed by an interrupted run, read back from var/ with --resume)
+    """
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, key: str) -> float:
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+    @contextmanager
+    def timed(self, key: str) -> Iterator[None]:
+        """Add the wall time of the block to key"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(key, time.monotonic() - started)
+
+
+class FetchReport:
+    """Collects wall time per stage and per page, and writes the report at the end of a run.
+
+    Stage timings are recorded by ConfluencePageProcessor around each
+    StageNProcessor.process call; the counters are filled by ApiClient,
+    FileManager and Stage3Processor while they work.
+    """
+
+    FILENAME = "fetch-report.json"
+    SLOWEST_PAGES = 10
+
+    def __init__(self, logger: logging.Logger, counters: Optional[Counters] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.logger = logger
+        self.counters = counters or Counters()
+        self.clock = clock
+        self.started_at = datetime.now(timezone.utc)
+        self.started = clock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._phases: Dict[str, float] = {}
+        self._pages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, page_id: str) -> Iterator[None]:
+        """Time one stage of one page"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.record_stage(name, page_id, self.clock() - started)
+
+    def record_stage(self, name: str, page_id: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(name, {"pages": 0, "seconds": 0.0, "max": 0.0})
+            stats["pages"] += 1
+            stats["seconds"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            page = self._pages.setdefault(page_id, {})
+            page[name] = page.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the whole run, e.g. the tree walk or waiting for attachments"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + self.clock() - started
+
+    def slowest_pages(self, count: Optional[int] = None) -> List[Dict]:
+        with self._lock:
+            pages = [(sum(stages.values()), page_id, dict(stages)) for page_id, stages in self._pages.items()]
+        slowest = heapq.nlargest(count or self.SLOWEST_PAGES, pages)
+        return [{"page_id": page_id, "seconds": round(total, 4),
+                 "stages": {name: round(seconds, 4) for name, seconds in stages.items()}}
+                for total, page_id, stages in slowest]
+
+    def to_dict(self, mode: str, extra: Optional[Dict] = None) -> Dict:
+        elapsed = self.clock() - self.started
+        with self._lock:
+            stages = {
+                name: {
+                    "pages": int(stats["pages"]),
+                    "seconds": round(stats["seconds"], 4),
+                    "mean": round(stats["seconds"] / stats["pages"], 4),
+                    "max": round(stats["max"], 4),
+                }
+                for name, stats in sorted(self._stages.items())
+            }
+            phases = {name: round(seconds, 4) for name, seconds in self._phases.items()}
+            page_count = len(self._pages)
+        counters = {key: round(value, 4) if isinstance(value, float) else value
+                    for key, value in self.counters.snapshot().items()}
+        report = {
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "mode": mode,
+            "elapsed": round(elapsed, 4),
+            "pages": page_count,
+            "pages_per_second": round(page_count / elapsed, 2) if elapsed > 0 else 0.0,
+            "phases": phases,
+            "stages": stages,
+            "counters": counters,
+            "slowest_pages": self.slowest_pages(),
+        }
+        report.update(extra or {})
+        return report
+
+    def summary_lines(self, report: Dict) -> List[str]:
+        """Human-readable summary of a report produced by to_dict"""
+        counters = report["counters"]
+        lines = [
+            f"Fetch report: {report['pages']} pages in {report['elapsed']:.1f}s "
+            f"({report['pages_per_second']:.1f} pages/s, mode {report['mode']})",
+        ]
+        for name, stats in report["stages"].items():
+            lines.append(f"  {name}: {stats['seconds']:.1f}s total, {stats['mean'] * 1000:.0f} ms/page, "
+                         f"max {stats['max'] * 1000:.0f} ms")
+        for name, seconds in report["phases"].items():
+            lines.append(f"  {name}: {seconds:.1f}s")
+        lines.append(
+            f"  API: {int(counters.get('api.requests', 0))} requests, {int(counters.get('api.retries', 0))} retries, "
+            f"{format_bytes(counters.get('api.bytes_in', 0))} in, {counters.get('api.seconds', 0):.1f}s waiting"
+        )
+        lines.append(
+            f"  Files: {int(counters.get('files.written', 0))} written, "
+            f"{format_bytes(counters.get('files.bytes_out', 0))} out, {counters.get('files.seconds', 0):.1f}s writing, "
+            f"{counters.get('files.encode_seconds', 0):.1f}s serializing"
+        )
+        attachments = sum(counters.get(f"attachments.{key}", 0) for key in ("up_to_date", "cache_hits", "downloaded"))
+        if attachments:
+            lines.append(
+                f"  Attachments: {int(attachments)} files, {int(counters.get('attachments.up_to_date', 0))} up to date, "
+                f"{int(counters.get('attachments.cache_hits', 0))} from cache, "
+                f"{int(counters.get('attachments.downloaded', 0))} downloaded "
+                f"({format_bytes(counters.get('attachments.bytes_in', 0))})"
+            )
+        if report["slowest_pages"]:
+            slowest = ", ".join(f"{page['page_id']} ({page['seconds']:.2f}s)" for page in report["slowest_pages"][:5])
+            lines.append(f"  Slowest pages: {slowest}")
+        return lines
+
+    def write(self, output_dir: str, mode: str, extra: Optional[Dict] = None) -> Dict:
+        """Write fetch-report.json to output_dir and log the summary"""
+        report = self.to_dict(mode, extra)
+        path = os.path.join(output_dir, self.FILENAME)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(temp_path, path)
+        for line in self.summary_lines(report):
+            self.logger.warning(line)
+        self.logger.info(f"Fetch report saved to {path}")
+        return report
@@ -1,8 +1,11 @@
 """Korean to English title translation service."""
 
+import hashlib
+import json
 import logging
 import os
-from typing import Protocol
+import re
+from typing import Dict, List, Optional, Protocol, Tuple
 
 from fetch.exceptions import TranslationError
 from fetch.models import Page
@@ -22,67 +25,176 @@ class TranslationServiceProtocol(Protocol):
         ...
 
 
+# Trie node key marking the end of a Korean title; "" never occurs as a single character
+_END = ""
+
+
+class TitleMatcher:
+    """Character trie of the Korean titles, matched right after each breadcrumb delimiter.
+
+    Titles are only replaced where a breadcrumb starts (after " />> " or a
+    tab), so the matcher walks the trie from each delimiter and takes the
+    longest title found there: one pass over the content, however many
+    translations there are.
+    """
+
+    DELIMITERS = re.compile(r" />> |\t")
+
+    def __init__(self, root: Dict):
+        self.root = root
+
+    @classmethod
+    def build(cls, translations: Dict[str, str]) -> "TitleMatcher":
+        root: Dict = {}
+        for korean, english in translations.items():
+            node = root
+            for char in korean:
+                node = node.setdefault(char, {})
+            node[_END] = english
+        return cls(root)
+
+    def longest_match(self, content: str, start: int) -> Optional[Tuple[int, str]]:
+        """Return (end, english) of the longest title starting at start, or None"""
+        node = self.root
+        match = None
+        for index in range(start, len(content)):
+            node = node.get(content[index])
+            if node is None:
+                break
+            if _END in node:
+                match = (index + 1, node[_END])
+        return match
+
+    def replace(self, content: str) -> str:
+        parts: List[str] = []
+        copied = 0
+        for delimiter in self.DELIMITERS.finditer(content):
+            start = delimiter.end()
+            if start <= copied:
+                continue  # Inside a title that has just been replaced
+            match = self.longest_match(content, start)
+            if match:
+                end, english = match
+                parts.append(content[copied:start])
+                parts.append(english)
+                copied = end
+        if not parts:
+            return content
+        parts.append(content[copied:])
+        return "".join(parts)
+
+
 class TranslationService:
-    """Handles Korean to English title translations"""
+    """Handles Korean to English title translations.
+
+    load_translations builds the title trie once; breadcrumbs are translated
+    with a dict lookup. The parsed translations and trie are cached in
+    cache_dir, keyed by the mtime and SHA-256 of the translations file.
+    """
 
-    def __init__(self, translations_file: str, logger: logging.Logger):
+    CACHE_FILENAME = "translations.json"
+    CACHE_VERSION = 1
+
+    def __init__(self, translations_file: str, logger: logging.Logger, cache_dir: Optional[str] = None):
         self.translations_file = translations_file
         self.logger = logger
-        self.translations = {}
+        self.cache_dir = cache_dir
+        self.translations: Dict[str, str] = {}
+        self.matcher = TitleMatcher({})
 
     def load_translations(self) -> None:
-        """Load translations from the translations file"""
+        """Load translations from the translations file, or from the cache if the file is unchanged"""
         if not os.path.exists(self.translations_file):
             self.logger.warning(f"Translations file not found: {self.translations_file}")
             return
 
         try:
-            with open(self.translations_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#') or '|' not in line:
-                        continue
-
-                    parts = line.split('|')
-                    if len(parts) == 2:
-                        korean = parts[0].strip()
-                        english = parts[1].strip()
-                        if korean and english:
-                            self.translations[korean] = english
+            with open(self.translations_file, 'rb') as f:
+                content = f.read()
+            mtime_ns = os.stat(self.translations_file).st_mtime_ns
+            sha256 = hashlib.sha256(content).hexdigest()
+            if self._load_cache(mtime_ns, sha256):
+                self.logger.info(f"Loaded {len(self.translations)} translations from cache of {self.translations_file}")
+                return
+
+            for line in content.decode('utf-8').splitlines():
+                line = line.strip()
+                if not line or line.startswith('#') or '|' not in line:
+                    continue
+
+                parts = line.split('|')
+                if len(parts) == 2:
+                    korean = parts[0].strip()
+                    english = parts[1].strip()
+                    if korean and english:
+                        self.translations[korean] = english
+            self.matcher = TitleMatcher.build(self.translations)
+            self._save_cache(mtime_ns, sha256)
 
             self.logger.info(f"Loaded {len(self.translations)} translations from {self.translations_file}")
         except Exception as e:
             self.logger.error(f"Error loading translations from {self.translations_file}: {str(e)}")
             raise TranslationError(f"Failed to load translations: {str(e)}")
 
-    def translate(self, content: str) -> str:
-        """Translate Korean titles in content to English"""
-        if not self.translations:
-            return content
+    def _cache_path(self) -> Optional[str]:
+        return os.path.join(self.cache_dir, self.CACHE_FILENAME) if self.cache_dir else None
 
-        # Sort translations by length (longest first) to avoid partial matches
-        sorted_translations = sorted(self.translations.items(), key=lambda x: len(x[0]), reverse=True)
+    def _load_cache(self, mtime_ns: int, sha256: str) -> bool:
+        """Use the cached translations if they were built from the same file content"""
+        path = self._cache_path()
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Ignoring translations cache {path}: {str(e)}")
+            return False
+        if (cache.get("version") != self.CACHE_VERSION or cache.get("file") != os.path.abspath(self.translations_file)
+                or cache.get("sha256") != sha256):
+            return False
+        self.translations = cache["translations"]
+        self.matcher = TitleMatcher(cache["trie"])
+        if cache.get("mtime_ns") != mtime_ns:
+            # Touched but not edited: keep the cache and remember the new mtime
+            self._save_cache(mtime_ns, sha256)
+        return True
+
+    def _save_cache(self, mtime_ns: int, sha256: str) -> None:
+        path = self._cache_path()
+        if not path:
+            return
+        cache = {
+            "version": self.CACHE_VERSION,
+            "file": os.path.abspath(self.translations_file),
+            "mtime_ns": mtime_ns,
+            "sha256": sha256,
+            "translations": self.translations,
+            "trie": self.matcher.root,
+        }
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Failed to save translations cache {path}: {str(e)}")
 
-        # Replace Korean titles with English translations
-        translated_content = content
-        for korean, english in sorted_translations:
-            # Replace in both the navigation path and the document title
-            translated_content = translated_content.replace(f" />> {korean}", f" />> {english}")
-            translated_content = translated_content.replace(f"\t{korean}", f"\t{english}")
+    def translate(self, content: str) -> str:
+        """Translate Korean titles in content to English.
 
-        return translated_content
+        Titles are replaced in the navigation path (after " />> ") and at the
+        start of the document title (after a tab), longest title first.
+        """
+        if not self.translations:
+            return content
+        return self.matcher.replace(content)
 
     def translate_page(self, page: Page) -> None:
         """Update English translations and path using the translator"""
         # Translate breadcrumbs to English
-        page.breadcrumbs_en = []
-        for crumb in page.breadcrumbs:
-            translated = crumb
-            for korean, english in self.translations.items():
-                if korean == crumb:
-                    translated = english
-                    break
-            page.breadcrumbs_en.append(translated)
+        page.breadcrumbs_en = [self.translations.get(crumb, crumb) for crumb in page.breadcrumbs]
 
         # Create path by slugifying English breadcrumbs
         page.path = [slugify(crumb) for crumb in page.breadcrumbs_en]
@@ -0,0 +1,85 @@
+"""Page version index used to skip re-downloading unchanged page bodies."""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Set
+
+from fetch.api_client import ApiClient
+from fetch.config import Config
+from fetch.file_manager import FileManager
+
+
+class PageVersionIndex:
+    """Compare current page versions on Confluence with the ones stored in var/.
+
+    Current versions are looked up in bulk (up to BULK_LIMIT IDs per request)
+    and compared with version.number, title and parentId of the stored page.v2.
+    A page whose title or parent changed marks its whole subtree as stale,
+    because the ancestors stored in the descendants' page.v1 change too.
+    Parents must therefore be checked before their children.
+    """
+
+    BULK_LIMIT = 250
+
+    def __init__(self, config: Config, api_client: ApiClient, file_manager: FileManager, logger: logging.Logger):
+        self.config = config
+        self.api_client = api_client
+        self.file_manager = file_manager
+        self.logger = logger
+        self._current: Dict[str, Dict] = {}
+        self._stale_structure: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, page_ids: List[str]) -> None:
+        """Look up current versions of the given pages in bulk"""
+        with self._lock:
+            missing = [page_id for page_id in dict.fromkeys(page_ids) if page_id not in self._current]
+        for i in range(0, len(missing), self.BULK_LIMIT):
+            batch = missing[i:i + self.BULK_LIMIT]
+            try:
+                summaries = self.api_client.get_page_summaries(batch)
+            except Exception as e:
+                self.logger.warning(f"Failed to look up versions of {len(batch)} pages: {str(e)}")
+                continue
+            with self._lock:
+                self._current.update(summaries)
+
+    def is_unchanged(self, page_id: str, directory: str) -> bool:
+        """Return True if the page body stored in directory is still the current version"""
+        if page_id not in self._current:
+            self.prefetch([page_id])
+        current = self._current.get(page_id)
+
+        stored = None
+        if self.file_manager.has_raw(directory, "page.v1"):
+            try:
+                stored = self.file_manager.load_raw(directory, "page.v2")
+            except Exception:
+                stored = None
+
+        if not current or not stored:
+            self.mark_stale(page_id)
+            return False
+
+        parent_id = current.get("parentId")
+        same_structure = (
+            stored.get("title") == current.get("title")
+            and str(stored.get("parentId")) == str(parent_id)
+        )
+        with self._lock:
+            parent_stale = parent_id in self._stale_structure
+        if not same_structure or parent_stale:
+            self.mark_stale(page_id)
+            return False
+
+        return stored.get("version", {}).get("number") == current.get("version", {}).get("number")
+
+    def mark_stale(self, page_id: str) -> None:
+        """Mark the subtree of a page as stale, e.g. when resuming a run that found it changed"""
+        with self._lock:
+            self._stale_structure.add(page_id)
+
+    def is_stale(self, page_id: str) -> bool:
+        with self._lock:
+            return page_id in self._stale_structure
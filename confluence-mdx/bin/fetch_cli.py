@@ -6,7 +6,7 @@ This script generates a list of pages from a Confluence space.
 Output format: page_id \t breadcrumbs
 
 The document processing follows 4 distinct stages:
-1. API Data Collection: Fetch and save API responses to YAML files
+1. API Data Collection: Fetch and save API responses (JSON by default, see raw_store.py)
 2. Content Extraction: Extract and save page content (XHTML, HTML, ADF)
 3. Attachment Download: Download attachments if specified
 4. Document Listing: Generate and output a document list with breadcrumbs
@@ -23,6 +23,11 @@ Usage examples:
   python fetch_cli.py --recent  # Download recent pages then process locally
   python fetch_cli.py --days 14  # Fetch pages modified in last 14 days (with --recent)
   python fetch_cli.py --attachments  # Download page content with attachments
+  python fetch_cli.py --subtree 123456789  # Refresh one section of pages.yaml and list.txt via API
+  python fetch_cli.py --remote --force  # Re-download page bodies even if their version is unchanged
+  python fetch_cli.py --remote --workers 8  # Walk the page tree with 8 concurrent workers
+  python fetch_cli.py --remote --backend async  # Issue API requests from an asyncio event loop
+  python fetch_cli.py --attachments --attachment-workers 8 --attachment-rate-limit 5M  # Cap attachment downloads
 """
 
 import argparse
@@ -35,7 +40,9 @@ _bin_dir = str(Path(__file__).resolve().parent)
 if _bin_dir not in sys.path:
     sys.path.insert(0, _bin_dir)
 
+import raw_store
 from fetch.config import Config
+from fetch.download_scheduler import parse_byte_rate
 from fetch.processor import ConfluencePageProcessor
 
 
@@ -55,6 +62,30 @@ def main():
     parser.add_argument("--email", default=Config().email, help="Confluence email for authentication")
     parser.add_argument("--api-token", default=Config().api_token, help="Confluence API token for authentication")
     parser.add_argument("--attachments", action="store_true", help="Download page content with attachments")
+    parser.add_argument("--attachment-workers", type=int, default=Config().attachment_workers,
+                        help="Maximum concurrent attachment downloads across all pages (default: %(default)s)")
+    parser.add_argument("--attachment-rate-limit", type=parse_byte_rate, default=Config().attachment_rate_limit,
+                        help="Combined attachment download rate in bytes per second, e.g. 500K or 5M (default: unlimited)")
+    parser.add_argument("--storage-format", default=Config().storage_format, choices=list(raw_store.FORMATS),
+                        help="Format of raw API responses saved under var/<page_id>/ (default: %(default)s)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-download page bodies even if the page version is unchanged since the last fetch")
+    parser.add_argument("--per-page-bodies", action="store_true",
+                        help="In --recent, request page.v1 for each page instead of expanding bodies in the CQL search")
+    parser.add_argument("--workers", type=int, default=Config().workers,
+                        help="Number of pages processed concurrently during the page tree walk (default: %(default)s)")
+    parser.add_argument("--local-processes", type=int, default=Config().local_processes,
+                        help="Processes parsing var/ when building the page tree from local files "
+                             "(default: one per CPU, 1 = in-process)")
+    parser.add_argument("--backend", default=Config().backend, choices=["sync", "async"],
+                        help="API backend: sync (requests) or async (httpx, asyncio) (default: %(default)s)")
+    parser.add_argument("--max-in-flight", type=int, default=Config().max_in_flight,
+                        help="Maximum concurrent API requests with --backend async (default: %(default)s)")
+    parser.add_argument("--rate-limit", type=float, default=Config().rate_limit,
+                        help="Maximum API requests per second across all workers, lowered automatically "
+                             "on X-RateLimit-*/Retry-After responses (default: unlimited)")
+    parser.add_argument("--rate-burst", type=int, default=Config().rate_burst,
+                        help="API requests allowed at once before --rate-limit applies (default: %(default)s)")
 
     # Mode selection (mutually exclusive)
     mode_group = parser.add_mutually_exclusive_group()
@@ -65,6 +96,16 @@ def main():
     mode_group.add_argument("--recent", action="store_const", dest="mode", const="recent",
                             help="Download recently modified pages, then process like --local")
 
+    parser.add_argument("--full-tree", action="store_true",
+                        help="In --recent, rebuild pages.yaml by walking the whole tree in var/ "
+                             "instead of updating it around the changed pages")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted --remote or --recent run, skipping the pages that completed "
+                             "all four stages according to var/fetch-journal.jsonl")
+    parser.add_argument("--subtree", metavar="PAGE_ID", default=None,
+                        help="Fetch only this page and its descendants, and update their entries in pages.yaml "
+                             "and list.txt (with --remote, the default, or --local)")
+
     parser.add_argument("--output-dir", default=Config().default_output_dir,
                         help="Directory to store output files (default: %(default)s)")
     parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
@@ -80,6 +121,12 @@ def main():
 
     # Determine mode (default to "recent" if not specified)
     mode = args.mode if args.mode else "recent"
+    if args.subtree:
+        if args.mode == "recent":
+            parser.error("--subtree works with --remote or --local")
+        mode = args.mode or "remote"
+    if args.resume and mode == "local":
+        parser.error("--resume works with --remote or --recent")
 
     # Create configuration
     config = Config(
@@ -91,12 +138,30 @@ def main():
         default_output_dir=args.output_dir,
         default_start_page_id=args.start_page_id,
         download_attachments=args.attachments,
-        mode=mode
+        storage_format=args.storage_format,
+        attachment_workers=max(1, args.attachment_workers),
+        attachment_rate_limit=args.attachment_rate_limit,
+        skip_unchanged=not args.force,
+        bulk_bodies=not args.per_page_bodies,
+        mode=mode,
+        resume=args.resume,
+        subtree_page_id=args.subtree,
+        incremental_tree=not args.full_tree,
+        workers=max(1, args.workers),
+        local_processes=max(0, args.local_processes),
+        backend=args.backend,
+        max_in_flight=max(1, args.max_in_flight),
+        rate_limit=max(0.0, args.rate_limit),
+        rate_burst=max(1, args.rate_burst),
     )
 
     # Create processor and run
     logger = logging.getLogger(__name__)
-    processor = ConfluencePageProcessor(config, logger)
+    if config.backend == "async":
+        from fetch.async_processor import AsyncConfluencePageProcessor
+        processor = AsyncConfluencePageProcessor(config, logger)
+    else:
+        processor = ConfluencePageProcessor(config, logger)
     processor.run()
 
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Migrate raw Confluence API responses under var/ to another storage format.
+
+Rewrites page.v1, page.v2, children.v2 and attachments.v1 of every
+var/<page_id>/ directory in the chosen format (see raw_store) and removes
+the copies in other formats. Safe to run repeatedly.
+
+Usage:
+  python migrate_storage.py                     # var/*/page.v1.yaml, ... -> *.json
+  python migrate_storage.py --format json.zst   # zstd-compressed JSON
+  python migrate_storage.py --format yaml       # back to the legacy YAML files
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Ensure bin/ is on sys.path when run as a script (e.g. python bin/migrate_storage.py)
+_bin_dir = str(Path(__file__).resolve().parent)
+if _bin_dir not in sys.path:
+    sys.path.insert(0, _bin_dir)
+
+import raw_store
+
+
+def migrate(var_dir: str, fmt: str) -> int:
+    """Migrate every page directory under var_dir and return the number of converted documents."""
+    converted = 0
+    bytes_before = bytes_after = 0
+    for entry in sorted(os.scandir(var_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        for name in raw_store.RAW_DOCUMENTS:
+            source = raw_store.find_raw(entry.path, name)
+            if source is None:
+                continue
+            size = os.path.getsize(source)
+            target = raw_store.migrate_document(entry.path, name, fmt)
+            if target is None:
+                continue
+            converted += 1
+            bytes_before += size
+            bytes_after += os.path.getsize(target)
+            logging.debug(f"Migrated {source} -> {target}")
+
+    if converted:
+        logging.warning(f"Migrated {converted} documents to {fmt}: {bytes_before:,} -> {bytes_after:,} bytes")
+    else:
+        logging.warning(f"All documents under {var_dir} are already stored as {fmt}")
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate raw API responses under var/ to another storage format")
+    parser.add_argument("--var-dir", default="var", help="Directory holding <page_id>/ directories (default: %(default)s)")
+    parser.add_argument("--format", default=raw_store.DEFAULT_FORMAT, choices=list(raw_store.FORMATS),
+                        help="Target storage format (default: %(default)s)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level (default: %(default)s)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format='%(levelname)s - %(filename)s:%(lineno)d - %(message)s',
+        stream=sys.stderr
+    )
+
+    raw_store.check_format(args.format)
+    if not os.path.isdir(args.var_dir):
+        logging.error(f"Directory not found: {args.var_dir}")
+        sys.exit(1)
+    migrate(args.var_dir, args.format)
+
+
+if __name__ == "__main__":
+    main()
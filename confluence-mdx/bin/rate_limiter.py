@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Confluence API Rate Limiting
+
+Client-side throttling shared by every caller of the Atlassian API
+(fetch.api_client, fetch.async_api_client and reverse_sync.confluence_client).
+
+- RequestRateLimiter: token bucket of requests per second with a burst size.
+  It adapts to the X-RateLimit-* and Retry-After headers of each response:
+  a 429, or a response near the limit, halves the current rate and pauses
+  every caller until the server allows requests again; successful responses
+  raise the rate back to the configured value step by step.
+- LatencyHistogram: per-endpoint response time histogram, used to tune the
+  number of workers from data.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_rate_limit_reset(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse X-RateLimit-Reset (ISO 8601 timestamp, epoch seconds or delta-seconds) into seconds to wait"""
+    if not value:
+        return None
+    value = value.strip()
+    now = time.time() if now is None else now
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, reset_at.timestamp() - now)
+    # Values this large are epoch timestamps, smaller ones are a number of seconds
+    return max(0.0, number - now) if number > 1e9 else max(0.0, number)
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Group a request URL by endpoint, e.g. GET /wiki/api/v2/pages/{id}/children"""
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", urlparse(url).path)
+    return f"{method.upper()} {path}"
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name, ""))
+    except ValueError:
+        return None
+
+
+class LatencyHistogram:
+    """Thread-safe response time histogram per endpoint"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = {
+                    "count": 0, "total": 0.0, "max": 0.0, "counts": [0] * (len(self.buckets) + 1),
+                }
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["counts"][index] += 1
+
+    def quantile(self, endpoint: str, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (the maximum for the last bucket)"""
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if not stats:
+                return None
+            target = q * stats["count"]
+            seen = 0
+            for index, count in enumerate(stats["counts"]):
+                seen += count
+                if count and seen >= target:
+                    return self.buckets[index] if index < len(self.buckets) else stats["max"]
+            return stats["max"]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return count, mean, max, p50, p90, p99 and bucket counts of every endpoint"""
+        with self._lock:
+            endpoints = sorted(self._stats)
+        result = {}
+        for endpoint in endpoints:
+            with self._lock:
+                stats = dict(self._stats[endpoint], counts=list(self._stats[endpoint]["counts"]))
+            result[endpoint] = {
+                "count": stats["count"],
+                "mean": stats["total"] / stats["count"],
+                "max": stats["max"],
+                "p50": self.quantile(endpoint, 0.5),
+                "p90": self.quantile(endpoint, 0.9),
+                "p99": self.quantile(endpoint, 0.99),
+                "buckets": {
+                    (f"<={bound}" if i < len(self.buckets) else f">{self.buckets[-1]}"): count
+                    for i, (bound, count) in enumerate(zip(self.buckets + (None,), stats["counts"]))
+                },
+            }
+        return result
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for endpoint, stats in self.snapshot().items():
+            lines.append(
+                f"{endpoint}: {stats['count']} requests, mean {stats['mean'] * 1000:.0f} ms, "
+                f"p50 <= {stats['p50'] * 1000:.0f} ms, p90 <= {stats['p90'] * 1000:.0f} ms, "
+                f"max {stats['max'] * 1000:.0f} ms"
+            )
+        return lines
+
+
+class RequestRateLimiter:
+    """Token bucket of API requests shared by every thread and coroutine of a client.
+
+    rate is the number of requests per second (0 = no fixed limit; the
+    limiter still pauses on Retry-After and exhausted X-RateLimit quotas)
+    and burst the number of requests allowed at once. Pauses longer than
+    max_pause seconds are cut to max_pause, so a bogus Retry-After does not
+    stall every caller for hours. Callers either block in acquire() or, on
+    an event loop, sleep for the delay returned by reserve().
+    """
+
+    MIN_RATE_RATIO = 0.1  # The adaptive rate never drops below this share of the configured rate
+    RECOVERY_STEP = 0.05  # Share of the configured rate regained per successful response
+    NEAR_LIMIT_RATIO = 0.1  # X-RateLimit-Remaining below this share of the limit counts as near the limit
+
+    def __init__(self, rate: float = 0.0, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, wall_clock: Callable[[], float] = time.time,
+                 max_pause: float = 300.0):
+        self.max_rate = float(rate)
+        self.max_pause = max_pause
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.sleep = sleep
+        self.wall_clock = wall_clock
+        self.latency = LatencyHistogram()
+        self.throttled = 0  # Responses that made the limiter slow down or pause
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, honor_pause: bool = True) -> float:
+        """Take a token and return the seconds to wait before sending the request.
+
+        A retry that has just waited out its own Retry-After passes
+        honor_pause=False, so the pause it caused is not waited twice.
+        """
+        with self._lock:
+            now = self.clock()
+            delay = max(0.0, self._paused_until - now) if honor_pause else 0.0
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def acquire(self, honor_pause: bool = True) -> None:
+        delay = self.reserve(honor_pause)
+        if delay > 0:
+            self.sleep(delay)
+
+    def observe(self, endpoint: str, seconds: float, status_code: int, headers: Mapping[str, str]) -> None:
+        """Record the latency of a response and adapt to its rate limit headers"""
+        self.latency.record(endpoint, seconds)
+
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        reset_in = parse_rate_limit_reset(headers.get("X-RateLimit-Reset"), self.wall_clock())
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        near_limit = (
+            str(headers.get("X-RateLimit-NearLimit", "")).lower() == "true"
+            or (remaining is not None and limit and remaining <= limit * self.NEAR_LIMIT_RATIO)
+        )
+
+        pause = None
+        if status_code in (429, 503) and (retry_after is not None or status_code == 429):
+            pause = retry_after if retry_after is not None else reset_in
+        elif remaining == 0:
+            pause = reset_in
+
+        with self._lock:
+            if pause:
+                self._paused_until = max(self._paused_until, self.clock() + min(pause, self.max_pause))
+            if status_code == 429 or near_limit or pause:
+                self.throttled += 1
+                if self.max_rate > 0:
+                    self.rate = max(self.max_rate * self.MIN_RATE_RATIO, self.rate / 2)
+            elif self.rate < self.max_rate and status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.RECOVERY_STEP)
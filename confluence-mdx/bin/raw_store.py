@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Raw API Response Storage
+
+Encoding and lookup of the raw Confluence API responses kept under
+var/<page_id>/ (page.v1, page.v2, children.v2, attachments.v1).
+
+Each document is stored in one of the following formats:
+- json:     <name>.json      compact JSON (default)
+- json.zst: <name>.json.zst  zstd-compressed JSON (requires the zstandard package)
+- yaml:     <name>.yaml      fully quoted YAML written by earlier versions (legacy)
+
+Readers look the formats up in READ_ORDER, so directories written by
+earlier versions keep working until they are migrated.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+import yaml
+
+try:
+    import zstandard
+except ImportError:  # Only required for the json.zst format
+    zstandard = None
+
+
+RAW_DOCUMENTS = ("page.v1", "page.v2", "children.v2", "attachments.v1")
+FORMATS = {
+    "json": ".json",
+    "json.zst": ".json.zst",
+    "yaml": ".yaml",
+}
+READ_ORDER = ("json.zst", "json", "yaml")
+DEFAULT_FORMAT = "json"
+
+# libyaml parses the legacy files several times faster than the pure Python loader
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def check_format(fmt: str) -> None:
+    """Fail early if a storage format is unknown or its optional dependency is missing."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown storage format: {fmt} (choose from {', '.join(FORMATS)})")
+    if fmt == "json.zst":
+        _require_zstandard()
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise SystemExit(
+            "Required package 'zstandard' is not installed for the json.zst storage format.\n"
+            "Run: pip install 'zstandard>=0.22.0'"
+        )
+
+
+def raw_path(directory: str, name: str, fmt: str = DEFAULT_FORMAT) -> str:
+    """Return the path of a raw document stored in the given format."""
+    return os.path.join(directory, name + FORMATS[fmt])
+
+
+def format_of(path: str) -> Optional[str]:
+    """Return the storage format of a path from its suffix, or None if it is not a raw document."""
+    for fmt in READ_ORDER:
+        if path.endswith(FORMATS[fmt]):
+            return fmt
+    return None
+
+
+def document_name(path: str) -> Optional[str]:
+    """Return the raw document name of a path such as var/123/page.v1.yaml, or None."""
+    filename = os.path.basename(path)
+    fmt = format_of(filename)
+    if fmt is None:
+        return None
+    name = filename[:-len(FORMATS[fmt])]
+    return name if name in RAW_DOCUMENTS else None
+
+
+def find_raw(directory: str, name: str) -> Optional[str]:
+    """Return the path of a stored raw document in any format, or None if it does not exist."""
+    for fmt in READ_ORDER:
+        path = raw_path(directory, name, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def encode(data: Any, fmt: str = DEFAULT_FORMAT) -> bytes:
+    """Encode a document in the given storage format."""
+    if fmt == "yaml":
+        return yaml.dump(data, allow_unicode=True, sort_keys=False, default_style='"').encode("utf-8")
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if fmt == "json.zst":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=3).compress(content)
+    return content
+
+
+def decode(content: bytes, fmt: str) -> Any:
+    """Decode a document stored in the given format."""
+    if fmt == "json.zst":
+        _require_zstandard()
+        content = zstandard.ZstdDecompressor().decompress(content)
+        fmt = "json"
+    if fmt == "json":
+        return json.loads(content)
+    return yaml.load(content, Loader=YamlLoader)
+
+
+def load_raw_file(path: str) -> Any:
+    """Load a document file, decoding it by its suffix (YAML for unknown suffixes)."""
+    with open(path, "rb") as f:
+        content = f.read()
+    return decode(content, format_of(path) or "yaml")
+
+
+def load_raw(directory: str, name: str) -> Optional[Any]:
+    """Load a raw document in whichever format it is stored, or None if it does not exist."""
+    path = find_raw(directory, name)
+    return load_raw_file(path) if path else None
+
+
+def resolve(path: str) -> Optional[str]:
+    """Map a path such as var/123/page.v1.yaml to the file actually stored, in any format.
+
+    Paths that are not raw documents (e.g. pages.yaml) are returned as is if they exist.
+    """
+    name = document_name(path)
+    if name is not None:
+        return find_raw(os.path.dirname(path), name)
+    return path if os.path.exists(path) else None
+
+
+def load_document(path: str) -> Any:
+    """Load a raw document or YAML file by its conventional path, whatever format it is stored in.
+
+    Raises:
+        FileNotFoundError: if neither the path nor another format of the document exists
+    """
+    resolved = resolve(path)
+    if resolved is None:
+        raise FileNotFoundError(path)
+    return load_raw_file(resolved)
+
+
+def migrate_document(directory: str, name: str, fmt: str = DEFAULT_FORMAT) -> Optional[str]:
+    """Rewrite a stored raw document in the given format and remove the other copies.
+
+    Returns the path of the converted file, or None if the document does not
+    exist or is already stored in the given format only.
+    """
+    source = find_raw(directory, name)
+    if source is None:
+        return None
+    target = raw_path(directory, name, fmt)
+    others = [raw_path(directory, name, other) for other in FORMATS if other != fmt]
+    if source == target and not any(os.path.exists(path) for path in others):
+        return None
+
+    if source != target:
+        content = encode(load_raw_file(source), fmt)
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, target)
+    for path in others:
+        if os.path.exists(path):
+            os.remove(path)
+    return target
@@ -1,12 +1,19 @@
 """Confluence API 클라이언트 — reverse sync push용."""
+import threading
+import time
 from pathlib import Path
 
 import requests
 from dataclasses import dataclass
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
+
+from rate_limiter import RequestRateLimiter, endpoint_key
 
 CONFIG_FILE = Path.home() / '.config' / 'atlassian' / 'confluence.conf'
 
+_rate_limiter: Optional[RequestRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
 
 def _load_credentials() -> Tuple[str, str]:
     """~/.config/atlassian/confluence.conf 에서 인증 정보를 로드한다."""
@@ -23,17 +30,37 @@ class ConfluenceConfig:
     base_url: str = "https://querypie.atlassian.net/wiki"
     email: str = ''
     api_token: str = ''
+    rate_limit: float = 0.0  # 초당 최대 API 요청 수 (0 = 제한 없음)
+    rate_burst: int = 10
 
     def __post_init__(self):
         if not self.email or not self.api_token:
             self.email, self.api_token = _load_credentials()
 
 
+def get_rate_limiter(config: ConfluenceConfig) -> RequestRateLimiter:
+    """프로세스 안의 모든 요청이 공유하는 rate limiter를 반환한다. 처음 호출한 config의 설정을 따른다."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RequestRateLimiter(config.rate_limit, config.rate_burst)
+        return _rate_limiter
+
+
+def _request(config: ConfluenceConfig, method: str, url: str, **kwargs) -> requests.Response:
+    """rate limiter를 거쳐 요청하고, 응답 시간과 rate limit 헤더를 기록한다."""
+    limiter = get_rate_limiter(config)
+    limiter.acquire()
+    started = time.monotonic()
+    resp = requests.request(method, url, auth=(config.email, config.api_token), **kwargs)
+    limiter.observe(endpoint_key(method, url), time.monotonic() - started, resp.status_code, resp.headers)
+    return resp
+
+
 def get_page_version(config: ConfluenceConfig, page_id: str) -> Dict[str, Any]:
     """페이지의 현재 version number와 title을 조회한다."""
     url = f"{config.base_url}/rest/api/content/{page_id}?expand=version"
-    resp = requests.get(url, auth=(config.email, config.api_token),
-                        headers={"Accept": "application/json"})
+    resp = _request(config, 'GET', url, headers={"Accept": "application/json"})
     resp.raise_for_status()
     data = resp.json()
     return {
@@ -57,8 +84,8 @@ def update_page_body(config: ConfluenceConfig, page_id: str,
             }
         },
     }
-    resp = requests.put(url, json=payload, auth=(config.email, config.api_token),
-                        headers={"Content-Type": "application/json",
-                                 "Accept": "application/json"})
+    resp = _request(config, 'PUT', url, json=payload,
+                    headers={"Content-Type": "application/json",
+                             "Accept": "application/json"})
     resp.raise_for_status()
     return resp.json()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""fetch_cli.py 벤치마크: 기록된 응답을 재생하는 대역 서버에 대해 worker 수별 처리량과 최대 RSS 를 잰다.
+
+tests/testcases/*/ 의 응답과 이미지 파일을 템플릿으로 합성 트리를 만들고,
+worker 수마다 빈 작업 디렉터리에서 fetch_cli.py --remote 를 실행한다.
+
+    ../venv/bin/python benchmark_fetch.py --depth 2 --fanout 20 --latency 0.05 --attachments
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+
+from fake_confluence import FakeConfluence
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(TESTS_DIR)
+FETCH_CLI = os.path.join(PROJECT_DIR, "bin", "fetch_cli.py")
+
+
+def build_server(testcases: str, root_id: str, depth: int, fanout: int, latency: float = 0.0,
+                 throttle_every: int = 0) -> FakeConfluence:
+    """Start a fake Confluence replaying testcases, with a synthetic tree of copies below root_id"""
+    fake = FakeConfluence.from_testcases(testcases, root_id)
+    templates = [page for page in fake.pages.values() if page.recorded]
+    if depth:
+        fake.build_tree(root_id, depth, fanout, templates)
+    fake.latency = latency
+    fake.throttle_every = throttle_every
+    return fake.start()
+
+
+def _peak_rss_mib(maxrss: int) -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def run_fetch(base_url: str, start_page_id: str, workers: int, workdir: str,
+              extra_args: Sequence[str] = ()) -> Dict:
+    """Run fetch_cli.py --remote in workdir and return its throughput and peak RSS"""
+    os.symlink(os.path.join(PROJECT_DIR, "etc"), os.path.join(workdir, "etc"))
+    command = [
+        sys.executable, FETCH_CLI, "--remote",
+        "--base-url", base_url, "--email", "benchmark", "--api-token", "benchmark",
+        "--start-page-id", start_page_id, "--workers", str(workers),
+        "--output-dir", "var", "--log-level", "ERROR", *extra_args,
+    ]
+    log_path = os.path.join(workdir, "fetch.log")
+    started = time.monotonic()
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(command, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.monotonic() - started
+    if process.returncode != 0:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            raise RuntimeError(f"fetch_cli.py exited with {process.returncode}:\n{f.read()[-2000:]}")
+
+    with open(os.path.join(workdir, "var", "fetch-report.json"), "r", encoding="utf-8") as f:
+        report = json.load(f)
+    counters = report["counters"]
+    return {
+        "workers": workers,
+        "pages": report["pages"],
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(report["pages"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "peak_rss_mib": round(_peak_rss_mib(usage.ru_maxrss), 1),
+        "requests": int(counters.get("api.requests", 0)),
+        "retries": int(counters.get("api.retries", 0)),
+    }
+
+
+def run_benchmark(fake: FakeConfluence, start_page_id: str, worker_counts: Sequence[int],
+                  extra_args: Sequence[str] = ()) -> List[Dict]:
+    results = []
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory(prefix="benchmark-fetch-") as workdir:
+            results.append(run_fetch(fake.base_url, start_page_id, workers, workdir, extra_args))
+    return results
+
+
+def format_results(results: Sequence[Dict]) -> List[str]:
+    lines = [f"{'workers':>7}  {'pages':>6}  {'seconds':>8}  {'pages/s':>8}  {'peak RSS':>9}  {'requests':>8}  {'retries':>7}"]
+    for result in results:
+        lines.append(
+            f"{result['workers']:>7}  {result['pages']:>6}  {result['seconds']:>8.2f}  "
+            f"{result['pages_per_second']:>8.1f}  {result['peak_rss_mib']:>5.1f} MiB  "
+            f"{result['requests']:>8}  {result['retries']:>7}"
+        )
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark fetch_cli.py against a fake Confluence")
+    parser.add_argument("--testcases", default=os.path.join(TESTS_DIR, "testcases"),
+                        help="Directory of recorded responses used as page templates (default: tests/testcases)")
+    parser.add_argument("--root-id", default="608501837", help="Start page ID (default: 608501837)")
+    parser.add_argument("--depth", type=int, default=2, help="Depth of the synthetic tree (default: 2)")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per page (default: 10)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16],
+                        help="Worker counts to measure (default: 1 4 16)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--throttle-every", type=int, default=0,
+                        help="Answer every Nth request with 429 Retry-After: 0 (default: never)")
+    parser.add_argument("--attachments", action="store_true", help="Download attachments too")
+    parser.add_argument("--backend", choices=["sync", "async"], default="sync", help="API backend (default: sync)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    fake = build_server(args.testcases, args.root_id, args.depth, args.fanout, args.latency, args.throttle_every)
+    print(f"Fake Confluence: {len(fake.pages)} pages at {fake.base_url}, latency {args.latency}s", flush=True)
+    extra_args = ["--backend", args.backend] + (["--attachments"] if args.attachments else [])
+    try:
+        results = run_benchmark(fake, args.root_id, args.workers, extra_args)
+    finally:
+        fake.stop()
+
+    for line in format_results(results):
+        print(line)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""TranslationService 마이크로 벤치마크: 이전 str.replace 방식과 제목 trie 방식의 translate, translate_page 및 캐시 적재 시간을 비교한다.
+
+etc/korean-titles-translations.txt 에 합성 제목을 더해 사전을 키우고,
+var/list.txt 를 여러 번 이어 붙인 내용을 번역한다.
+
+    ../venv/bin/python benchmark_translation.py --entries 5000 --repeat 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bin'))
+
+from fetch.models import Page
+from fetch.translation import TranslationService
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(TESTS_DIR)
+TRANSLATIONS_FILE = os.path.join(PROJECT_DIR, "etc", "korean-titles-translations.txt")
+LIST_FILE = os.path.join(PROJECT_DIR, "var", "list.txt")
+
+
+def naive_translate(translations: Dict[str, str], content: str) -> str:
+    """The previous TranslationService.translate: sort on every call, two str.replace passes per title"""
+    sorted_translations = sorted(translations.items(), key=lambda x: len(x[0]), reverse=True)
+    translated_content = content
+    for korean, english in sorted_translations:
+        translated_content = translated_content.replace(f" />> {korean}", f" />> {english}")
+        translated_content = translated_content.replace(f"\t{korean}", f"\t{english}")
+    return translated_content
+
+
+def naive_breadcrumbs(translations: Dict[str, str], breadcrumbs: Sequence[str]) -> List[str]:
+    """The previous TranslationService.translate_page: a linear scan per breadcrumb"""
+    result = []
+    for crumb in breadcrumbs:
+        translated = crumb
+        for korean, english in translations.items():
+            if korean == crumb:
+                translated = english
+                break
+        result.append(translated)
+    return result
+
+
+def write_translations(path: str, entries: int) -> None:
+    """Write the real translations followed by synthetic titles up to entries lines"""
+    with open(TRANSLATIONS_FILE, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    for i in range(max(0, entries - len(lines))):
+        lines.append(f"합성 문서 제목 {i:05d} | Synthetic Title {i:05d}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _time(function: Callable[[], object], repeat: int) -> float:
+    """Best wall time of repeat calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_benchmark(entries: int, copies: int, repeat: int) -> Dict[str, float]:
+    logger = logging.getLogger("benchmark")
+    with open(LIST_FILE, "r", encoding="utf-8") as f:
+        content = f.read() * copies
+    breadcrumbs = [line.split("\t", 1)[1].split(" />> ") for line in content.splitlines() if "\t" in line]
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-translation-") as workdir:
+        translations_file = os.path.join(workdir, "translations.txt")
+        cache_dir = os.path.join(workdir, "cache")
+        write_translations(translations_file, entries)
+
+        def load(use_cache: bool) -> TranslationService:
+            service = TranslationService(translations_file, logger, cache_dir=cache_dir if use_cache else None)
+            service.load_translations()
+            return service
+
+        service = load(use_cache=True)  # Writes the cache
+        translations = service.translations
+        assert service.translate(content) == naive_translate(translations, content)
+
+        def translate_pages():
+            for crumbs in breadcrumbs:
+                service.translate_page(Page(page_id="", title="", title_orig="", breadcrumbs=crumbs))
+
+        return {
+            "entries": len(translations),
+            "lines": len(breadcrumbs),
+            "load_parse_ms": _time(lambda: load(use_cache=False), repeat),
+            "load_cached_ms": _time(lambda: load(use_cache=True), repeat),
+            "translate_naive_ms": _time(lambda: naive_translate(translations, content), repeat),
+            "translate_ms": _time(lambda: service.translate(content), repeat),
+            "breadcrumbs_naive_ms": _time(lambda: [naive_breadcrumbs(translations, c) for c in breadcrumbs], repeat),
+            "translate_page_ms": _time(translate_pages, repeat),
+        }
+
+
+def format_results(results: Dict[str, float]) -> List[str]:
+    return [
+        f"{results['entries']} translations, {results['lines']} lines",
+        f"{'load':<12} parse {results['load_parse_ms']:>9.2f} ms   cached {results['load_cached_ms']:>9.2f} ms",
+        f"{'translate':<12} naive {results['translate_naive_ms']:>9.2f} ms   trie   {results['translate_ms']:>9.2f} ms",
+        f"{'breadcrumbs':<12} naive {results['breadcrumbs_naive_ms']:>9.2f} ms   dict   {results['translate_page_ms']:>9.2f} ms",
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TranslationService against the previous str.replace approach")
+    parser.add_argument("--entries", type=int, default=5000, help="Translations in the dictionary (default: 5000)")
+    parser.add_argument("--copies", type=int, default=10, help="Copies of var/list.txt to translate (default: 10)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is reported (default: 5)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.entries, args.copies, args.repeat)
+    for line in format_results(results):
+        print(line)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,45 @@
-"""pytest 공통 설정: bin/ 디렉터리를 sys.path에 추가."""
+"""pytest 공통 설정: bin/ 디렉터리를 sys.path에 추가하고, Confluence 대역 서버 fixture 와 Config 헬퍼를 제공한다."""
 
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bin"))
+
+from fake_confluence import FakeConfluence  # noqa: E402
+from fetch.config import Config  # noqa: E402
+
+
+ROOT_ID = "100"
+
+
+@pytest.fixture
+def confluence_tree():
+    """대역 서버에 페이지를 채우는 함수. 테스트 모듈마다 같은 이름의 fixture 로 자기 트리를 정의한다."""
+    return lambda fake: fake.add_page(ROOT_ID, "Root")
+
+
+@pytest.fixture
+def fake_confluence(confluence_tree):
+    fake = FakeConfluence()
+    confluence_tree(fake)
+    fake.start()
+    yield fake
+    fake.stop()
+
+
+def make_config(fake: FakeConfluence, output_dir: Path, **overrides) -> Config:
+    """대역 서버를 향하고 output_dir 아래에 쓰는 Config. 재시도 없이 바로 실패한다."""
+    settings = dict(
+        base_url=fake.base_url,
+        email="tester@example.com",
+        api_token="token",
+        default_output_dir=str(output_dir),
+        default_start_page_id=ROOT_ID,
+        cache_dir=str(output_dir / "cache"),
+        translations_file=str(output_dir / "no-translations.txt"),
+        max_retries=0,
+    )
+    settings.update(overrides)
+    return Config(**settings)
@@ -2,6 +2,11 @@
 
 # Copy generated files from confluence-mdx/var into matching testcases.
 # Run this script from confluence-mdx/tests directory.
+#
+# fetch_cli.py stores raw API responses (page.v1, page.v2, children.v2,
+# attachments.v1) as JSON by default, while testcases keep them as YAML.
+# The copied documents are converted to YAML and the JSON copies removed,
+# since readers would otherwise prefer the JSON copy over the YAML file.
 
 set -o nounset -o errtrace -o pipefail
 
@@ -15,3 +20,5 @@ for testcase in testcases/[0-9]*; do
     ( set -x; cp "$source" "$testcase/$target" )
   done
 done
+
+( set -x; python3 ../bin/migrate_storage.py --var-dir testcases --format yaml )
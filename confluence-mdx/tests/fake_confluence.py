@@ -0,0 +1,465 @@
+"""테스트용 Confluence REST API 대역 서버.
+
+fetch 패키지가 호출하는 V1/V2 엔드포인트만 흉내 낸다. 페이지 트리는
+FakeConfluence.add_page() 로 구성하고, 요청 기록은 requests 에 남는다.
+FakeConfluence.from_testcases() 는 tests/testcases/*/ 에 기록된 응답과 이미지
+파일을 그대로 재생한다. 벤치마크용으로 단독 실행할 수도 있다:
+
+    python fake_confluence.py --testcases testcases --depth 3 --fanout 10 --latency 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bin'))
+from raw_store import RAW_DOCUMENTS, load_raw
+
+
+@dataclass
+class FakePage:
+    page_id: str
+    title: str
+    parent_id: Optional[str] = None
+    body: str = ""
+    version: int = 1
+    created_at: str = "2025-01-01T00:00:00.000Z"
+    attachments: Dict[str, bytes] = field(default_factory=dict)
+    # Recorded responses replayed instead of the generated ones ("page.v1", "page.v2", "attachments.v1")
+    recorded: Dict[str, Dict] = field(default_factory=dict)
+
+
+@dataclass
+class _Failure:
+    pattern: "re.Pattern"
+    status: int
+    remaining: Optional[int]
+    headers: Dict[str, str]
+
+
+class FakeConfluence:
+    """In-memory Confluence space served over HTTP on localhost."""
+
+    def __init__(self):
+        self.pages: Dict[str, FakePage] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.requests: List[str] = []
+        self.failures: List[_Failure] = []
+        self.connections = 0
+        self.latency = 0.0  # seconds added to every response
+        self.children_page_limit = 250  # server-side cap of the children page size
+        self.search_latency = 0.0  # seconds added to every CQL search response
+        self.search_body_limit = 50  # server-side cap of the search page size when bodies are expanded
+        self.search_omitted_bodies: set = set()  # page IDs whose bodies expanded searches leave out
+        self.throttle_every = 0  # answer every Nth request with 429 Retry-After: 0 (0 = never)
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._served = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- tree construction ---------------------------------------------------
+
+    def add_page(self, page_id: str, title: str, parent_id: Optional[str] = None, **kwargs) -> FakePage:
+        page = FakePage(page_id=page_id, title=title, parent_id=parent_id, **kwargs)
+        if not page.body:
+            page.body = f"<p>{title}</p>"
+        self.pages[page_id] = page
+        self.children.setdefault(page_id, [])
+        if parent_id is not None:
+            self.children.setdefault(parent_id, []).append(page_id)
+        return page
+
+    def build_tree(self, root_id: str, depth: int, fanout: int, templates: Sequence[FakePage] = ()) -> None:
+        """Create a synthetic tree of the given depth and fanout under root_id.
+
+        With templates, the pages take their body, attachments and recorded
+        responses from the templates in turn, e.g. the pages of from_testcases().
+        An existing root_id page is kept.
+        """
+        if root_id not in self.pages:
+            self.add_page(root_id, "Root")
+        frontier = [root_id]
+        created = 0
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for parent_id in frontier:
+                for i in range(fanout):
+                    page_id = f"{parent_id}{level}{i}"
+                    kwargs = {}
+                    if templates:
+                        template = templates[created % len(templates)]
+                        kwargs = {"body": template.body, "attachments": template.attachments,
+                                  "recorded": template.recorded}
+                    self.add_page(page_id, f"Page {page_id}", parent_id, **kwargs)
+                    next_frontier.append(page_id)
+                    created += 1
+            frontier = next_frontier
+
+    @classmethod
+    def from_testcases(cls, directory: str, root_id: str = "608501837") -> "FakeConfluence":
+        """Replay the responses recorded in directory/*/ (page.v1, page.v2, children.v2, attachments.v1 and files).
+
+        Pages keep their recorded parent when it is recorded too, and hang below
+        root_id otherwise; siblings follow the recorded childPosition.
+        """
+        fake = cls()
+        loaded: Dict[str, Dict[str, Dict]] = {}
+        for name in sorted(os.listdir(directory)):
+            page_dir = os.path.join(directory, name)
+            recorded = {document: load_raw(page_dir, document) for document in RAW_DOCUMENTS}
+            if recorded["page.v1"]:
+                loaded[name] = {document: data for document, data in recorded.items() if data is not None}
+
+        root_title = "Root"
+        positions: Dict[str, int] = {}
+        for recorded in loaded.values():
+            for ancestor in recorded["page.v1"].get("ancestors", []):
+                if ancestor.get("id") == root_id:
+                    root_title = ancestor.get("title", root_title)
+            for child in (recorded.get("children.v2") or {}).get("results", []):
+                positions[child["id"]] = child.get("childPosition", 0)
+        fake.add_page(root_id, root_title)
+
+        def parent_of(page_id: str) -> str:
+            parent_id = (loaded[page_id].get("page.v2") or {}).get("parentId")
+            return parent_id if parent_id in loaded else root_id
+
+        # Parents before children, siblings in recorded order
+        added = {root_id}
+        pending = sorted(loaded, key=lambda page_id: (positions.get(page_id, 0), page_id))
+        while pending:
+            waiting = []
+            for page_id in pending:
+                if parent_of(page_id) not in added:
+                    waiting.append(page_id)
+                    continue
+                recorded = loaded[page_id]
+                v1_data, v2_data = recorded["page.v1"], recorded.get("page.v2") or {}
+                version = v2_data.get("version", {})
+                attachments = {}
+                for attachment in (recorded.get("attachments.v1") or {}).get("results", []):
+                    path = os.path.join(directory, page_id, attachment["title"])
+                    if os.path.exists(path):
+                        with open(path, "rb") as f:
+                            attachments[attachment["title"]] = f.read()
+                fake.add_page(
+                    page_id, v1_data["title"], parent_of(page_id),
+                    body=v1_data.get("body", {}).get("storage", {}).get("value", ""),
+                    version=version.get("number", 1),
+                    created_at=version.get("createdAt", "2025-01-01T00:00:00.000Z"),
+                    attachments=attachments,
+                    recorded={name: data for name, data in recorded.items() if name != "children.v2"},
+                )
+                added.add(page_id)
+            if len(waiting) == len(pending):
+                raise ValueError(f"Recorded parents form a cycle: {waiting}")
+            pending = waiting
+        return fake
+
+    def move_page(self, page_id: str, parent_id: str, position: Optional[int] = None) -> None:
+        """Move a page below another parent, at the end of its children unless a position is given."""
+        page = self.pages[page_id]
+        self.children[page.parent_id].remove(page_id)
+        siblings = self.children.setdefault(parent_id, [])
+        siblings.insert(len(siblings) if position is None else position, page_id)
+        page.parent_id = parent_id
+
+    def delete_page(self, page_id: str) -> None:
+        """Delete a page and its descendants."""
+        for child_id in list(self.children.get(page_id, [])):
+            self.delete_page(child_id)
+        page = self.pages.pop(page_id)
+        self.children.pop(page_id, None)
+        if page.parent_id is not None:
+            self.children[page.parent_id].remove(page_id)
+
+    def ancestors(self, page_id: str) -> List[FakePage]:
+        chain = []
+        parent_id = self.pages[page_id].parent_id
+        while parent_id is not None:
+            chain.append(self.pages[parent_id])
+            parent_id = self.pages[parent_id].parent_id
+        return list(reversed(chain))
+
+    # -- response payloads ---------------------------------------------------
+
+    # Recorded responses are replayed as is, except for the fields that follow
+    # the fake tree (ID, title, ancestors, parent, version and body), so that
+    # synthetic copies and moved or edited pages stay consistent.
+
+    def page_v1(self, page_id: str) -> Dict:
+        page = self.pages[page_id]
+        payload = dict(page.recorded.get("page.v1") or {"type": "page", "status": "current"})
+        body = payload["body"] = dict(payload.get("body", {}))
+        if body.get("storage", {}).get("value") != page.body:
+            body["storage"] = {"value": page.body, "representation": "storage"}
+            body["view"] = {"value": page.body, "representation": "view"}
+        payload.update({
+            "id": page.page_id,
+            "title": page.title,
+            "ancestors": [{"id": a.page_id, "type": "page", "title": a.title} for a in self.ancestors(page_id)],
+        })
+        return payload
+
+    def page_v2(self, page_id: str) -> Dict:
+        page = self.pages[page_id]
+        payload = dict(page.recorded.get("page.v2") or {
+            "status": "current",
+            "body": {"atlas_doc_format": {"representation": "atlas_doc_format", "value": "{}"}},
+        })
+        payload["version"] = dict(payload.get("version", {}), number=page.version, createdAt=page.created_at)
+        payload.update({"parentId": page.parent_id, "id": page.page_id, "title": page.title})
+        return payload
+
+    def page_summaries_v2(self, page_ids: List[str]) -> Dict:
+        results = []
+        for page_id in page_ids:
+            if page_id in self.pages:
+                summary = self.page_v2(page_id)
+                del summary["body"]
+                results.append(summary)
+        return {"results": results, "_links": {}}
+
+    def children_v2(self, page_id: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Dict:
+        """Children in result pages of limit entries, linked by an opaque offset cursor."""
+        results = [
+            {"id": child_id, "status": "current", "title": self.pages[child_id].title, "childPosition": position}
+            for position, child_id in enumerate(self.children.get(page_id, []))
+        ]
+        limit = min(limit or 25, self.children_page_limit)
+        offset = int(cursor) if cursor else 0
+        links = {"base": self.base_url}
+        if offset + limit < len(results):
+            links["next"] = f"/wiki/api/v2/pages/{page_id}/children?type=page&limit={limit}&cursor={offset + limit}"
+        return {"results": results[offset:offset + limit], "_links": links}
+
+    def search_v1(self, cql: str, start: int, limit: int, expand: str = "") -> Dict:
+        """CQL search honoring only the lastModified >= "YYYY-MM-DD" clause.
+
+        With expand=...body.storage... each result is the page.v1 document, except
+        for pages in search_omitted_bodies, and the page size is capped.
+        """
+        match = re.search(r'lastModified >= "(\d{4}-\d{2}-\d{2})"', cql)
+        since = match.group(1) if match else ""
+        matching = [page for page in self.pages.values() if page.created_at[:10] >= since]
+        expanded = "body.storage" in expand
+        if expanded:
+            limit = min(limit, self.search_body_limit)
+        results = []
+        for page in matching[start:start + limit]:
+            if not expanded:
+                results.append({"id": page.page_id, "type": "page", "title": page.title})
+            elif page.page_id in self.search_omitted_bodies:
+                result = self.page_v1(page.page_id)
+                result["body"] = {"_expandable": {"storage": "", "view": ""}}
+                results.append(result)
+            else:
+                results.append(self.page_v1(page.page_id))
+        return {"results": results, "start": start, "limit": limit, "size": len(results)}
+
+    def attachments_v1(self, page_id: str) -> Dict:
+        """Attachments of a page; recorded entries are kept when their file is served, with its actual size."""
+        page = self.pages[page_id]
+        recorded = {
+            attachment["title"]: attachment
+            for attachment in (page.recorded.get("attachments.v1") or {}).get("results", [])
+        }
+        results = []
+        for i, (filename, content) in enumerate(page.attachments.items()):
+            attachment = dict(recorded.get(filename, {"type": "attachment", "title": filename}))
+            # Copies of a recorded page get their own file IDs, like distinct uploads
+            attachment["extensions"] = dict(attachment.get("extensions", {}), fileSize=len(content),
+                                            fileId=hashlib.sha1(page_id.encode("utf-8") + content).hexdigest())
+            attachment["id"] = f"att{page_id}{i}"
+            results.append(attachment)
+        return {"results": results, "size": len(results)}
+
+    def attachment_content(self, page_id: str, attachment_id: str) -> Optional[bytes]:
+        for i, content in enumerate(self.pages[page_id].attachments.values()):
+            if attachment_id == f"att{page_id}{i}":
+                return content
+        return None
+
+    # -- server lifecycle ----------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/wiki"
+
+    def start(self, port: int = 0) -> "FakeConfluence":
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.requests.append(path)
+
+    def fail(self, pattern: str, status: int = 500, times: Optional[int] = None,
+             headers: Optional[Dict[str, str]] = None) -> None:
+        """Answer requests whose path matches pattern with the given status.
+
+        times limits how many requests fail (None = every request); headers are
+        added to the failure response, e.g. {"Retry-After": "1"}.
+        """
+        self.failures.append(_Failure(re.compile(pattern), status, times, headers or {}))
+
+    def injected_failure(self, path: str) -> Optional["_Failure"]:
+        with self._lock:
+            self._served += 1
+            if self.throttle_every and self._served % self.throttle_every == 0:
+                self.throttled += 1
+                return _Failure(re.compile(""), 429, None, {"Retry-After": "0"})
+            for failure in self.failures:
+                if failure.remaining == 0 or not failure.pattern.search(path):
+                    continue
+                if failure.remaining is not None:
+                    failure.remaining -= 1
+                return failure
+        return None
+
+    def clear_requests(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    def count(self, pattern: str) -> int:
+        regex = re.compile(pattern)
+        with self._lock:
+            return sum(1 for path in self.requests if regex.search(path))
+
+
+_ROUTES = [
+    (re.compile(r"^/wiki/rest/api/content/(\d+)/child/attachment/([^/]+)/download$"), "download"),
+    (re.compile(r"^/wiki/rest/api/content/(\d+)/child/attachment$"), "attachments_v1"),
+    (re.compile(r"^/wiki/rest/api/content/(\d+)$"), "page_v1"),
+    (re.compile(r"^/wiki/api/v2/pages/(\d+)/children$"), "children_v2"),
+    (re.compile(r"^/wiki/api/v2/pages/(\d+)$"), "page_v2"),
+]
+
+
+def _make_handler(fake: FakeConfluence):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with fake._lock:
+                fake.connections += 1
+
+        def do_GET(self):
+            with fake._lock:
+                fake.in_flight += 1
+                fake.peak_in_flight = max(fake.peak_in_flight, fake.in_flight)
+            try:
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self._handle_get()
+            finally:
+                with fake._lock:
+                    fake.in_flight -= 1
+
+        def _handle_get(self):
+            parsed = urlparse(self.path)
+            fake.record(self.path)
+            query = parse_qs(parsed.query)
+            failure = fake.injected_failure(self.path)
+            if failure is not None:
+                return self._send(failure.status, b'{"message": "injected failure"}', "application/json",
+                                  failure.headers)
+            if parsed.path == "/wiki/rest/api/content/search":
+                if fake.search_latency:
+                    time.sleep(fake.search_latency)
+                payload = fake.search_v1(query.get("cql", [""])[0], int(query.get("start", ["0"])[0]),
+                                         int(query.get("limit", ["25"])[0]), query.get("expand", [""])[0])
+                return self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+            if parsed.path == "/wiki/api/v2/pages":
+                page_ids = query.get("id", [""])[0].split(",")
+                payload = fake.page_summaries_v2([page_id for page_id in page_ids if page_id])
+                return self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+            for regex, route in _ROUTES:
+                match = regex.match(parsed.path)
+                if not match:
+                    continue
+                page_id = match.group(1)
+                if page_id not in fake.pages:
+                    break
+                if route == "download":
+                    content = fake.attachment_content(page_id, match.group(2))
+                    if content is None:
+                        break
+                    return self._send(200, content, "application/octet-stream")
+                if route == "children_v2":
+                    limit = query.get("limit", [None])[0]
+                    payload = fake.children_v2(page_id, query.get("cursor", [None])[0], int(limit) if limit else None)
+                    return self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+                payload = getattr(fake, route)(page_id)
+                return self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+            self._send(404, b'{"message": "not found"}', "application/json")
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Confluence space on localhost")
+    parser.add_argument("--testcases", help="Replay the responses recorded in this directory (e.g. tests/testcases)")
+    parser.add_argument("--root-id", default="608501837", help="Root page ID (default: 608501837)")
+    parser.add_argument("--depth", type=int, default=0, help="Depth of a synthetic tree added below the root")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per page of the synthetic tree")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (default: any free port)")
+    args = parser.parse_args()
+
+    fake = FakeConfluence.from_testcases(args.testcases, args.root_id) if args.testcases else FakeConfluence()
+    templates = [page for page in fake.pages.values() if page.recorded]
+    if args.depth:
+        fake.build_tree(args.root_id, args.depth, args.fanout, templates)
+    elif not args.testcases:
+        fake.add_page(args.root_id, "Root")
+    fake.latency = args.latency
+    fake.throttle_every = args.throttle_every
+    fake.start(args.port)
+    print(f"Serving {len(fake.pages)} pages at {fake.base_url} (start page ID {args.root_id})", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""convert_all / converter.batch 테스트 — 한 프로세스 안의 일괄 변환이 페이지마다 converter/cli.py 를 실행한 결과와 같은지 검증한다."""
+
+import copy
+import logging
+import shutil
+from pathlib import Path
+
+import pytest
+
+import convert_all
+from converter.batch import ConvertJob, convert_pages
+from conftest import make_config
+from converter.manifest import ConversionManifest
+from fake_confluence import FakeConfluence
+from fetch.processor import ConfluencePageProcessor
+from raw_store import load_document
+
+
+TESTCASES = Path(__file__).parent / "testcases"
+PAGE_ID = "883654669"
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return load_document(str(TESTCASES / "pages.yaml"))
+
+
+def _files(directory: Path):
+    return {str(path.relative_to(directory)): path.read_bytes() for path in sorted(directory.rglob("*")) if path.is_file()}
+
+
+def _convert(pages, tmp_path, name, **kwargs):
+    output = tmp_path / name
+    failures = convert_all.convert_all(pages, str(TESTCASES), str(output / "ko"), str(output / "public"),
+                                       "warning", **kwargs)
+    return failures, output
+
+
+class TestConvertAll:
+    def test_in_process_output_matches_subprocess(self, pages, tmp_path):
+        batch_failures, batch = _convert(pages, tmp_path, "batch")
+        subprocess_failures, separate = _convert(pages, tmp_path, "subprocess", use_subprocess=True)
+
+        assert batch_failures == subprocess_failures == 0
+        assert _files(batch)
+        assert _files(batch) == _files(separate)
+
+    def test_parallel_output_matches_serial(self, pages, tmp_path, capsys):
+        serial_failures, serial = _convert(pages, tmp_path, "serial")
+        serial_log = capsys.readouterr().err
+        parallel_failures, parallel = _convert(pages, tmp_path, "parallel", jobs=2)
+        parallel_log = capsys.readouterr().err
+
+        assert parallel_failures == serial_failures
+        assert _files(parallel) == _files(serial)
+
+        def order(log):
+            return [line.split(" → ")[0] for line in log.splitlines() if line.startswith("[")]
+        assert order(parallel_log) == order(serial_log)
+        assert "pages/s, ETA" in parallel_log
+
+    def test_format_progress(self):
+        assert convert_all.format_progress(10, 90, 2.0) == "5.0 pages/s, ETA 0:18"
+        assert convert_all.format_progress(0, 10, 0.0) == "-- pages/s, ETA --:--"
+
+
+class TestConvertPages:
+    def test_failed_page_does_not_stop_the_batch(self, pages, tmp_path):
+        jobs = [
+            ConvertJob("missing", str(tmp_path / "missing" / "page.xhtml"), str(tmp_path / "missing.mdx")),
+            ConvertJob(PAGE_ID, str(TESTCASES / PAGE_ID / "page.xhtml"), str(tmp_path / "page.mdx"), "/page"),
+        ]
+        handlers = logging.getLogger().handlers[:]
+
+        results = convert_pages(jobs, pages, str(tmp_path / "public"), skip_image_copy=True)
+
+        assert [result.job.page_id for result in results] == ["missing", PAGE_ID]
+        assert not results[0].ok
+        assert "Error during conversion" in results[0].log
+        assert results[1].ok
+        assert (tmp_path / "page.mdx").read_text(encoding="utf-8").startswith("---")
+        assert logging.getLogger().handlers == handlers
+
+    def test_pool_results_are_in_job_order(self, pages, tmp_path):
+        page_ids = [path.name for path in sorted(TESTCASES.iterdir()) if (path / "page.xhtml").exists()][:6]
+        jobs = [ConvertJob(page_id, str(TESTCASES / page_id / "page.xhtml"), str(tmp_path / f"{page_id}.mdx"))
+                for page_id in page_ids]
+        jobs.insert(3, ConvertJob("missing", str(tmp_path / "missing" / "page.xhtml"), str(tmp_path / "missing.mdx")))
+
+        results = convert_pages(jobs, pages, str(tmp_path / "public"), skip_image_copy=True, processes=2)
+
+        assert [result.job.page_id for result in results] == [job.page_id for job in jobs]
+        assert [result.ok for result in results] == [job.page_id != "missing" for job in jobs]
+
+
+LINKING_PAGE_ID = "544377869"  # "Proxy Management\u200b" 제목의 페이지로 링크한다
+OTHER_PAGE_ID = "568918170"
+LINKED_PAGE_ID = "954204974"
+
+
+class TestIncrementalConversion:
+    @pytest.fixture
+    def var_dir(self, tmp_path):
+        var_dir = tmp_path / "var"
+        (var_dir / LINKING_PAGE_ID).mkdir(parents=True)
+        for name in ("page.xhtml", "page.v1.yaml", "children.v2.yaml", "attachments.v1.yaml"):
+            shutil.copy(TESTCASES / LINKING_PAGE_ID / name, var_dir / LINKING_PAGE_ID / name)
+        shutil.copytree(TESTCASES / OTHER_PAGE_ID, var_dir / OTHER_PAGE_ID)  # 첨부파일 포함
+        return var_dir
+
+    def _run(self, pages, var_dir, tmp_path, code=None, **kwargs):
+        manifest = ConversionManifest(str(var_dir / ConversionManifest.FILENAME), pages, str(tmp_path / "public"),
+                                      code=code)
+        failures = convert_all.convert_all(pages, str(var_dir), str(tmp_path / "ko"), str(tmp_path / "public"),
+                                           "warning", manifest=manifest, **kwargs)
+        return failures, manifest
+
+    def _converted(self, log):
+        return sorted(line.split("] ")[1].split(" ")[0] for line in log.splitlines()
+                      if line.startswith("[") and " → " in line)
+
+    def test_unchanged_pages_are_skipped(self, pages, var_dir, tmp_path, capsys):
+        self._run(pages, var_dir, tmp_path)
+        assert self._converted(capsys.readouterr().err) == [LINKING_PAGE_ID, OTHER_PAGE_ID]
+        outputs = _files(tmp_path / "ko")
+
+        self._run(pages, var_dir, tmp_path)
+
+        log = capsys.readouterr().err
+        assert self._converted(log) == []
+        assert "Skipped 2 unchanged page(s), converted 0" in log
+        assert _files(tmp_path / "ko") == outputs
+
+    def test_deleted_attachments_are_copied_again(self, pages, var_dir, tmp_path, capsys):
+        failures, manifest = self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+        copied = manifest.entries[OTHER_PAGE_ID]["attachments"]
+        assert copied and all(Path(path).exists() for path in copied)
+        shutil.rmtree(tmp_path / "public")
+
+        self._run(pages, var_dir, tmp_path)
+
+        assert self._converted(capsys.readouterr().err) == [OTHER_PAGE_ID]
+        assert all(Path(path).exists() for path in copied)
+
+    def test_changed_xhtml_is_converted(self, pages, var_dir, tmp_path, capsys):
+        self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+        with open(var_dir / OTHER_PAGE_ID / "page.xhtml", "a", encoding="utf-8") as f:
+            f.write("<p>추가</p>")
+
+        self._run(pages, var_dir, tmp_path)
+
+        assert self._converted(capsys.readouterr().err) == [OTHER_PAGE_ID]
+
+    @staticmethod
+    def _move_linked_page(pages):
+        moved = copy.deepcopy(pages)
+        for page in moved:
+            if page["page_id"] == LINKED_PAGE_ID:
+                page["path"] = ["moved", "proxy-management"]
+        return moved
+
+    @pytest.mark.parametrize("changed_only", [False, True])
+    def test_moved_link_target_converts_linking_page(self, pages, var_dir, tmp_path, capsys, changed_only):
+        failures, manifest = self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+        assert "Proxy Management\u200b" in manifest.entries[LINKING_PAGE_ID]["depends"]["title"]
+
+        self._run(self._move_linked_page(pages), var_dir, tmp_path, changed_only=changed_only)
+
+        assert self._converted(capsys.readouterr().err) == [LINKING_PAGE_ID]
+
+    def test_reverse_index(self, pages, var_dir, tmp_path):
+        failures, manifest = self._run(pages, var_dir, tmp_path)
+
+        dependents = manifest.dependents()
+
+        assert dependents["title"]["Proxy Management\u200b"] == [LINKING_PAGE_ID]
+        assert manifest.affected_pages() == set()
+
+    def test_changed_only_detects_changed_files(self, pages, var_dir, tmp_path, capsys):
+        self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+        with open(var_dir / OTHER_PAGE_ID / "page.xhtml", "a", encoding="utf-8") as f:
+            f.write("<p>추가</p>")
+
+        self._run(pages, var_dir, tmp_path, changed_only=True)
+
+        assert self._converted(capsys.readouterr().err) == [OTHER_PAGE_ID]
+
+    def test_interrupted_run_is_completed_by_next_run(self, pages, var_dir, tmp_path, capsys, monkeypatch):
+        self._run(pages, var_dir, tmp_path)
+        moved = self._move_linked_page(pages)
+
+        def interrupted(*args, **kwargs):
+            raise KeyboardInterrupt
+            yield
+        with monkeypatch.context() as patch:
+            patch.setattr(convert_all, "iter_convert_pages", interrupted)
+            with pytest.raises(KeyboardInterrupt):
+                self._run(moved, var_dir, tmp_path, changed_only=True)
+        capsys.readouterr()
+
+        self._run(moved, var_dir, tmp_path, changed_only=True)
+
+        assert self._converted(capsys.readouterr().err) == [LINKING_PAGE_ID]
+
+    def test_converter_change_converts_everything(self, pages, var_dir, tmp_path, capsys):
+        self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+
+        self._run(pages, var_dir, tmp_path, code="changed")
+
+        assert self._converted(capsys.readouterr().err) == [LINKING_PAGE_ID, OTHER_PAGE_ID]
+
+    def test_failed_page_is_retried(self, pages, var_dir, tmp_path, capsys):
+        (var_dir / OTHER_PAGE_ID / "page.xhtml").write_bytes(b"\xff")
+        failures, manifest = self._run(pages, var_dir, tmp_path)
+        capsys.readouterr()
+        assert failures == 1
+        assert OTHER_PAGE_ID not in manifest.entries
+
+        self._run(pages, var_dir, tmp_path)
+
+        assert self._converted(capsys.readouterr().err) == [OTHER_PAGE_ID]
+
+
+class TestChangedOnlyAfterFetch:
+    ROOT_ID = "608501837"
+
+    def _fetch(self, fake, var_dir, mode):
+        config = make_config(fake, var_dir, default_start_page_id=self.ROOT_ID, mode=mode)
+        ConfluencePageProcessor(config, logging.getLogger("test")).run()
+
+    def _convert(self, var_dir, tmp_path):
+        pages = load_document(str(var_dir / "pages.yaml"))
+        manifest = ConversionManifest.for_var_dir(str(var_dir), pages, str(tmp_path / "public"))
+        convert_all.convert_all(pages, str(var_dir), str(tmp_path / "ko"), str(tmp_path / "public"),
+                                "warning", manifest=manifest, changed_only=True)
+
+    def test_local_fetch_does_not_reconvert(self, tmp_path, capsys):
+        var_dir = tmp_path / "var"
+        fake = FakeConfluence.from_testcases(str(TESTCASES), self.ROOT_ID)
+        fake.start()
+        try:
+            self._fetch(fake, var_dir, "remote")
+            self._convert(var_dir, tmp_path)
+            assert " → " in capsys.readouterr().err
+            xhtml = next(var_dir.glob("*/page.xhtml"))
+            mtime_ns = xhtml.stat().st_mtime_ns
+
+            self._fetch(fake, var_dir, "local")
+            assert xhtml.stat().st_mtime_ns != mtime_ns  # --local 은 내용이 같아도 page.xhtml 을 다시 쓴다
+            self._convert(var_dir, tmp_path)
+        finally:
+            fake.stop()
+
+        log = capsys.readouterr().err
+        assert " → " not in log
+        assert "converted 0" in log
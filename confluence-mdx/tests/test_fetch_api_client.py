@@ -0,0 +1,203 @@
+"""fetch.api_client 단위 테스트 — 세션 재사용, 재시도, 하위 페이지 cursor pagination 을 검증한다."""
+
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from fake_confluence import FakeConfluence
+from fetch.api_client import ApiClient, parse_retry_after
+from fetch.config import Config
+from fetch.exceptions import ApiError
+
+
+@pytest.fixture
+def confluence_tree():
+    def build(fake):
+        fake.add_page("100", "Root")
+        fake.add_page("200", "Child", "100", attachments={"image.png": b"\x89PNG" * 10})
+    return build
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """time.sleep 을 가로채 대기 시간만 기록한다."""
+    recorded = []
+    monkeypatch.setattr("fetch.api_client.time.sleep", recorded.append)
+    return recorded
+
+
+def _wait_for_requests(fake: FakeConfluence, pattern: str, count: int, timeout: float = 5.0) -> int:
+    """요청 수가 count 에 이를 때까지 기다렸다가 그 수를 반환한다."""
+    deadline = time.monotonic() + timeout
+    while fake.count(pattern) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return fake.count(pattern)
+
+
+def _client(fake: FakeConfluence, **kwargs) -> ApiClient:
+    config = Config(base_url=fake.base_url, email="tester@example.com", api_token="token", **kwargs)
+    return ApiClient(config, logging.getLogger("test"))
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+    def test_past_date_is_zero(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestSession:
+    def test_requests_reuse_keep_alive_connection(self, fake_confluence):
+        client = _client(fake_confluence)
+        for _ in range(10):
+            client.get_page_data_v1("100")
+            client.get_child_pages("100")
+
+        assert fake_confluence.connections == 1
+
+    def test_pool_is_sized_for_workers(self, fake_confluence):
+        client = _client(fake_confluence, pool_maxsize=4, workers=12)
+        adapter = client.session.get_adapter(fake_confluence.base_url)
+        assert adapter._pool_maxsize == 12
+
+
+class TestRetry:
+    def test_429_honors_retry_after(self, fake_confluence, sleeps):
+        fake_confluence.fail(r"/rest/api/content/100\?", status=429, times=2, headers={"Retry-After": "7"})
+
+        data = _client(fake_confluence).get_page_data_v1("100")
+
+        assert data["title"] == "Root"
+        assert sleeps == [7.0, 7.0]
+        assert fake_confluence.count(r"/rest/api/content/100\?") == 3
+
+    def test_long_retry_after_is_clamped(self, fake_confluence, sleeps):
+        fake_confluence.fail(r"/rest/api/content/100\?", status=429, times=1, headers={"Retry-After": "86400"})
+
+        data = _client(fake_confluence, retry_after_max=5.0).get_page_data_v1("100")
+
+        assert data["title"] == "Root"
+        assert sleeps == [5.0]
+
+    def test_5xx_uses_exponential_backoff_with_jitter(self, fake_confluence, sleeps):
+        fake_confluence.fail(r"/children", status=503, times=3)
+
+        data = _client(fake_confluence, backoff_base=0.5, backoff_max=1.5).get_child_pages("100")
+
+        assert [c["id"] for c in data["results"]] == ["200"]
+        assert len(sleeps) == 3
+        for attempt, delay in enumerate(sleeps):
+            assert 0 <= delay <= min(1.5, 0.5 * 2 ** attempt)
+
+    def test_gives_up_after_max_retries(self, fake_confluence, sleeps):
+        fake_confluence.fail(r"/rest/api/content/100\?", status=500)
+
+        with pytest.raises(ApiError):
+            _client(fake_confluence, max_retries=2).get_page_data_v1("100")
+        assert len(sleeps) == 2
+        assert fake_confluence.count(r"/rest/api/content/100\?") == 3
+
+    def test_client_errors_are_not_retried(self, fake_confluence, sleeps):
+        with pytest.raises(ApiError):
+            _client(fake_confluence).get_page_data_v1("999")
+        assert sleeps == []
+
+    def test_attachment_download_is_retried(self, fake_confluence, sleeps):
+        fake_confluence.fail(r"/download$", status=429, times=1, headers={"Retry-After": "0"})
+
+        content = b"".join(_client(fake_confluence).iter_attachment_chunks("200", "att2000"))
+
+        assert content == b"\x89PNG" * 10
+        assert sleeps == [0.0]
+
+
+class TestChildPagePagination:
+    @pytest.fixture
+    def wide_confluence(self):
+        fake = FakeConfluence()
+        fake.add_page("100", "Root")
+        for i in range(530):
+            fake.add_page(f"5{i:04d}", f"Child {i}", "100")
+        fake.children_page_limit = 100
+        fake.start()
+        yield fake
+        fake.stop()
+
+    def test_merges_every_result_page(self, wide_confluence):
+        data = _client(wide_confluence).get_child_pages("100")
+
+        assert [child["id"] for child in data["results"]] == wide_confluence.children["100"]
+        assert "next" not in data["_links"]
+        assert wide_confluence.count(r"/children\?") == 6
+
+    def test_single_result_page_is_unchanged(self, fake_confluence):
+        data = _client(fake_confluence).get_child_pages("100")
+
+        assert [child["id"] for child in data["results"]] == ["200"]
+        assert fake_confluence.count(r"/children\?") == 1
+
+    def test_next_page_is_requested_while_current_is_processed(self, wide_confluence):
+        pages = _client(wide_confluence).iter_child_pages("100")
+        first = next(pages)
+
+        # 첫 페이지를 처리하는 동안 다음 cursor 요청이 이미 나가 있어야 한다
+        assert _wait_for_requests(wide_confluence, r"/children\?", 2) == 2
+        assert len(first["results"]) == 100
+        assert sum(len(page["results"]) for page in pages) == 430
+
+    def test_failed_next_page_raises(self, wide_confluence):
+        wide_confluence.fail(r"cursor=300", status=500)
+
+        with pytest.raises(ApiError):
+            _client(wide_confluence, max_retries=0).get_child_pages("100")
+
+
+class TestRecentlyModifiedPages:
+    @pytest.fixture
+    def busy_confluence(self):
+        fake = FakeConfluence()
+        fake.add_page("100", "Root")
+        for i in range(250):
+            fake.add_page(f"7{i:04d}", f"Page {i}", "100", created_at="2025-06-01T00:00:00.000Z")
+        fake.start()
+        yield fake
+        fake.stop()
+
+    def test_yields_one_batch_per_result_page(self, busy_confluence):
+        batches = list(_client(busy_confluence).iter_recently_modified_pages(
+            days=7, space_key="QM", since_date="2025-05-20T00:00:00.000Z"))
+
+        assert [len(batch) for batch in batches] == [100, 100, 50]
+        assert [page_id for batch in batches for page_id in batch] == busy_confluence.children["100"]
+
+    def test_search_url_has_a_single_limit(self, busy_confluence):
+        _client(busy_confluence).get_recently_modified_pages(days=7, space_key="QM", since_date="2025-05-20T00:00:00.000Z")
+
+        searches = [path for path in busy_confluence.requests if "/content/search" in path]
+        assert len(searches) == 3
+        assert all(path.count("limit=") == 1 for path in searches)
+        assert [re.search(r"start=(\d+)", path).group(1) for path in searches] == ["0", "100", "200"]
+
+    def test_close_stops_prefetch_thread(self, busy_confluence):
+        client = _client(busy_confluence)
+        client.get_recently_modified_pages(days=7, space_key="QM", since_date="2025-05-20T00:00:00.000Z")
+        prefetcher = client._prefetcher
+        assert prefetcher._max_workers == ApiClient.PREFETCH_WORKERS
+
+        client.close()
+
+        assert client._prefetcher is None
+        assert all(not thread.is_alive() for thread in prefetcher._threads)
@@ -0,0 +1,147 @@
+"""fetch.async_processor 단위 테스트 — sync 경로와 같은 var/ 결과를 내는지 검증한다."""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from conftest import ROOT_ID, make_config
+from fake_confluence import FakeConfluence
+from fetch.async_api_client import AsyncApiClient
+from fetch.async_processor import AsyncConfluencePageProcessor, AsyncStage1Processor
+from fetch.config import Config
+from fetch.file_manager import FileManager
+from fetch.processor import ConfluencePageProcessor
+
+
+@pytest.fixture
+def confluence_tree():
+    return lambda fake: fake.build_tree(ROOT_ID, depth=2, fanout=4)
+
+
+def _snapshot(directory: Path):
+    """실행마다 달라지는 fetch_state.yaml, fetch-report.json, fetch-journal.jsonl, manifest.sqlite 를 제외한 모든 파일의 바이트 내용."""
+    return {
+        str(path.relative_to(directory)): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file() and path.name not in ("fetch_state.yaml", "fetch-report.json", "fetch-journal.jsonl")
+        and not path.name.startswith("manifest.sqlite")
+    }
+
+
+class TestAsyncProcessor:
+    def test_remote_output_is_byte_identical_to_sync(self, fake_confluence, tmp_path, capsys):
+        sync_dir, async_dir = tmp_path / "sync", tmp_path / "async"
+        ConfluencePageProcessor(make_config(fake_confluence, sync_dir, mode="remote"), logging.getLogger("test")).run()
+        sync_stdout = capsys.readouterr().out
+        AsyncConfluencePageProcessor(make_config(fake_confluence, async_dir, mode="remote", backend="async"),
+                                     logging.getLogger("test")).run()
+        async_stdout = capsys.readouterr().out
+
+        assert _snapshot(async_dir) == _snapshot(sync_dir)
+        assert async_stdout == sync_stdout
+
+    def test_download_pages_matches_sync(self, fake_confluence, tmp_path):
+        page_ids = fake_confluence.children[ROOT_ID]
+        sync_dir, async_dir = tmp_path / "sync", tmp_path / "async"
+        sync_pages = ConfluencePageProcessor(make_config(fake_confluence, sync_dir, mode="recent"),
+                                             logging.getLogger("test")).download_pages(page_ids, ROOT_ID)
+        async_pages = AsyncConfluencePageProcessor(make_config(fake_confluence, async_dir, mode="recent", backend="async"),
+                                                   logging.getLogger("test")).download_pages(page_ids, ROOT_ID)
+
+        assert [p.to_dict() for p in async_pages] == [p.to_dict() for p in sync_pages]
+        assert _snapshot(async_dir) == _snapshot(sync_dir)
+
+    def test_pages_are_printed_while_later_batches_are_fetched(self, fake_confluence, tmp_path, capsys):
+        first, rest = fake_confluence.children[ROOT_ID][:2], fake_confluence.children[ROOT_ID][2:]
+        printed = []
+
+        def batches():
+            yield first
+            # 다음 batch 를 가져오는 동안 앞 batch 의 페이지가 이미 출력되어야 한다
+            deadline = time.monotonic() + 5
+            while len(printed) < len(first) and time.monotonic() < deadline:
+                printed.extend(line.split("\t")[0] for line in capsys.readouterr().out.splitlines())
+                time.sleep(0.01)
+            yield rest
+
+        processor = AsyncConfluencePageProcessor(make_config(fake_confluence, tmp_path, mode="recent", backend="async"),
+                                                 logging.getLogger("test"))
+        pages = processor.download_page_batches(batches(), ROOT_ID)
+
+        assert printed == first
+        assert capsys.readouterr().out.splitlines() == [f"{page.page_id}\t{' />> '.join(page.breadcrumbs)}"
+                                                        for page in pages[len(first):]]
+        assert [page.page_id for page in pages] == first + rest
+
+
+class TestAsyncStage1:
+    def _run_stage1(self, fake: FakeConfluence, config: Config):
+        async def run():
+            async with AsyncApiClient(config, logging.getLogger("test")) as client:
+                stage1 = AsyncStage1Processor(config, client, FileManager(logging.getLogger("test")), logging.getLogger("test"))
+                await stage1.process_async(ROOT_ID)
+        asyncio.run(run())
+
+    def test_page_requests_are_issued_concurrently(self, fake_confluence, tmp_path):
+        fake_confluence.latency = 0.2
+        self._run_stage1(fake_confluence, make_config(fake_confluence, tmp_path, mode="remote"))
+
+        assert fake_confluence.peak_in_flight == len(AsyncStage1Processor.API_OPERATIONS)
+        assert (tmp_path / ROOT_ID / "page.v1.json").exists()
+        assert (tmp_path / ROOT_ID / "children.v2.json").exists()
+
+    def test_in_flight_semaphore_caps_requests(self, fake_confluence, tmp_path):
+        fake_confluence.latency = 0.1
+        self._run_stage1(fake_confluence, make_config(fake_confluence, tmp_path, mode="remote", max_in_flight=2))
+
+        assert fake_confluence.peak_in_flight == 2
+
+    def test_failed_request_does_not_block_others(self, fake_confluence, tmp_path):
+        fake_confluence.fail(r"/api/v2/pages/100\?", status=500)
+        self._run_stage1(fake_confluence, make_config(fake_confluence, tmp_path, mode="remote"))
+
+        assert not (tmp_path / ROOT_ID / "page.v2.json").exists()
+        assert (tmp_path / ROOT_ID / "page.v1.json").exists()
+        assert (tmp_path / ROOT_ID / "attachments.v1.json").exists()
+
+
+class TestAsyncChildPagePagination:
+    def test_merges_every_result_page(self, fake_confluence, tmp_path):
+        fake_confluence.children_page_limit = 3
+        config = make_config(fake_confluence, tmp_path, mode="remote")
+
+        async def run():
+            async with AsyncApiClient(config, logging.getLogger("test")) as client:
+                return await client.get_child_pages(ROOT_ID)
+        data = asyncio.run(run())
+
+        assert [child["id"] for child in data["results"]] == fake_confluence.children[ROOT_ID]
+        assert "next" not in data["_links"]
+        assert fake_confluence.count(r"/children\?") == 2
+
+    def test_next_page_is_requested_while_current_is_processed(self, fake_confluence, tmp_path):
+        fake_confluence.children_page_limit = 2
+        config = make_config(fake_confluence, tmp_path, mode="remote")
+
+        async def run():
+            async with AsyncApiClient(config, logging.getLogger("test")) as client:
+                pages = client.iter_child_pages(ROOT_ID)
+                first = await pages.__anext__()
+                # 첫 페이지를 처리하는 동안 (이벤트 루프에 양보하면) 다음 cursor 요청이 나가야 한다
+                for _ in range(500):
+                    if fake_confluence.count(r"/children\?") == 2:
+                        break
+                    await asyncio.sleep(0.01)
+                requested = fake_confluence.count(r"/children\?")
+                rest = [data async for data in pages]
+                return first, requested, rest
+        first, requested, rest = asyncio.run(run())
+
+        assert requested == 2
+        assert len(first["results"]) == 2
+        assert sum(len(data["results"]) for data in rest) == len(fake_confluence.children[ROOT_ID]) - 2
@@ -0,0 +1,100 @@
+"""기록 재생 대역 서버와 fetch 벤치마크 테스트 — tests/testcases 의 응답을 그대로 재생하는지 검증한다."""
+
+import logging
+from pathlib import Path
+
+import pytest
+import yaml
+
+import raw_store
+from benchmark_fetch import build_server, format_results, run_benchmark
+from conftest import make_config
+from fake_confluence import FakeConfluence
+from fetch.config import Config
+from fetch.processor import ConfluencePageProcessor
+
+
+TESTCASES = Path(__file__).parent / "testcases"
+ROOT_ID = "608501837"
+PAGE_ID = "883654669"  # Slack DM 연동, 7 attachments
+
+
+@pytest.fixture(scope="module")
+def replay():
+    fake = FakeConfluence.from_testcases(str(TESTCASES), ROOT_ID)
+    fake.start()
+    yield fake
+    fake.stop()
+
+
+def _recorded(page_id: str, name: str):
+    return raw_store.load_raw(str(TESTCASES / page_id), name)
+
+
+class TestReplay:
+    def test_page_v1_is_replayed(self, replay):
+        recorded = _recorded(PAGE_ID, "page.v1")
+        payload = replay.page_v1(PAGE_ID)
+
+        assert payload["title"] == recorded["title"]
+        assert payload["body"] == recorded["body"]
+        assert payload["_links"] == recorded["_links"]
+        assert [a["id"] for a in payload["ancestors"]] == [ROOT_ID]
+
+    def test_tree_follows_recorded_parents(self, replay):
+        assert replay.pages["544112828"].parent_id == "544211126"
+        assert replay.pages["544211126"].parent_id == ROOT_ID
+        assert replay.pages[ROOT_ID].title == "QueryPie Docs"
+
+    def test_attachments_are_served_from_files(self, replay):
+        results = replay.attachments_v1(PAGE_ID)["results"]
+
+        assert len(results) == 7
+        for attachment in results:
+            content = replay.attachment_content(PAGE_ID, attachment["id"])
+            assert content == (TESTCASES / PAGE_ID / attachment["title"]).read_bytes()
+            assert attachment["extensions"]["fileSize"] == len(content)
+
+    def test_synthetic_tree_copies_templates(self):
+        fake = FakeConfluence.from_testcases(str(TESTCASES), ROOT_ID)
+        templates = [page for page in fake.pages.values() if page.recorded]
+        fake.build_tree(ROOT_ID, depth=2, fanout=5, templates=templates)
+
+        copy = fake.pages[f"{ROOT_ID}10"]
+        assert len(fake.pages) == 1 + len(templates) + 5 + 25
+        assert copy.body == templates[0].body
+        assert fake.page_v1(copy.page_id)["title"] == f"Page {copy.page_id}"
+        file_ids = {a["extensions"]["fileId"] for a in fake.attachments_v1(copy.page_id)["results"]}
+        original_ids = {a["extensions"]["fileId"] for a in fake.attachments_v1(templates[0].page_id)["results"]}
+        assert not file_ids & original_ids
+
+    def test_remote_fetch_with_throttling(self, replay, tmp_path):
+        replay.throttle_every = 10
+        try:
+            config = make_config(replay, tmp_path, default_start_page_id=ROOT_ID, mode="remote", workers=4,
+                                 download_attachments=True, max_retries=Config.max_retries, backoff_base=0.0)
+            ConfluencePageProcessor(config, logging.getLogger("test")).run()
+        finally:
+            replay.throttle_every = 0
+
+        pages = yaml.safe_load((tmp_path / "pages.yaml").read_text(encoding="utf-8"))
+        assert len(pages) == len(replay.pages)
+        assert replay.throttled > 0
+        for filename in replay.pages[PAGE_ID].attachments:
+            assert (tmp_path / PAGE_ID / filename).read_bytes() == replay.pages[PAGE_ID].attachments[filename]
+
+
+class TestBenchmark:
+    def test_run_reports_throughput_and_rss(self):
+        fake = build_server(str(TESTCASES), ROOT_ID, depth=1, fanout=2)
+        try:
+            results = run_benchmark(fake, ROOT_ID, [1, 4])
+        finally:
+            fake.stop()
+
+        assert [result["workers"] for result in results] == [1, 4]
+        for result in results:
+            assert result["pages"] == len(fake.pages)
+            assert result["pages_per_second"] > 0
+            assert result["peak_rss_mib"] > 0
+        assert len(format_results(results)) == 3
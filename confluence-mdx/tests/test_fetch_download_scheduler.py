@@ -0,0 +1,164 @@
+"""fetch.download_scheduler 단위 테스트 — 공유 첨부파일 다운로드 대기열을 검증한다."""
+
+import logging
+
+import pytest
+import yaml
+
+from conftest import make_config
+from fetch.api_client import ApiClient
+from fetch.download_scheduler import AttachmentDownloadScheduler, ByteRateLimiter, parse_byte_rate
+from fetch.file_manager import FileManager
+from fetch.processor import ConfluencePageProcessor
+from fetch.stages import Stage1Processor, Stage3Processor
+
+
+PAGE_IDS = ["200", "300"]
+ATTACHMENTS = {f"shot-{i:02d}.png": bytes([i]) * (1000 + i) for i in range(12)}
+
+
+@pytest.fixture
+def confluence_tree():
+    def build(fake):
+        fake.add_page("100", "Root")
+        for page_id in PAGE_IDS:
+            fake.add_page(page_id, f"Page {page_id}", "100", attachments=dict(ATTACHMENTS))
+    return build
+
+
+def _make_config(fake, tmp_path, **kwargs):
+    return make_config(fake, tmp_path, default_output_dir=str(tmp_path / "var"), download_attachments=True,
+                       mode="remote", **kwargs)
+
+
+def _collect(fake, tmp_path, **kwargs):
+    """Stage 1 을 실행한 뒤 Stage 3 을 대기열과 함께 반환한다."""
+    logger = logging.getLogger("test")
+    config = _make_config(fake, tmp_path, **kwargs)
+    api_client = ApiClient(config, logger)
+    file_manager = FileManager(logger)
+    stage1 = Stage1Processor(config, api_client, file_manager, logger)
+    for page_id in PAGE_IDS:
+        stage1.process(page_id)
+    scheduler = AttachmentDownloadScheduler(config, logger)
+    return Stage3Processor(config, api_client, file_manager, logger, scheduler), scheduler
+
+
+def _manifest(tmp_path, page_id):
+    path = tmp_path / "var" / page_id / Stage3Processor.MANIFEST_FILENAME
+    return yaml.safe_load(path.read_text(encoding="utf-8"))
+
+
+class TestParseByteRate:
+    @pytest.mark.parametrize("value, expected", [
+        ("0", 0),
+        ("1048576", 1048576),
+        ("500K", 500 * 1024),
+        ("2M", 2 * 1024 * 1024),
+        ("1.5MiB", int(1.5 * 1024 * 1024)),
+        ("1g", 1024 ** 3),
+    ])
+    def test_units(self, value, expected):
+        assert parse_byte_rate(value) == expected
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_byte_rate("fast")
+
+
+class TestByteRateLimiter:
+    def test_sleeps_for_debt(self):
+        now = [0.0]
+        sleeps = []
+        limiter = ByteRateLimiter(1000, clock=lambda: now[0], sleep=sleeps.append)
+
+        limiter.consume(1000)  # 1초 분량의 burst 는 바로 통과한다
+        limiter.consume(500)
+
+        assert sleeps == [0.5]
+
+    def test_refills_over_time(self):
+        now = [0.0]
+        sleeps = []
+        limiter = ByteRateLimiter(1000, clock=lambda: now[0], sleep=sleeps.append)
+
+        limiter.consume(1000)
+        now[0] = 2.0
+        limiter.consume(1000)
+
+        assert sleeps == []
+
+
+class TestScheduler:
+    def test_concurrency_is_capped_across_pages(self, fake_confluence, tmp_path):
+        stage3, scheduler = _collect(fake_confluence, tmp_path, attachment_workers=3)
+        fake_confluence.latency = 0.02
+        fake_confluence.peak_in_flight = 0
+
+        for page_id in PAGE_IDS:
+            stage3.process(page_id)
+        scheduler.close()
+
+        assert fake_confluence.count(r"/download$") == len(PAGE_IDS) * len(ATTACHMENTS)
+        assert 1 < fake_confluence.peak_in_flight <= 3
+        assert scheduler.progress.files_done == len(PAGE_IDS) * len(ATTACHMENTS)
+        assert scheduler.progress.bytes_done == len(PAGE_IDS) * sum(len(v) for v in ATTACHMENTS.values())
+
+    def test_manifest_matches_sequential_download(self, fake_confluence, tmp_path):
+        stage3, scheduler = _collect(fake_confluence, tmp_path / "queued")
+        for page_id in PAGE_IDS:
+            stage3.process(page_id)
+        scheduler.close()
+
+        logger = logging.getLogger("test")
+        config = _make_config(fake_confluence, tmp_path / "serial")
+        api_client = ApiClient(config, logger)
+        file_manager = FileManager(logger)
+        stage1 = Stage1Processor(config, api_client, file_manager, logger)
+        serial = Stage3Processor(config, api_client, file_manager, logger)
+        for page_id in PAGE_IDS:
+            stage1.process(page_id)
+            serial.process(page_id)
+
+        for page_id in PAGE_IDS:
+            queued_manifest = _manifest(tmp_path / "queued", page_id)
+            serial_manifest = _manifest(tmp_path / "serial", page_id)
+            assert list(queued_manifest) == list(ATTACHMENTS)
+            strip = lambda m: {k: {f: v for f, v in e.items() if f != "mtime_ns"} for k, e in m.items()}
+            assert strip(queued_manifest) == strip(serial_manifest)
+
+    def test_cache_hits_are_not_queued(self, fake_confluence, tmp_path):
+        stage3, scheduler = _collect(fake_confluence, tmp_path)
+        cache_dir = tmp_path / "cache" / PAGE_IDS[0]
+        cache_dir.mkdir(parents=True)
+        for filename, content in ATTACHMENTS.items():
+            (cache_dir / filename).write_bytes(content)
+
+        stage3.process(PAGE_IDS[0])
+        scheduler.close()
+
+        assert scheduler.progress.files_total == 0
+        assert fake_confluence.count(r"/download$") == 0
+        assert list(_manifest(tmp_path, PAGE_IDS[0])) == list(ATTACHMENTS)
+
+    def test_failed_download_keeps_other_entries(self, fake_confluence, tmp_path):
+        stage3, scheduler = _collect(fake_confluence, tmp_path)
+        fake_confluence.fail(r"/att2003/download$", status=500)
+
+        stage3.process(PAGE_IDS[0])
+        scheduler.close()
+
+        manifest = _manifest(tmp_path, PAGE_IDS[0])
+        assert "shot-03.png" not in manifest
+        assert len(manifest) == len(ATTACHMENTS) - 1
+        assert scheduler.progress.files_failed == 1
+
+    def test_processor_waits_for_downloads(self, fake_confluence, tmp_path):
+        config = _make_config(fake_confluence, tmp_path, workers=2, attachment_workers=4)
+        ConfluencePageProcessor(config, logging.getLogger("test")).run()
+
+        for page_id in PAGE_IDS:
+            page_dir = tmp_path / "var" / page_id
+            for filename, content in ATTACHMENTS.items():
+                assert (page_dir / filename).read_bytes() == content
+            assert list(_manifest(tmp_path, page_id)) == list(ATTACHMENTS)
@@ -0,0 +1,85 @@
+"""fetch.journal 단위 테스트 — 단계 완료 기록, 끊긴 줄 무시, 이어받을 실행의 판별을 검증한다."""
+
+import json
+import logging
+
+from fetch.journal import FetchJournal
+
+
+def _journal(tmp_path) -> FetchJournal:
+    return FetchJournal.for_output_dir(str(tmp_path), logging.getLogger("test"))
+
+
+def _complete(journal: FetchJournal, page_id: str) -> None:
+    for stage in FetchJournal.STAGES:
+        journal.record(page_id, stage)
+
+
+class TestFetchJournal:
+    def test_completed_pages_need_every_stage(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        _complete(journal, "1")
+        journal.record("2", "stage1")
+        journal.record("2", "stage2")
+        journal.close()
+
+        events = _journal(tmp_path).begin("remote", "100", resume=True)
+
+        assert FetchJournal.completed_pages(events) == {"1"}
+
+    def test_incomplete_last_line_is_ignored(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        _complete(journal, "1")
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "stage", "page_id": "2", "sta')
+
+        events = _journal(tmp_path).begin("remote", "100", resume=True)
+
+        assert FetchJournal.completed_pages(events) == {"1"}
+
+    def test_finished_run_is_not_resumed(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        _complete(journal, "1")
+        journal.finish()
+
+        assert _journal(tmp_path).begin("remote", "100", resume=True) == []
+
+    def test_other_run_is_not_resumed(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        _complete(journal, "1")
+        journal.close()
+
+        assert _journal(tmp_path).begin("recent", "100", resume=True) == []
+        assert _journal(tmp_path).begin("remote", "100", subtree_page_id="1", resume=True) == []
+
+    def test_new_run_replaces_journal(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        _complete(journal, "1")
+        journal.close()
+
+        second = _journal(tmp_path)
+        second.begin("remote", "100")
+        second.close()
+
+        lines = (tmp_path / FetchJournal.FILENAME).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["event"] for line in lines] == ["start"]
+
+    def test_resumed_run_appends(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.begin("remote", "100")
+        journal.record("1", "stage1")
+        journal.close()
+
+        resumed = _journal(tmp_path)
+        resumed.begin("remote", "100", resume=True)
+        for stage in FetchJournal.STAGES[1:]:
+            resumed.record("1", stage)
+        resumed.close()
+
+        assert FetchJournal.completed_pages(_journal(tmp_path).begin("remote", "100", resume=True)) == {"1"}
@@ -0,0 +1,128 @@
+"""fetch.manifest 단위 테스트 — var/manifest.sqlite 의 페이지별 기록과 조회를 검증한다."""
+
+import hashlib
+import logging
+import shutil
+
+import pytest
+import yaml
+
+from conftest import ROOT_ID, make_config
+from fetch.manifest import PageManifest
+from fetch.processor import ConfluencePageProcessor
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = PageManifest.for_output_dir(str(tmp_path), logging.getLogger("test"))
+    yield manifest
+    manifest.close()
+
+
+@pytest.fixture
+def confluence_tree():
+    def build(fake):
+        fake.add_page(ROOT_ID, "Root", created_at="2025-01-01T00:00:00.000Z")
+        fake.add_page("200", "Child A", ROOT_ID, body="<p>A</p>", created_at="2025-03-01T00:00:00.000Z",
+                      attachments={"a.png": b"png-a"})
+        fake.add_page("300", "Child B", ROOT_ID, body="<p>B</p>", created_at="2025-02-01T00:00:00.000Z")
+    return build
+
+
+def _v2(page_id, parent_id, number, created_at):
+    return {"id": page_id, "title": f"Page {page_id}", "parentId": parent_id,
+            "version": {"number": number, "createdAt": created_at}}
+
+
+class TestPageManifest:
+    def test_record_version_keeps_other_columns(self, manifest):
+        manifest.record_xhtml("200", "abc")
+        manifest.mark_fetched("200", "2025-05-01T00:00:00.000Z")
+        manifest.record_version("200", _v2("200", 100, 3, "2025-04-01T00:00:00.000Z"))
+
+        assert manifest.get_page("200") == {
+            "page_id": "200", "parent_id": "100", "title": "Page 200", "version": 3,
+            "created_at": "2025-04-01T00:00:00.000Z", "xhtml_sha256": "abc",
+            "fetched_at": "2025-05-01T00:00:00.000Z",
+        }
+
+    def test_changed_since_uses_created_at(self, manifest):
+        manifest.record_version("200", _v2("200", "100", 1, "2025-01-01T00:00:00.000Z"))
+        manifest.record_version("300", _v2("300", "100", 2, "2025-03-01T00:00:00.000Z"))
+        manifest.record_version("400", _v2("400", "100", 1, "2025-02-01T00:00:00.000Z"))
+
+        assert manifest.changed_since("2025-02-01") == ["400", "300"]
+        assert manifest.max_created_at() == "2025-03-01T00:00:00.000Z"
+        assert manifest.max_created_at(["200", "400"]) == "2025-02-01T00:00:00.000Z"
+        assert manifest.max_created_at(["999"]) is None
+
+    def test_max_created_at_spans_query_batches(self, manifest, monkeypatch):
+        monkeypatch.setattr(PageManifest, "QUERY_BATCH", 2)
+        for i in range(5):
+            manifest.record_version(str(i), _v2(str(i), None, 1, f"2025-01-0{i + 1}T00:00:00.000Z"))
+
+        assert manifest.max_created_at([str(i) for i in range(5)]) == "2025-01-05T00:00:00.000Z"
+        assert manifest.missing_versions(["0", "4", "9"]) == ["9"]
+
+    def test_record_attachments_replaces_page_entries(self, manifest):
+        manifest.record_attachments("200", {"a.png": {"id": "att1", "size": 3, "sha256": "aa"},
+                                            "b.png": {"id": "att2", "size": 4, "sha256": "bb"}})
+        manifest.record_attachments("200", {"b.png": {"id": "att2", "size": 5, "sha256": "cc"}})
+
+        attachments = manifest.get_attachments("200")
+        assert [(a["filename"], a["size"], a["sha256"]) for a in attachments] == [("b.png", 5, "cc")]
+
+
+    def test_record_children_keeps_order(self, manifest):
+        manifest.record_children("100", ["3", "1", "2"])
+        manifest.record_children("100", ["2", "3"])
+        manifest.record_children("200", ["1"])
+
+        assert manifest.get_children("100") == ["2", "3"]
+        assert manifest.get_children("300") == []
+        assert manifest.get_parents_in_index("1") == ["200"]
+
+
+class TestProcessorManifest:
+    def test_stages_record_pages(self, fake_confluence, tmp_path):
+        config = make_config(fake_confluence, tmp_path, mode="remote", download_attachments=True)
+        ConfluencePageProcessor(config, logging.getLogger("test")).run()
+
+        manifest = PageManifest.for_output_dir(str(tmp_path), logging.getLogger("test"))
+        page = manifest.get_page("200")
+        assert (page["parent_id"], page["title"], page["version"]) == (ROOT_ID, "Child A", 1)
+        assert page["xhtml_sha256"] == hashlib.sha256(b"<p>A</p>").hexdigest()
+        assert page["fetched_at"]
+        assert [(a["filename"], a["sha256"]) for a in manifest.get_attachments("200")] == [
+            ("a.png", hashlib.sha256(b"png-a").hexdigest())
+        ]
+        assert manifest.changed_since("2025-02-01") == ["300", "200"]
+        assert manifest.get_children(ROOT_ID) == ["200", "300"]
+        assert manifest.get_parents_in_index("300") == [ROOT_ID]
+        manifest.close()
+
+        state = yaml.safe_load((tmp_path / ROOT_ID / "fetch_state.yaml").read_text(encoding="utf-8"))
+        assert state["last_modified_seen"] == "2025-03-01T00:00:00.000Z"
+
+    def test_run_closes_manifest_and_writer(self, fake_confluence, tmp_path):
+        processor = ConfluencePageProcessor(make_config(fake_confluence, tmp_path, mode="remote"), logging.getLogger("test"))
+
+        processor.run()
+
+        assert (tmp_path / PageManifest.FILENAME).exists()
+        assert not list(tmp_path.glob(f"{PageManifest.FILENAME}-*"))  # WAL 이 checkpoint 되어 -wal, -shm 이 남지 않는다
+        assert not processor.writer._thread.is_alive()
+
+    def test_fetch_state_backfills_missing_manifest(self, fake_confluence, tmp_path):
+        config = make_config(fake_confluence, tmp_path / "var", mode="remote")
+        ConfluencePageProcessor(config, logging.getLogger("test")).run()
+        # manifest 가 도입되기 전의 var/ 를 흉내낸다
+        for path in (tmp_path / "var").glob("manifest.sqlite*"):
+            path.unlink()
+        shutil.rmtree(tmp_path / "var" / ROOT_ID)
+        shutil.copytree(tmp_path / "var", tmp_path / "legacy")
+
+        processor = ConfluencePageProcessor(make_config(fake_confluence, tmp_path / "legacy"), logging.getLogger("test"))
+
+        assert processor._compute_max_modified_date(["200", "300"]) == "2025-03-01T00:00:00.000Z"
+        assert processor.manifest.missing_versions(["200", "300"]) == []
@@ -0,0 +1,76 @@
+"""fetch.page_list 단위 테스트 — pages.yaml 항목에서 하위 트리를 찾고, 교체하고, 끼워 넣는다."""
+
+from fetch.page_list import (insert_subtree, list_lines, rebase_block, remove_pages, replace_children, splice_subtree,
+                             subtree_span)
+
+
+def _entry(page_id, *breadcrumbs):
+    return {"page_id": page_id, "breadcrumbs": list(breadcrumbs)}
+
+
+def _entries():
+    return [
+        _entry("1", "Root"),
+        _entry("2", "A"),
+        _entry("3", "A", "A1"),
+        _entry("4", "A", "A2"),
+        _entry("5", "B"),
+        _entry("6", "B", "B1"),
+    ]
+
+
+def _ids(entries):
+    return [entry["page_id"] for entry in entries]
+
+
+def test_subtree_span_is_contiguous_block():
+    entries = _entries()
+
+    assert subtree_span(entries, "2") == (1, 4)
+    assert subtree_span(entries, "4") == (3, 4)
+    assert subtree_span(entries, "1") == (0, 6)  # 시작 페이지의 breadcrumbs 는 자식과 길이가 같다
+    assert subtree_span(entries, "9") is None
+
+
+def test_splice_replaces_block_and_reports_pages_that_left():
+    entries = _entries()
+
+    left = splice_subtree(entries, [_entry("2", "A*"), _entry("4", "A*", "A2"), _entry("6", "A*", "B1")])
+
+    assert _ids(entries) == ["1", "2", "4", "6", "5"]
+    assert left == ["3"]  # 6 은 B 아래에서 A 아래로 옮겨졌다
+
+
+def test_insert_follows_sibling_order():
+    entries = _entries()
+    remove_pages(entries, ["3"])
+
+    assert insert_subtree(entries, "2", ["3", "4"], [_entry("3", "A", "A1")])
+    assert _ids(entries) == _ids(_entries())
+    assert insert_subtree(entries, "5", ["6", "7"], [_entry("7", "B", "B2")])
+    assert _ids(entries)[-1] == "7"
+    assert not insert_subtree(entries, "9", [], [_entry("8", "C")])
+
+
+def test_list_lines_skip_start_page():
+    assert list_lines(_entries()[:3], "1") == ["2\tA\n", "3\tA />> A1\n"]
+
+
+def test_replace_children_moves_walks_and_detaches():
+    entries = _entries()
+    detached = {}
+
+    rebased = replace_children(entries, "5", ["3", "7", "6"], detached, lambda page_id: [_entry(page_id, "B", "B2")])
+
+    assert _ids(entries) == ["1", "2", "4", "5", "3", "7", "6"]
+    assert entries[4]["breadcrumbs"] == ["B", "A1"]  # 옮겨진 블록은 새 부모 아래로 rebase 된다
+    assert [entry["page_id"] for entry in rebased] == ["3"]
+    assert replace_children(entries, "2", [], detached, lambda page_id: []) == []
+    assert list(detached) == ["4"]
+
+
+def test_rebase_block_keeps_relative_path():
+    block = [_entry("2", "A"), _entry("3", "A", "A1")]
+
+    assert rebase_block(block, ["X", "A*"]) == block
+    assert block[1]["breadcrumbs"] == ["X", "A*", "A1"]
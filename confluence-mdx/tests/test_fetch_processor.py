@@ -0,0 +1,454 @@
+"""fetch.processor 단위 테스트 — 로컬 Confluence 대역 서버를 상대로 실행한다."""
+
+import json
+import logging
+import re
+
+import pytest
+import yaml
+
+import raw_store
+from conftest import ROOT_ID, make_config
+from fake_confluence import FakeConfluence
+from fetch.local_index import LocalIndexPool, LocalPageIndex
+from fetch.processor import ConfluencePageProcessor
+
+
+@pytest.fixture
+def confluence_tree():
+    return lambda fake: fake.build_tree(ROOT_ID, depth=3, fanout=3)
+
+
+def _run(fake: FakeConfluence, output_dir, **kwargs):
+    config = make_config(fake, output_dir, **kwargs)
+    ConfluencePageProcessor(config, logging.getLogger("test")).run()
+    pages = yaml.safe_load((output_dir / "pages.yaml").read_text(encoding="utf-8"))
+    list_txt = (output_dir / "list.txt").read_text(encoding="utf-8")
+    return pages, list_txt
+
+
+def _expected_depth_first(fake: FakeConfluence, page_id: str):
+    order = [page_id]
+    for child_id in fake.children[page_id]:
+        order.extend(_expected_depth_first(fake, child_id))
+    return order
+
+
+class TestConcurrentPageTree:
+    """--workers N 로 트리를 병렬 수집해도 결과가 직렬 수집과 같아야 한다."""
+
+    def test_remote_serial_and_concurrent_outputs_match(self, fake_confluence, tmp_path, capsys):
+        serial_pages, serial_list = _run(fake_confluence, tmp_path / "serial", mode="remote", workers=1)
+        serial_stdout = capsys.readouterr().out
+        concurrent_pages, concurrent_list = _run(fake_confluence, tmp_path / "concurrent", mode="remote", workers=8)
+        concurrent_stdout = capsys.readouterr().out
+
+        assert concurrent_pages == serial_pages
+        assert concurrent_list == serial_list
+        assert concurrent_stdout == serial_stdout
+
+    def test_concurrent_output_is_depth_first(self, fake_confluence, tmp_path):
+        pages, list_txt = _run(fake_confluence, tmp_path, mode="remote", workers=4)
+
+        expected = _expected_depth_first(fake_confluence, ROOT_ID)
+        assert [p["page_id"] for p in pages] == expected
+        assert [line.split("\t")[0] for line in list_txt.splitlines()] == expected[1:]
+
+    def test_concurrent_fetches_every_page_once(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", workers=4)
+
+        assert fake_confluence.count(r"^/wiki/rest/api/content/\d+\?") == len(fake_confluence.pages)
+        assert fake_confluence.count(r"/children\?") == len(fake_confluence.pages)
+
+    def test_local_mode_concurrent_matches_remote(self, fake_confluence, tmp_path):
+        remote_pages, remote_list = _run(fake_confluence, tmp_path, mode="remote", workers=1)
+        local_pages, local_list = _run(fake_confluence, tmp_path, mode="local", workers=4)
+
+        assert local_pages == remote_pages
+        assert local_list == remote_list
+
+    def test_failed_subtree_is_skipped(self, fake_confluence, tmp_path):
+        """페이지 수집에 실패하면 직렬 수집처럼 그 하위 트리를 건너뛴다."""
+        broken_id = fake_confluence.children[ROOT_ID][0]
+        fake_confluence.fail(rf"^/wiki/rest/api/content/{broken_id}\?")
+
+        serial_pages, _ = _run(fake_confluence, tmp_path / "serial", mode="remote", workers=1)
+        concurrent_pages, _ = _run(fake_confluence, tmp_path / "concurrent", mode="remote", workers=4)
+
+        assert concurrent_pages == serial_pages
+        assert all(not p["page_id"].startswith(broken_id) for p in concurrent_pages)
+
+
+V1_REQUEST = r"^/wiki/rest/api/content/(\d+)\?expand="
+
+
+class TestWideSection:
+    """하위 페이지가 한 번의 응답에 담기지 않아도 트리가 잘리지 않아야 한다."""
+
+    def test_children_beyond_first_result_page_are_fetched(self, fake_confluence, tmp_path):
+        fake_confluence.children_page_limit = 2
+
+        pages, _ = _run(fake_confluence, tmp_path, mode="remote", workers=4)
+
+        assert [page["page_id"] for page in pages] == _expected_depth_first(fake_confluence, ROOT_ID)
+        children = json.loads((tmp_path / ROOT_ID / "children.v2.json").read_text(encoding="utf-8"))
+        assert [child["id"] for child in children["results"]] == fake_confluence.children[ROOT_ID]
+
+
+class TestVersionAwareSkip:
+    """page.v2 의 version 이 그대로인 페이지는 본문을 다시 내려받지 않는다."""
+
+    def test_unchanged_pages_skip_body_requests(self, fake_confluence, tmp_path):
+        first_pages, first_list = _run(fake_confluence, tmp_path, mode="remote", workers=4)
+        fake_confluence.clear_requests()
+
+        pages, list_txt = _run(fake_confluence, tmp_path, mode="remote", workers=4)
+
+        assert (pages, list_txt) == (first_pages, first_list)
+        assert fake_confluence.count(V1_REQUEST) == 0
+        assert fake_confluence.count(r"^/wiki/api/v2/pages/\d+\?body-format") == 0
+        assert fake_confluence.count(r"/children\?") == len(fake_confluence.pages)
+
+    def test_versions_are_looked_up_in_bulk(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", workers=1)
+
+        parents = [page_id for page_id, children in fake_confluence.children.items() if children]
+        # root 1회 + 자식이 있는 페이지마다 1회
+        assert fake_confluence.count(r"^/wiki/api/v2/pages\?id=") == 1 + len(parents)
+
+    def test_new_version_is_refetched(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", workers=1)
+        changed_id = fake_confluence.children[ROOT_ID][1]
+        fake_confluence.pages[changed_id].version += 1
+        fake_confluence.pages[changed_id].body = "<p>updated</p>"
+        fake_confluence.clear_requests()
+
+        _run(fake_confluence, tmp_path, mode="remote", workers=1)
+
+        assert fake_confluence.count(V1_REQUEST) == 1
+        assert (tmp_path / changed_id / "page.xhtml").read_text(encoding="utf-8") == "<p>updated</p>"
+
+    def test_renamed_page_refetches_subtree(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", workers=1)
+        renamed_id = fake_confluence.children[ROOT_ID][0]
+        fake_confluence.pages[renamed_id].title = "Renamed"
+        fake_confluence.pages[renamed_id].version += 1
+        fake_confluence.clear_requests()
+
+        pages, _ = _run(fake_confluence, tmp_path, mode="remote", workers=1)
+
+        subtree = _expected_depth_first(fake_confluence, renamed_id)
+        assert fake_confluence.count(V1_REQUEST) == len(subtree)
+        by_id = {p["page_id"]: p for p in pages}
+        assert all(by_id[page_id]["breadcrumbs"][0] == "Renamed" for page_id in subtree)
+
+    def test_force_refetches_everything(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", workers=1)
+        fake_confluence.clear_requests()
+
+        _run(fake_confluence, tmp_path, mode="remote", workers=1, skip_unchanged=False)
+
+        assert fake_confluence.count(V1_REQUEST) == len(fake_confluence.pages)
+        assert fake_confluence.count(r"^/wiki/api/v2/pages\?id=") == 0
+
+
+class TestRecentPipeline:
+    """--recent 에서 검색이 끝나기 전에 페이지 다운로드가 시작되어야 한다."""
+
+    @pytest.fixture
+    def confluence_tree(self):
+        def build(fake):
+            fake.add_page(ROOT_ID, "Root", created_at="2099-01-01T00:00:00.000Z")
+            for i in range(209):
+                fake.add_page(f"8{i:04d}", f"Recent {i}", ROOT_ID, created_at="2099-01-01T00:00:00.000Z")
+            fake.search_latency = 0.3
+        return build
+
+    def test_downloads_start_before_search_finishes(self, fake_confluence, tmp_path, capsys):
+        pages, _ = _run(fake_confluence, tmp_path, mode="recent", days=7, workers=4)
+
+        paths = fake_confluence.requests
+        last_search = max(i for i, path in enumerate(paths) if "/content/search" in path)
+        first_page = min(i for i, path in enumerate(paths) if path.startswith("/wiki/rest/api/content/8"))
+        assert first_page < last_search
+        downloaded = [line.split("\t")[0] for line in capsys.readouterr().out.splitlines()]
+        assert downloaded == list(fake_confluence.pages)  # 검색 결과 순서대로 출력한다
+        assert len(pages) == 210
+
+
+class TestBulkBodies:
+    """--recent 은 CQL 검색 결과에 포함된 본문으로 page.v1 을 채우고, 빠진 페이지만 따로 요청한다."""
+
+    @pytest.fixture
+    def confluence_tree(self):
+        def build(fake):
+            fake.add_page(ROOT_ID, "Root", created_at="2099-01-01T00:00:00.000Z")
+            for i in range(120):
+                fake.add_page(f"8{i:04d}", f"Recent {i}", ROOT_ID, created_at="2099-01-01T00:00:00.000Z")
+            fake.search_omitted_bodies = {"80007", "80100"}
+        return build
+
+    @pytest.mark.parametrize("workers, backend", [(1, "sync"), (4, "sync"), (1, "async")])
+    def test_only_incomplete_bodies_are_requested(self, fake_confluence, tmp_path, workers, backend):
+        pages, _ = _run(fake_confluence, tmp_path, mode="recent", days=7, workers=workers, backend=backend)
+
+        assert len(pages) == len(fake_confluence.pages)
+        requested = {re.match(V1_REQUEST, path).group(1)
+                     for path in fake_confluence.requests if re.match(V1_REQUEST, path)}
+        assert requested == {"80007", "80100"}
+        # 본문 expand 시 서버가 page size 를 50 으로 줄여도 모든 결과를 받는다
+        assert fake_confluence.count(r"/content/search\?.*expand=") == 3
+        for page_id in ("80000", "80007"):
+            stored = json.loads((tmp_path / page_id / "page.v1.json").read_text(encoding="utf-8"))
+            assert stored["body"]["storage"]["value"] == fake_confluence.pages[page_id].body
+
+    def test_per_page_bodies_output_matches(self, fake_confluence, tmp_path):
+        bulk_pages, bulk_list = _run(fake_confluence, tmp_path / "bulk", mode="recent", days=7)
+        per_page, per_page_list = _run(fake_confluence, tmp_path / "per-page", mode="recent", days=7,
+                                       bulk_bodies=False)
+
+        assert bulk_pages == per_page
+        assert bulk_list == per_page_list
+        assert (tmp_path / "bulk" / "80001" / "page.xhtml").read_bytes() == \
+            (tmp_path / "per-page" / "80001" / "page.xhtml").read_bytes()
+
+
+class TestStorageFormat:
+    """legacy YAML 로 저장된 var/ 를 JSON 기본값에서도 그대로 읽어야 한다."""
+
+    def test_local_mode_reads_legacy_yaml(self, fake_confluence, tmp_path):
+        remote_pages, remote_list = _run(fake_confluence, tmp_path, mode="remote", storage_format="yaml")
+        assert (tmp_path / ROOT_ID / "page.v1.yaml").exists()
+
+        local_pages, local_list = _run(fake_confluence, tmp_path, mode="local")
+
+        assert local_pages == remote_pages
+        assert local_list == remote_list
+
+
+class TestZeroReload:
+    """remote 모드에서는 Stage 1 의 응답을 메모리로 넘기므로 var/ 를 다시 읽지 않는다."""
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_remote_mode_does_not_read_raw_documents(self, fake_confluence, tmp_path, monkeypatch, workers):
+        loads = []
+        original_load_raw = raw_store.load_raw
+        monkeypatch.setattr(raw_store, "load_raw", lambda directory, name: loads.append(name) or original_load_raw(directory, name))
+
+        pages, _ = _run(fake_confluence, tmp_path, mode="remote", workers=workers)
+
+        assert loads == []
+        assert len(pages) == len(fake_confluence.pages)
+        assert all((tmp_path / page_id / "page.v1.json").exists() for page_id in fake_confluence.pages)
+
+    def test_local_mode_reads_raw_documents(self, fake_confluence, tmp_path, monkeypatch):
+        remote_pages, _ = _run(fake_confluence, tmp_path, mode="remote")
+        loads = []
+        original_load_raw = raw_store.load_raw
+        monkeypatch.setattr(raw_store, "load_raw", lambda directory, name: loads.append(name) or original_load_raw(directory, name))
+
+        local_pages, _ = _run(fake_confluence, tmp_path, mode="local", local_processes=1)
+
+        assert local_pages == remote_pages
+        # 로컬 인덱스를 만들 때 한 번씩만 읽고, 트리 순회는 인덱스만 사용한다
+        assert loads.count("page.v1") == len(fake_confluence.pages)
+        assert loads.count("children.v2") == len(fake_confluence.pages)
+
+
+class TestLocalIndex:
+    """--local 은 var/ 를 process pool 로 한 번에 파싱한 인덱스로 트리를 만든다."""
+
+    def test_process_pool_matches_remote(self, fake_confluence, tmp_path, monkeypatch):
+        monkeypatch.setattr(LocalPageIndex, "IN_PROCESS_PAGES", 5)
+        remote_pages, remote_list = _run(fake_confluence, tmp_path, mode="remote")
+        (tmp_path / ROOT_ID / "page.xhtml").unlink()
+
+        local_pages, local_list = _run(fake_confluence, tmp_path, mode="local", local_processes=2)
+
+        assert local_pages == remote_pages
+        assert local_list == remote_list
+        # Stage 2 는 worker process 에서 실행된다
+        assert (tmp_path / ROOT_ID / "page.xhtml").exists()
+
+    def test_index_holds_only_tree_fields(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote")
+        config = make_config(fake_confluence, tmp_path, mode="local", local_processes=2)
+        processor = ConfluencePageProcessor(config, logging.getLogger("test"))
+
+        index = processor.build_local_index(ROOT_ID)
+
+        assert len(index) == len(fake_confluence.pages)
+        root = index.get(ROOT_ID)
+        assert root.child_ids == fake_confluence.children[ROOT_ID]
+        leaf = index.get(_expected_depth_first(fake_confluence, ROOT_ID)[-1])
+        assert leaf.child_ids == []
+        assert [set(ancestor) for ancestor in leaf.ancestors] == [{"type", "id", "title"}] * len(leaf.ancestors)
+        assert processor.manifest.get_page(ROOT_ID)["xhtml_sha256"] == root.xhtml_sha256
+
+
+    def test_small_tree_is_parsed_in_process(self, fake_confluence, tmp_path, monkeypatch):
+        _run(fake_confluence, tmp_path, mode="remote")
+        processor = ConfluencePageProcessor(make_config(fake_confluence, tmp_path, mode="local", local_processes=4),
+                                            logging.getLogger("test"))
+        monkeypatch.setattr(LocalIndexPool, "submit", lambda pool, page_id: pytest.fail("started the process pool"))
+
+        index = processor.build_local_index(ROOT_ID)
+
+        assert len(index) == len(fake_confluence.pages)
+
+    def test_index_is_reused_by_later_walks(self, fake_confluence, tmp_path, monkeypatch):
+        _run(fake_confluence, tmp_path, mode="remote")
+        processor = ConfluencePageProcessor(make_config(fake_confluence, tmp_path, mode="local", local_processes=1),
+                                            logging.getLogger("test"))
+        processor.build_local_index("10010")
+        subtree_size = len(processor.local_index)
+        loads = []
+        original_load_raw = raw_store.load_raw
+        monkeypatch.setattr(raw_store, "load_raw", lambda directory, name: loads.append(name) or original_load_raw(directory, name))
+
+        processor.build_local_index("10010")
+        assert loads == []
+        processor.build_local_index(ROOT_ID)
+
+        assert len(processor.local_index) == len(fake_confluence.pages)
+        assert loads.count("page.v1") == len(fake_confluence.pages) - subtree_size
+
+
+class TestSubtree:
+    """--subtree 는 한 구간만 다시 받아 pages.yaml, list.txt 에 끼워 넣는다."""
+
+    SUBTREE_ID = "10010"
+
+    def test_matches_full_walk_after_edit_move_and_delete(self, fake_confluence, tmp_path, capsys):
+        _run(fake_confluence, tmp_path / "var", mode="remote")
+        fake_confluence.pages[self.SUBTREE_ID].title = "Renamed"
+        fake_confluence.move_page("1001021", "10012", position=0)
+        fake_confluence.delete_page("100102030")
+        fake_confluence.add_page("100109", "New Page", self.SUBTREE_ID)
+        fake_confluence.clear_requests()
+        capsys.readouterr()
+
+        pages, list_txt = _run(fake_confluence, tmp_path / "var", mode="remote", subtree_page_id=self.SUBTREE_ID)
+        refreshed = [line.split("\t")[0] for line in capsys.readouterr().out.splitlines()]
+        full_pages, full_list = _run(fake_confluence, tmp_path / "full", mode="remote")
+
+        assert pages == full_pages
+        assert list_txt == full_list
+        assert "Renamed" in pages[1]["breadcrumbs"]
+        assert "1001021" in refreshed and "100109" in refreshed
+
+    def test_fetches_only_the_subtree(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote")
+        fake_confluence.clear_requests()
+
+        pages, _ = _run(fake_confluence, tmp_path, mode="remote", subtree_page_id=self.SUBTREE_ID)
+
+        children_request = r"^/wiki/api/v2/pages/(\d+)/children"
+        requested = {re.match(children_request, path).group(1)
+                     for path in fake_confluence.requests if re.match(children_request, path)}
+        assert requested == set(_expected_depth_first(fake_confluence, self.SUBTREE_ID))
+        assert [p["page_id"] for p in pages] == _expected_depth_first(fake_confluence, ROOT_ID)
+
+    def test_local_subtree_keeps_unchanged_list(self, fake_confluence, tmp_path):
+        remote_pages, remote_list = _run(fake_confluence, tmp_path, mode="remote")
+
+        pages, list_txt = _run(fake_confluence, tmp_path, mode="local", subtree_page_id=self.SUBTREE_ID)
+
+        assert pages == remote_pages
+        assert list_txt == remote_list
+
+
+class TestIncrementalTree:
+    """--recent 은 이전 pages.yaml 에서 바뀐 페이지 주변만 갱신하고, 이동과 삭제를 반영한다."""
+
+    RECENT = "2099-01-01T00:00:00.000Z"
+
+    def _change_space(self, fake: FakeConfluence) -> None:
+        fake.pages["10010"].title = "Renamed"
+        fake.pages["10010"].created_at = self.RECENT
+        fake.move_page("1001021", "10012")
+        fake.pages["1001021"].created_at = self.RECENT
+        fake.delete_page("100102030")
+        fake.pages["1001020"].created_at = self.RECENT
+        fake.add_page("100109", "New Child", "10010", created_at=self.RECENT)
+        fake.add_page("100129", "New Page", "10012", created_at=self.RECENT)
+
+    def test_matches_full_walk(self, fake_confluence, tmp_path, monkeypatch):
+        _run(fake_confluence, tmp_path / "var", mode="remote")
+        self._change_space(fake_confluence)
+        loads = []
+        original_load_raw = raw_store.load_raw
+        monkeypatch.setattr(raw_store, "load_raw", lambda directory, name: loads.append(name) or original_load_raw(directory, name))
+
+        pages, list_txt = _run(fake_confluence, tmp_path / "var", mode="recent", days=7, local_processes=1)
+        monkeypatch.setattr(raw_store, "load_raw", original_load_raw)
+        full_pages, full_list = _run(fake_confluence, tmp_path / "full", mode="remote")
+
+        assert pages == full_pages
+        assert list_txt == full_list
+        # 전체 트리(40 페이지)를 다시 읽지 않고, 새로 끼워 넣은 페이지만 var/ 에서 읽는다
+        assert loads.count("page.v1") <= 2
+
+    def test_full_tree_option_walks_everything(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path / "var", mode="remote")
+        self._change_space(fake_confluence)
+
+        pages, _ = _run(fake_confluence, tmp_path / "var", mode="recent", days=7, incremental_tree=False)
+
+        # var/ 의 children.v2 를 따라가므로, 수정되지 않은 부모 아래의 새 페이지와 이동한 페이지는 이전 위치 그대로다
+        assert "100129" not in [page["page_id"] for page in pages]
+
+
+class TestResume:
+    """중간에 끊긴 --remote 실행을 --resume 으로 이어받으면, 네 단계를 마친 페이지는 다시 요청하지 않는다."""
+
+    def _interrupted_run(self, fake: FakeConfluence, output_dir, monkeypatch, after_pages: int) -> ConfluencePageProcessor:
+        processor = ConfluencePageProcessor(make_config(fake, output_dir, mode="remote"), logging.getLogger("test"))
+        translated = []
+        original = ConfluencePageProcessor.apply_translation
+
+        def crash(self, page):
+            if len(translated) == after_pages:
+                raise KeyboardInterrupt  # not handled by run(), like the process being killed
+            translated.append(page.page_id)
+            original(self, page)
+
+        monkeypatch.setattr(ConfluencePageProcessor, "apply_translation", crash)
+        with pytest.raises(KeyboardInterrupt):
+            processor.run()
+        monkeypatch.setattr(ConfluencePageProcessor, "apply_translation", original)
+        processor.flush_writes()
+        processor.journal.close()
+        return processor
+
+    def test_resume_skips_completed_pages(self, fake_confluence, tmp_path, monkeypatch):
+        self._interrupted_run(fake_confluence, tmp_path / "var", monkeypatch, after_pages=10)
+        assert not (tmp_path / "var" / "pages.yaml").exists()
+        fake_confluence.clear_requests()
+
+        pages, list_txt = _run(fake_confluence, tmp_path / "var", mode="remote", resume=True)
+        requested = {match.group(1) for path in fake_confluence.requests
+                     if (match := re.match(r"^/wiki/api/v2/pages/(\d+)/children", path))}
+        full_pages, full_list = _run(fake_confluence, tmp_path / "full", mode="remote")
+
+        assert (pages, list_txt) == (full_pages, full_list)
+        # 중단 직전의 11번째 페이지도 Stage 4 까지 마쳤으므로 다시 요청하지 않는다
+        assert len(requested) == len(fake_confluence.pages) - 11
+
+    def test_finished_run_is_not_resumed(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote")
+        fake_confluence.clear_requests()
+
+        _run(fake_confluence, tmp_path, mode="remote", resume=True)
+
+        assert fake_confluence.count(r"/children\?") == len(fake_confluence.pages)
+
+    def test_failed_page_is_fetched_again(self, fake_confluence, tmp_path, monkeypatch):
+        failing_id = fake_confluence.children[ROOT_ID][0]
+        fake_confluence.fail(rf"^/wiki/rest/api/content/{failing_id}/child/attachment", status=500, times=1)
+        self._interrupted_run(fake_confluence, tmp_path, monkeypatch, after_pages=10)
+        fake_confluence.clear_requests()
+
+        _run(fake_confluence, tmp_path, mode="remote", resume=True)
+
+        assert fake_confluence.count(rf"^/wiki/rest/api/content/{failing_id}/child/attachment") == 1
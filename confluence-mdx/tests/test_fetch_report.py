@@ -0,0 +1,74 @@
+"""fetch.report 단위 테스트 — 단계별 소요 시간, 요청/바이트 카운터, fetch-report.json 출력을 검증한다."""
+
+import json
+import logging
+
+import pytest
+
+from conftest import ROOT_ID, make_config
+from fake_confluence import FakeConfluence
+from fetch.processor import ConfluencePageProcessor
+from fetch.report import FetchReport
+
+
+@pytest.fixture
+def confluence_tree():
+    def build(fake):
+        fake.add_page(ROOT_ID, "Root")
+        fake.add_page("200", "Child A", ROOT_ID, attachments={"a.png": b"a" * 300})
+        fake.add_page("300", "Child B", ROOT_ID)
+    return build
+
+
+def _run(fake: FakeConfluence, output_dir, **kwargs):
+    ConfluencePageProcessor(make_config(fake, output_dir, **kwargs), logging.getLogger("test")).run()
+    return json.loads((output_dir / FetchReport.FILENAME).read_text(encoding="utf-8"))
+
+
+class TestFetchReport:
+    def test_stage_times_and_slowest_pages(self):
+        now = [0.0]
+        report = FetchReport(logging.getLogger("test"), clock=lambda: now[0])
+        for page_id, seconds in (("200", 0.5), ("300", 2.0), ("400", 1.0)):
+            with report.stage("stage1", page_id):
+                now[0] += seconds
+        with report.stage("stage2", "200"):
+            now[0] += 1.0
+
+        data = report.to_dict("remote")
+
+        assert data["stages"]["stage1"] == {"pages": 3, "seconds": 3.5, "mean": pytest.approx(3.5 / 3, abs=1e-4), "max": 2.0}
+        assert [page["page_id"] for page in data["slowest_pages"]] == ["300", "200", "400"]
+        assert data["slowest_pages"][1]["stages"] == {"stage1": 0.5, "stage2": 1.0}
+        assert data["pages"] == 3
+
+    def test_remote_run_writes_report(self, fake_confluence, tmp_path):
+        data = _run(fake_confluence, tmp_path, mode="remote", download_attachments=True)
+
+        counters = data["counters"]
+        assert data["mode"] == "remote"
+        assert data["pages"] == 3
+        assert set(data["stages"]) == {"stage1", "stage2", "stage3", "stage4"}
+        assert counters["api.requests"] == len(fake_confluence.requests)
+        assert counters["api.bytes_in"] > 300
+        assert counters["files.bytes_out"] > 0
+        assert counters["attachments.downloaded"] == 1
+        assert counters["attachments.bytes_in"] == 300
+        assert data["attachment_queue"]["files"] == 1
+        assert "GET /wiki/api/v2/pages/{id}/children" in data["api_latency"]
+
+    def test_second_run_counts_up_to_date_attachments(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote", download_attachments=True)
+
+        data = _run(fake_confluence, tmp_path, mode="remote", download_attachments=True)
+
+        assert data["counters"]["attachments.up_to_date"] == 1
+        assert "attachments.downloaded" not in data["counters"]
+
+    def test_local_run_has_no_api_requests(self, fake_confluence, tmp_path):
+        _run(fake_confluence, tmp_path, mode="remote")
+
+        data = _run(fake_confluence, tmp_path, mode="local")
+
+        assert set(data["stages"]) == {"stage2", "stage4"}
+        assert "api.requests" not in data["counters"]
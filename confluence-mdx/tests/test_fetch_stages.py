@@ -0,0 +1,260 @@
+"""fetch.stages 단위 테스트 — 첨부파일 스트리밍 저장, manifest, content-addressed cache, 단계 간 메모리 전달을 검증한다."""
+
+import errno
+import hashlib
+import json
+import logging
+
+import pytest
+import yaml
+
+from conftest import make_config
+from fetch.api_client import ApiClient
+from fetch.exceptions import FileError
+from fetch.file_manager import FileManager, WriteBehindWriter
+from fetch.stages import Stage1Processor, Stage2Processor, Stage3Processor, Stage4Processor
+
+
+PAGE_ID = "200"
+OTHER_PAGE_ID = "300"
+IMAGE = b"\x89PNG" + bytes(range(256)) * 1000
+DIAGRAM = b"<svg/>" * 10
+
+
+@pytest.fixture
+def confluence_tree():
+    def build(fake):
+        fake.add_page("100", "Root")
+        fake.add_page(PAGE_ID, "Child", "100", attachments={"image.png": IMAGE, "diagram.svg": DIAGRAM})
+        fake.add_page(OTHER_PAGE_ID, "Sibling", "100", attachments={"copy.png": IMAGE})
+    return build
+
+
+@pytest.fixture
+def stages(fake_confluence, tmp_path):
+    logger = logging.getLogger("test")
+    config = make_config(fake_confluence, tmp_path, default_output_dir=str(tmp_path / "var"),
+                         download_attachments=True, download_chunk_size=1024, mode="remote")
+    api_client = ApiClient(config, logger)
+    file_manager = FileManager(logger)
+    stage1 = Stage1Processor(config, api_client, file_manager, logger)
+    stage3 = Stage3Processor(config, api_client, file_manager, logger)
+    stage1.process(PAGE_ID)
+    stage1.process(OTHER_PAGE_ID)
+    return stage3
+
+
+def _manifest(tmp_path):
+    path = tmp_path / "var" / PAGE_ID / Stage3Processor.MANIFEST_FILENAME
+    return yaml.safe_load(path.read_text(encoding="utf-8"))
+
+
+def _set_reported_size(tmp_path, filename, size):
+    path = tmp_path / "var" / PAGE_ID / "attachments.v1.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for attachment in data["results"]:
+        if attachment["title"] == filename:
+            attachment["extensions"]["fileSize"] = size
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestSaveStream:
+    def test_writes_atomically_and_hashes(self, tmp_path):
+        file_manager = FileManager(logging.getLogger("test"))
+        target = tmp_path / "out" / "file.bin"
+
+        size, sha256 = file_manager.save_stream(str(target), [b"abc", b"def"], expected_size=6)
+
+        assert (size, sha256) == (6, hashlib.sha256(b"abcdef").hexdigest())
+        assert target.read_bytes() == b"abcdef"
+        assert [p.name for p in target.parent.iterdir()] == ["file.bin"]
+
+    def test_size_mismatch_keeps_existing_file(self, tmp_path):
+        file_manager = FileManager(logging.getLogger("test"))
+        target = tmp_path / "file.bin"
+        target.write_bytes(b"old")
+
+        with pytest.raises(FileError):
+            file_manager.save_stream(str(target), [b"new content"], expected_size=3)
+
+        assert target.read_bytes() == b"old"
+        assert [p.name for p in tmp_path.iterdir()] == ["file.bin"]
+
+    def test_failed_save_file_keeps_existing_file(self, tmp_path):
+        file_manager = FileManager(logging.getLogger("test"))
+        target = tmp_path / "pages.yaml"
+        target.write_text("old", encoding="utf-8")
+
+        with pytest.raises(FileError):
+            file_manager.save_file(str(target), 12345)  # Not a string: fails after the file is opened
+
+        assert target.read_text(encoding="utf-8") == "old"
+        assert [p.name for p in tmp_path.iterdir()] == ["pages.yaml"]
+
+
+class TestStage3Streaming:
+    def test_downloads_and_records_sha256(self, stages, tmp_path):
+        stages.process(PAGE_ID)
+
+        page_dir = tmp_path / "var" / PAGE_ID
+        assert (page_dir / "image.png").read_bytes() == IMAGE
+        manifest = _manifest(tmp_path)
+        assert manifest["image.png"]["sha256"] == hashlib.sha256(IMAGE).hexdigest()
+        assert manifest["image.png"]["size"] == len(IMAGE)
+        assert manifest["diagram.svg"]["sha256"] == hashlib.sha256(DIAGRAM).hexdigest()
+
+    def test_recorded_files_are_not_downloaded_again(self, stages, fake_confluence):
+        stages.process(PAGE_ID)
+        fake_confluence.clear_requests()
+
+        stages.process(PAGE_ID)
+
+        assert fake_confluence.count(r"/download$") == 0
+
+    def test_modified_file_is_downloaded_again(self, stages, fake_confluence, tmp_path):
+        stages.process(PAGE_ID)
+        (tmp_path / "var" / PAGE_ID / "image.png").write_bytes(b"tampered")
+        fake_confluence.clear_requests()
+
+        stages.process(PAGE_ID)
+
+        assert fake_confluence.count(r"/download$") == 1
+        assert (tmp_path / "var" / PAGE_ID / "image.png").read_bytes() == IMAGE
+
+    def test_size_mismatch_is_rejected(self, stages, tmp_path):
+        _set_reported_size(tmp_path, "image.png", len(IMAGE) + 1)
+
+        stages.process(PAGE_ID)
+
+        page_dir = tmp_path / "var" / PAGE_ID
+        assert not (page_dir / "image.png").exists()
+        assert not list(page_dir.glob("*.part"))
+        assert "image.png" not in _manifest(tmp_path)
+        assert (page_dir / "diagram.svg").read_bytes() == DIAGRAM
+
+    def test_cache_copy_is_hashed(self, stages, fake_confluence, tmp_path):
+        cache_dir = tmp_path / "cache" / PAGE_ID
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "image.png").write_bytes(IMAGE)
+
+        stages.process(PAGE_ID)
+
+        assert fake_confluence.count(r"/download$") == 1  # diagram.svg 만 API 로 내려받는다
+        assert _manifest(tmp_path)["image.png"]["sha256"] == hashlib.sha256(IMAGE).hexdigest()
+
+
+class TestAttachmentCache:
+    def test_identical_attachments_are_stored_once(self, stages, tmp_path):
+        stages.process(PAGE_ID)
+        stages.process(OTHER_PAGE_ID)
+
+        objects = sorted(p.name for p in (tmp_path / "cache" / "objects").iterdir())
+        assert objects == sorted([hashlib.sha256(IMAGE).hexdigest(), hashlib.sha256(DIAGRAM).hexdigest()])
+        image = tmp_path / "var" / PAGE_ID / "image.png"
+        copy = tmp_path / "var" / OTHER_PAGE_ID / "copy.png"
+        assert copy.read_bytes() == IMAGE
+        assert image.stat().st_ino == copy.stat().st_ino
+
+    def test_wiped_var_is_restored_without_download(self, stages, fake_confluence, tmp_path):
+        stages.process(PAGE_ID)
+        page_dir = tmp_path / "var" / PAGE_ID
+        for name in ("image.png", "diagram.svg", Stage3Processor.MANIFEST_FILENAME):
+            (page_dir / name).unlink()
+        fake_confluence.clear_requests()
+
+        stages.process(PAGE_ID)
+
+        assert fake_confluence.count(r"/download$") == 0
+        assert (page_dir / "image.png").read_bytes() == IMAGE
+        assert _manifest(tmp_path)["diagram.svg"]["sha256"] == hashlib.sha256(DIAGRAM).hexdigest()
+
+    def test_falls_back_to_copy_across_filesystems(self, stages, fake_confluence, tmp_path, monkeypatch):
+        def cross_device_link(source, target):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        monkeypatch.setattr("fetch.file_manager.os.link", cross_device_link)
+
+        stages.process(PAGE_ID)
+
+        image = tmp_path / "var" / PAGE_ID / "image.png"
+        cached = tmp_path / "cache" / "objects" / hashlib.sha256(IMAGE).hexdigest()
+        assert image.read_bytes() == IMAGE
+        assert image.stat().st_ino != cached.stat().st_ino
+
+    def test_same_size_version_without_file_id_is_not_reused(self, stages):
+        cache = stages.attachment_cache
+        first = {"id": "att1", "extensions": {"fileSize": 3}, "version": {"number": 1}}
+        second = dict(first, version={"number": 2})
+        size, sha256 = cache.store(first, [b"old"], 3)
+
+        assert cache.lookup(first, 3) == sha256
+        assert cache.lookup(second, 3) is None
+
+    def test_attachment_without_version_is_not_cached(self, stages):
+        cache = stages.attachment_cache
+        attachment = {"id": "att1", "extensions": {"fileSize": 3}}
+        cache.store(attachment, [b"old"], 3)
+
+        assert cache.version_key(attachment) is None
+        assert cache.lookup(attachment, 3) is None
+
+
+class TestPageContext:
+    @pytest.fixture
+    def pipeline(self, fake_confluence, tmp_path, monkeypatch):
+        logger = logging.getLogger("test")
+        config = make_config(fake_confluence, tmp_path, default_output_dir=str(tmp_path / "var"), mode="remote")
+        api_client = ApiClient(config, logger)
+        file_manager = FileManager(logger)
+        loads = []
+        original_load_raw = file_manager.load_raw
+        monkeypatch.setattr(file_manager, "load_raw", lambda directory, name: loads.append(name) or original_load_raw(directory, name))
+        writer = WriteBehindWriter(file_manager, logger)
+        stages = (
+            Stage1Processor(config, api_client, file_manager, logger, writer=writer),
+            Stage2Processor(config, api_client, file_manager, logger),
+            Stage4Processor(config, api_client, file_manager, logger),
+        )
+        yield stages, writer, loads
+        writer.close()
+
+    def test_later_stages_use_stage1_responses(self, pipeline, tmp_path):
+        (stage1, stage2, stage4), writer, loads = pipeline
+        context = stage1.create_context(PAGE_ID)
+
+        stage1.process(PAGE_ID, context)
+        stage2.process(PAGE_ID, context)
+        page = stage4.process(PAGE_ID, "100", context)
+
+        assert loads == []
+        assert page.breadcrumbs == ["Child"]
+        writer.flush()
+        directory = tmp_path / "var" / PAGE_ID
+        assert sorted(p.name for p in directory.glob("*.json")) == [
+            "attachments.v1.json", "children.v2.json", "page.v1.json", "page.v2.json",
+        ]
+        assert (directory / "page.xhtml").read_text(encoding="utf-8") == "<p>Child</p>"
+
+    def test_context_without_stage1_reads_disk_once(self, pipeline):
+        (stage1, stage2, stage4), writer, loads = pipeline
+        stage1.process(PAGE_ID)
+        writer.flush()
+        context = stage2.create_context(PAGE_ID)
+
+        stage2.process(PAGE_ID, context)
+        stage4.process(PAGE_ID, "100", context)
+
+        assert loads == ["page.v1", "page.v2"]
+
+
+class TestWriteBehindWriter:
+    def test_failed_write_is_counted(self, tmp_path):
+        logger = logging.getLogger("test")
+        (tmp_path / "blocked").write_text("not a directory", encoding="utf-8")
+        writer = WriteBehindWriter(FileManager(logger), logger)
+
+        writer.save_raw(str(tmp_path / "blocked"), "page.v1", {"id": "1"})
+        writer.save_raw(str(tmp_path / "ok"), "page.v1", {"id": "1"})
+        writer.close()
+
+        assert writer.failures == 1
+        assert json.loads((tmp_path / "ok" / "page.v1.json").read_text(encoding="utf-8")) == {"id": "1"}
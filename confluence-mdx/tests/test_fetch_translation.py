@@ -0,0 +1,114 @@
+"""fetch.translation 단위 테스트 — 제목 trie 치환이 이전 str.replace 방식과 같은 결과를 내는지, 디스크 캐시가 파일 변경을 따라가는지 검증한다."""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from benchmark_translation import naive_translate
+from fetch.exceptions import TranslationError
+from fetch.models import Page
+from fetch.translation import TitleMatcher, TranslationService
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+TRANSLATIONS_FILE = PROJECT_DIR / "etc" / "korean-titles-translations.txt"
+LIST_FILE = PROJECT_DIR / "var" / "list.txt"
+
+
+def _service(translations_file, cache_dir=None) -> TranslationService:
+    service = TranslationService(str(translations_file), logging.getLogger("test"),
+                                 cache_dir=str(cache_dir) if cache_dir else None)
+    service.load_translations()
+    return service
+
+
+class TestTranslate:
+    def test_matches_naive_replace_on_list_txt(self):
+        service = _service(TRANSLATIONS_FILE)
+        content = LIST_FILE.read_text(encoding="utf-8")
+
+        assert service.translate(content) == naive_translate(service.translations, content)
+
+    def test_longest_title_wins(self):
+        matcher = TitleMatcher.build({"설치": "Installation", "설치 가이드": "Installation Guide"})
+
+        assert matcher.replace("1\t설치 가이드 />> 설치") == "1\tInstallation Guide />> Installation"
+
+    def test_titles_are_only_replaced_after_delimiters(self):
+        matcher = TitleMatcher.build({"개요": "Overview"})
+
+        assert matcher.replace("1\t시스템 개요 />> 개요 상세") == "1\t시스템 개요 />> Overview 상세"
+
+    def test_translate_page(self):
+        service = _service(TRANSLATIONS_FILE)
+        page = Page(page_id="1", title="사용자 매뉴얼", title_orig="사용자 매뉴얼", breadcrumbs=["사용자 매뉴얼", "Unknown"])
+
+        service.translate_page(page)
+
+        assert page.breadcrumbs_en == ["User Manual", "Unknown"]
+        assert page.path == ["user-manual", "unknown"]
+
+
+class TestTranslationCache:
+    @pytest.fixture
+    def translations_file(self, tmp_path):
+        path = tmp_path / "translations.txt"
+        path.write_text("# comment\n개요 | Overview\n설치 | Installation\n", encoding="utf-8")
+        return path
+
+    def test_cache_is_used_for_unchanged_file(self, translations_file, tmp_path, monkeypatch):
+        _service(translations_file, tmp_path / "cache")
+        monkeypatch.setattr(TitleMatcher, "build", lambda translations: pytest.fail("rebuilt the trie"))
+
+        service = _service(translations_file, tmp_path / "cache")
+
+        assert service.translations == {"개요": "Overview", "설치": "Installation"}
+        assert service.translate("1\t설치") == "1\tInstallation"
+
+    def test_edited_file_invalidates_cache(self, translations_file, tmp_path):
+        _service(translations_file, tmp_path / "cache")
+        mtime_ns = translations_file.stat().st_mtime_ns
+        translations_file.write_text("개요 | Summary\n", encoding="utf-8")
+        os.utime(translations_file, ns=(mtime_ns, mtime_ns))  # Same mtime, different content
+
+        service = _service(translations_file, tmp_path / "cache")
+
+        assert service.translations == {"개요": "Summary"}
+
+    def test_touched_file_keeps_cache_and_records_mtime(self, translations_file, tmp_path):
+        _service(translations_file, tmp_path / "cache")
+        os.utime(translations_file, ns=(1, 1))
+
+        _service(translations_file, tmp_path / "cache")
+
+        cache = json.loads((tmp_path / "cache" / TranslationService.CACHE_FILENAME).read_text(encoding="utf-8"))
+        assert cache["mtime_ns"] == 1
+
+    def test_corrupt_cache_is_rebuilt(self, translations_file, tmp_path):
+        (tmp_path / "cache").mkdir()
+        (tmp_path / "cache" / TranslationService.CACHE_FILENAME).write_text("{", encoding="utf-8")
+
+        service = _service(translations_file, tmp_path / "cache")
+
+        assert service.translate("1\t개요") == "1\tOverview"
+
+    def test_unreadable_file_raises(self, tmp_path):
+        path = tmp_path / "translations.txt"
+        path.write_bytes(b"\xff\xfe | broken\n")
+
+        with pytest.raises(TranslationError):
+            _service(path)
+
+
+class TestBenchmark:
+    def test_run_reports_timings(self):
+        from benchmark_translation import format_results, run_benchmark
+
+        results = run_benchmark(entries=300, copies=1, repeat=1)
+
+        assert results["entries"] > 250
+        assert results["translate_ms"] > 0
+        assert len(format_results(results)) == 4
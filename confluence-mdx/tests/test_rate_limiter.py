@@ -0,0 +1,149 @@
+"""rate_limiter 단위 테스트 — 요청 token bucket, rate limit 헤더 적응, endpoint 별 응답 시간 histogram 을 검증한다."""
+
+import logging
+import time
+
+import pytest
+
+from fake_confluence import FakeConfluence
+from fetch.api_client import ApiClient
+from fetch.config import Config
+from rate_limiter import LatencyHistogram, RequestRateLimiter, endpoint_key, parse_rate_limit_reset
+from reverse_sync import confluence_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(rate=10, burst=2):
+    clock = FakeClock()
+    return RequestRateLimiter(rate, burst, clock=clock, sleep=clock.sleep, wall_clock=lambda: 1_700_000_000.0), clock
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        limiter, clock = _limiter(rate=10, burst=2)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        assert clock.sleeps == [pytest.approx(0.1), pytest.approx(0.1)]
+
+    def test_unlimited_never_waits(self):
+        limiter, clock = _limiter(rate=0)
+
+        for _ in range(100):
+            limiter.acquire()
+
+        assert clock.sleeps == []
+
+
+class TestAdaptation:
+    def test_retry_after_pauses_every_caller(self):
+        limiter, clock = _limiter(rate=0)
+
+        limiter.observe("GET /x", 0.1, 429, {"Retry-After": "3"})
+
+        assert limiter.reserve() == pytest.approx(3.0)
+        assert limiter.reserve(honor_pause=False) == 0.0
+        assert limiter.throttled == 1
+
+    def test_long_retry_after_is_clamped(self):
+        limiter, clock = _limiter(rate=0)
+
+        limiter.observe("GET /x", 0.1, 429, {"Retry-After": "86400"})
+
+        assert limiter.reserve() == pytest.approx(limiter.max_pause)
+
+    def test_429_halves_rate_and_successes_restore_it(self):
+        limiter, _ = _limiter(rate=10)
+
+        limiter.observe("GET /x", 0.1, 429, {"Retry-After": "0"})
+        limiter.observe("GET /x", 0.1, 429, {"Retry-After": "0"})
+        assert limiter.rate == pytest.approx(2.5)
+
+        for _ in range(100):
+            limiter.observe("GET /x", 0.1, 200, {})
+        assert limiter.rate == pytest.approx(10)
+
+    def test_near_limit_slows_down(self):
+        limiter, _ = _limiter(rate=10)
+
+        limiter.observe("GET /x", 0.1, 200, {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "5"})
+
+        assert limiter.rate == pytest.approx(5)
+
+    def test_exhausted_quota_pauses_until_reset(self):
+        limiter, _ = _limiter(rate=0)
+
+        limiter.observe("GET /x", 0.1, 200, {"X-RateLimit-Remaining": "0",
+                                            "X-RateLimit-Reset": "2023-11-14T22:13:25Z"})
+
+        assert limiter.reserve() == pytest.approx(5.0)
+
+    @pytest.mark.parametrize("value, expected", [
+        ("2023-11-14T22:13:30Z", 10.0),
+        ("1700000004", 4.0),
+        ("7", 7.0),
+        ("later", None),
+    ])
+    def test_parse_reset(self, value, expected):
+        assert parse_rate_limit_reset(value, now=1_700_000_000.0) == expected
+
+
+class TestLatencyHistogram:
+    def test_endpoint_key_groups_ids(self):
+        assert endpoint_key("get", "https://x/wiki/api/v2/pages/123/children?limit=250") == "GET /wiki/api/v2/pages/{id}/children"
+
+    def test_quantiles_and_summary(self):
+        histogram = LatencyHistogram()
+        for seconds in [0.03] * 8 + [0.2, 3.0]:
+            histogram.record("GET /a", seconds)
+
+        stats = histogram.snapshot()["GET /a"]
+        assert stats["count"] == 10
+        assert (stats["p50"], stats["p90"], stats["p99"]) == (0.05, 0.25, 5.0)
+        assert stats["buckets"]["<=0.05"] == 8
+        assert histogram.summary_lines() == ["GET /a: 10 requests, mean 344 ms, p50 <= 50 ms, p90 <= 250 ms, max 3000 ms"]
+
+
+class TestClients:
+    @pytest.fixture
+    def fake_confluence(self):
+        fake = FakeConfluence()
+        fake.add_page("100", "Root")
+        fake.start()
+        yield fake
+        fake.stop()
+
+    def test_api_client_is_throttled(self, fake_confluence):
+        config = Config(base_url=fake_confluence.base_url, email="e", api_token="t", rate_limit=20, rate_burst=1)
+        client = ApiClient(config, logging.getLogger("test"))
+
+        started = time.monotonic()
+        for _ in range(6):
+            client.get_page_data_v2("100")
+
+        assert time.monotonic() - started >= 0.2
+        assert client.rate_limiter.latency.snapshot()["GET /wiki/api/v2/pages/{id}"]["count"] == 6
+
+    def test_reverse_sync_shares_one_limiter(self, fake_confluence, monkeypatch):
+        monkeypatch.setattr(confluence_client, "_rate_limiter", None)
+        first = confluence_client.ConfluenceConfig(base_url=fake_confluence.base_url, email="e", api_token="t")
+        second = confluence_client.ConfluenceConfig(base_url=fake_confluence.base_url, email="e", api_token="t")
+
+        confluence_client._request(first, "GET", f"{fake_confluence.base_url}/api/v2/pages/100")
+        confluence_client._request(second, "GET", f"{fake_confluence.base_url}/api/v2/pages/100")
+
+        limiter = confluence_client.get_rate_limiter(second)
+        assert limiter.latency.snapshot()["GET /wiki/api/v2/pages/{id}"]["count"] == 2
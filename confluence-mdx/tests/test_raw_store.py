@@ -0,0 +1,130 @@
+"""raw_store 단위 테스트 — 저장 형식별 encode/decode, legacy YAML 읽기, migration 을 검증한다."""
+
+import json
+import logging
+
+import pytest
+import yaml
+
+import raw_store
+from converter.context import load_page_v1_yaml, load_pages_yaml
+from fetch.file_manager import FileManager
+from migrate_storage import migrate
+
+
+PAGE_V1 = {
+    "id": "200",
+    "title": "한글 제목",
+    "ancestors": [{"id": "100", "type": "page", "title": "Root"}],
+    "body": {"storage": {"value": "<p>본문</p>", "representation": "storage"}},
+}
+
+FORMATS = ["json", "yaml"] + (["json.zst"] if raw_store.zstandard is not None else [])
+
+
+def _write_legacy(directory, name, data):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{name}.yaml").write_bytes(raw_store.encode(data, "yaml"))
+
+
+class TestEncoding:
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_round_trip(self, fmt):
+        assert raw_store.decode(raw_store.encode(PAGE_V1, fmt), fmt) == PAGE_V1
+
+    def test_json_is_compact_utf8(self):
+        content = raw_store.encode(PAGE_V1, "json")
+
+        assert "한글 제목".encode("utf-8") in content
+        assert b": " not in content
+        assert len(content) < len(raw_store.encode(PAGE_V1, "yaml"))
+
+    def test_legacy_yaml_matches_save_yaml(self, tmp_path):
+        FileManager(logging.getLogger("test")).save_yaml(str(tmp_path / "page.v1.yaml"), PAGE_V1)
+
+        assert (tmp_path / "page.v1.yaml").read_bytes() == raw_store.encode(PAGE_V1, "yaml")
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            raw_store.check_format("xml")
+
+
+class TestLookup:
+    def test_legacy_yaml_is_read(self, tmp_path):
+        _write_legacy(tmp_path, "page.v1", PAGE_V1)
+
+        assert raw_store.load_raw(str(tmp_path), "page.v1") == PAGE_V1
+
+    def test_yaml_path_resolves_to_json(self, tmp_path):
+        (tmp_path / "page.v1.json").write_bytes(raw_store.encode(PAGE_V1, "json"))
+
+        assert raw_store.resolve(str(tmp_path / "page.v1.yaml")) == str(tmp_path / "page.v1.json")
+        assert raw_store.load_document(str(tmp_path / "page.v1.yaml")) == PAGE_V1
+
+    def test_other_yaml_files_are_not_remapped(self, tmp_path):
+        (tmp_path / "pages.yaml").write_text(yaml.dump([{"page_id": "200"}]), encoding="utf-8")
+
+        assert raw_store.document_name(str(tmp_path / "pages.yaml")) is None
+        assert raw_store.load_document(str(tmp_path / "pages.yaml")) == [{"page_id": "200"}]
+
+    def test_missing_document(self, tmp_path):
+        assert raw_store.load_raw(str(tmp_path), "page.v1") is None
+        with pytest.raises(FileNotFoundError):
+            raw_store.load_document(str(tmp_path / "page.v1.yaml"))
+
+
+class TestFileManager:
+    def test_save_raw_removes_other_formats(self, tmp_path):
+        _write_legacy(tmp_path, "children.v2", {"results": []})
+
+        path = FileManager(logging.getLogger("test")).save_raw(str(tmp_path), "children.v2", {"results": [{"id": "1"}]})
+
+        assert path == str(tmp_path / "children.v2.json")
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["children.v2.json"]
+        assert json.loads((tmp_path / "children.v2.json").read_text(encoding="utf-8")) == {"results": [{"id": "1"}]}
+
+    def test_yaml_format_keeps_legacy_layout(self, tmp_path):
+        file_manager = FileManager(logging.getLogger("test"), storage_format="yaml")
+        file_manager.save_raw(str(tmp_path), "page.v1", PAGE_V1)
+
+        assert (tmp_path / "page.v1.yaml").read_bytes() == raw_store.encode(PAGE_V1, "yaml")
+
+
+class TestConverterShim:
+    def test_load_page_v1_yaml_reads_json(self, tmp_path):
+        (tmp_path / "page.v1.json").write_bytes(raw_store.encode(PAGE_V1, "json"))
+
+        assert load_page_v1_yaml(str(tmp_path / "page.v1.yaml")) == PAGE_V1
+
+    def test_load_pages_yaml(self, tmp_path):
+        pages = [{"page_id": "200", "title_orig": "한글 제목", "path": ["hangul"]}]
+        (tmp_path / "pages.yaml").write_text(yaml.dump(pages, allow_unicode=True), encoding="utf-8")
+        by_title, by_id = {}, {}
+
+        load_pages_yaml(str(tmp_path / "pages.yaml"), by_title, by_id)
+
+        assert by_id == {"200": pages[0]}
+
+
+class TestMigration:
+    def test_migrates_legacy_var(self, tmp_path):
+        for page_id in ("100", "200"):
+            _write_legacy(tmp_path / page_id, "page.v1", PAGE_V1)
+            _write_legacy(tmp_path / page_id, "children.v2", {"results": []})
+        (tmp_path / "200" / "page.xhtml").write_text("<p/>", encoding="utf-8")
+        (tmp_path / "pages.yaml").write_text("[]", encoding="utf-8")
+
+        assert migrate(str(tmp_path), "json") == 4
+
+        assert sorted(p.name for p in (tmp_path / "200").iterdir()) == ["children.v2.json", "page.v1.json", "page.xhtml"]
+        assert raw_store.load_raw(str(tmp_path / "200"), "page.v1") == PAGE_V1
+        assert migrate(str(tmp_path), "json") == 0
+
+    def test_migrates_back_to_yaml(self, tmp_path):
+        (tmp_path / "200").mkdir()
+        (tmp_path / "200" / "page.v1.json").write_bytes(raw_store.encode(PAGE_V1, "json"))
+
+        assert migrate(str(tmp_path), "yaml") == 1
+
+        assert (tmp_path / "200" / "page.v1.yaml").read_bytes() == raw_store.encode(PAGE_V1, "yaml")
+        assert not (tmp_path / "200" / "page.v1.json").exists()